@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import dataclasses
 import json
 import multiprocessing as mp
 import signal
@@ -21,14 +22,39 @@ from module_aggregation_filtering.config import (
     Module1Config,
     QueueConfig as M1QueueConfig,
     ScoringConfig as M1ScoringConfig,
+    WindowCheckpointConfig as M1WindowCheckpointConfig,
 )
+from module_aggregation_filtering.aggregator import measure_expiry
+from module_aggregation_filtering.asset_catalog import measure_asset_lookup
+from module_aggregation_filtering.history_store import (
+    RedisHistoryStore,
+    RollingHistoryStore,
+    build_history_store,
+    check_history_consistency,
+    measure_history_memory,
+    measure_history_paths,
+    migrate_daily_history,
+    top_history_buckets,
+)
+from module_aggregation_filtering.normalizer import AlertNormalizer
+from module_aggregation_filtering.partition import measure_partition_scaling
 from module_aggregation_filtering.pipeline import run_pipeline as run_module1
+from module_aggregation_filtering.window_checkpoint import measure_window_checkpoint
 from module_alert_receiver.config import (
+    CheckpointConfig as ReceiverCheckpointConfig,
+    DedupeConfig as ReceiverDedupeConfig,
     ElasticConfig as ReceiverElasticConfig,
     ReceiverConfig,
     RedisConfig as ReceiverRedisConfig,
 )
+from module_alert_receiver.async_receiver import measure_receiver_modes
+from module_alert_receiver.backfill import run_backfill
+from module_alert_receiver.buffer import build_buffer, measure_push
+from module_alert_receiver.codec import available_codecs, get_codec, measure_codec
+from module_alert_receiver.compression import get_compressor
+from module_alert_receiver.projection import measure_projection, resolve_source_filter
 from module_alert_receiver.receiver import run_receiver
+from module_alert_receiver.replay import run_replay
 from module_business_logic_self_learning.config import (
     ElasticConfig as M2ElasticConfig,
     FeatureConfig as M2FeatureConfig,
@@ -78,7 +104,9 @@ def build_receiver_config(system_cfg: dict[str, Any]) -> ReceiverConfig:
     receiver_cfg = _get_obj(system_cfg, "receiver")
     elastic = ReceiverElasticConfig(**_get_obj(receiver_cfg, "elastic"))
     redis = ReceiverRedisConfig(**_get_obj(receiver_cfg, "redis"))
-    return ReceiverConfig(elastic=elastic, redis=redis)
+    checkpoint = ReceiverCheckpointConfig(**_get_obj(receiver_cfg, "checkpoint"))
+    dedupe = ReceiverDedupeConfig(**_get_obj(receiver_cfg, "dedupe"))
+    return ReceiverConfig(elastic=elastic, redis=redis, checkpoint=checkpoint, dedupe=dedupe)
 
 
 def build_module1_config(system_cfg: dict[str, Any]) -> Module1Config:
@@ -89,6 +117,7 @@ def build_module1_config(system_cfg: dict[str, Any]) -> Module1Config:
         scoring=M1ScoringConfig(**_get_obj(m1_cfg, "scoring")),
         asset=M1AssetConfig(**_get_obj(m1_cfg, "asset")),
         history=M1HistoryConfig(**_get_obj(m1_cfg, "history")),
+        checkpoint=M1WindowCheckpointConfig(**_get_obj(m1_cfg, "checkpoint")),
     )
 
 
@@ -155,7 +184,7 @@ def _ping_elastic(host: str, port: int, scheme: str, timeout_s: float = 5.0) ->
 
 
 def validate_runtime_connectivity(command: str, system_cfg: dict[str, Any]) -> None:
-    if command in {"run-all", "run-receiver"}:
+    if command in {"run-all", "run-receiver", "backfill"}:
         receiver_cfg = build_receiver_config(system_cfg)
         _ping_elastic(
             receiver_cfg.elastic.host,
@@ -165,7 +194,10 @@ def validate_runtime_connectivity(command: str, system_cfg: dict[str, Any]) -> N
         )
         _ping_redis(receiver_cfg.redis.url)
 
-    if command in {"run-all", "run-module1"}:
+    if command in {"replay", "push-bench", "receiver-bench"}:
+        _ping_redis(build_receiver_config(system_cfg).redis.url)
+
+    if command in {"run-all", "run-module1", "history-migrate", "history-memory", "history-bench", "history-inspect"}:
         m1_cfg = build_module1_config(system_cfg)
         _ping_redis(m1_cfg.queue.redis_url)
 
@@ -226,6 +258,16 @@ def run_all(system_cfg: dict[str, Any]) -> None:
         _stop_all()
 
 
+SAMPLE_ALERT_FILES = [
+    "data/waf.json",
+    "data/cty-nginx.json",
+    "data/huorong.json",
+    "data/tianyan.json",
+    "data/alarm-tianyan.json",
+    "data/zhongzi.json",
+]
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="SOCRATES unified pipeline entrypoint")
     parser.add_argument(
@@ -236,17 +278,568 @@ def build_parser() -> argparse.ArgumentParser:
     subparsers = parser.add_subparsers(dest="command", required=True)
     subparsers.add_parser("run-all", help="Run receiver + module1 + module2 + module3.")
     subparsers.add_parser("run-receiver", help="Run alert receiver only.")
-    subparsers.add_parser("run-module1", help="Run module1 only.")
+    module1_parser = subparsers.add_parser("run-module1", help="Run module1 only.")
+    module1_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Hash-partitioned module1 worker processes (default module1.aggregation.workers).",
+    )
     subparsers.add_parser("run-module2", help="Run module2 only.")
     subparsers.add_parser("run-module3", help="Run module3 only.")
     subparsers.add_parser("train-module2", help="Train module2 XGBoost model.")
+    backfill_parser = subparsers.add_parser(
+        "backfill",
+        help="Backfill a time range from Elasticsearch into Redis with parallel PIT slices.",
+    )
+    backfill_parser.add_argument("--start", required=True, help="Range start (ISO-8601, inclusive).")
+    backfill_parser.add_argument("--end", default=None, help="Range end (ISO-8601, default now).")
+    backfill_parser.add_argument("--workers", type=int, default=None, help="Concurrent slice workers.")
+    backfill_parser.add_argument("--slices", type=int, default=None, help="Number of time slices.")
+    replay_parser = subparsers.add_parser(
+        "replay",
+        help="Replay JSON array or JSONL alert dumps into the receiver queue without Elasticsearch.",
+    )
+    replay_parser.add_argument("--files", nargs="+", default=SAMPLE_ALERT_FILES, help="JSON array or JSONL alert dumps.")
+    replay_parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="Rate multiplier relative to recorded @timestamp (0 = as fast as possible).",
+    )
+    replay_parser.add_argument("--batch-size", type=int, default=None, help="Alerts per Redis push.")
+    replay_parser.add_argument("--repeat", type=int, default=1, help="Replay the files this many times.")
+    projection_parser = subparsers.add_parser(
+        "projection-report",
+        help="Report bytes per alert saved by the receiver _source projection on sample files.",
+    )
+    projection_parser.add_argument(
+        "--files",
+        nargs="+",
+        default=SAMPLE_ALERT_FILES,
+        help="JSON array or JSONL alert dumps.",
+    )
+    projection_parser.add_argument("--index", default=None, help="Index whose source filter applies.")
+    projection_parser.add_argument(
+        "--filters",
+        default=None,
+        help="JSON file of source filters to measure instead of receiver.elastic.source_filters.",
+    )
+    push_parser = subparsers.add_parser(
+        "push-bench",
+        help="Compare per-alert push with page-sized push_many against the receiver Redis.",
+    )
+    push_parser.add_argument("--files", nargs="+", default=SAMPLE_ALERT_FILES, help="JSON array or JSONL alert dumps.")
+    push_parser.add_argument("--alerts", type=int, default=20000, help="Alerts pushed per pass.")
+    push_parser.add_argument("--page-sizes", type=int, nargs="+", default=[200, 1000], help="Alerts per push_many.")
+    push_parser.add_argument("--maxlen", type=int, default=None, help="Also LTRIM the bench queue to this length.")
+    receiver_bench_parser = subparsers.add_parser(
+        "receiver-bench",
+        help="Compare sync and async receiver modes from a stub Elasticsearch into the receiver Redis.",
+    )
+    receiver_bench_parser.add_argument(
+        "--files",
+        nargs="+",
+        default=SAMPLE_ALERT_FILES,
+        help="JSON array or JSONL alert dumps.",
+    )
+    receiver_bench_parser.add_argument("--alerts", type=int, default=20000, help="Alerts served by the stub.")
+    receiver_bench_parser.add_argument("--page-size", type=int, default=200, help="Alerts per page.")
+    receiver_bench_parser.add_argument(
+        "--es-latency-ms",
+        type=float,
+        default=5.0,
+        help="Simulated Elasticsearch latency per page.",
+    )
+    codec_parser = subparsers.add_parser(
+        "codec-report",
+        help="Benchmark queue codecs (size and encode/decode time) on sample alert files.",
+    )
+    codec_parser.add_argument("--files", nargs="+", default=SAMPLE_ALERT_FILES, help="JSON array or JSONL alert dumps.")
+    codec_parser.add_argument("--rounds", type=int, default=20, help="Timing rounds per codec.")
+    codec_parser.add_argument(
+        "--compression",
+        choices=["zlib", "zstd"],
+        default=None,
+        help="Also compress messages at or above --min-bytes.",
+    )
+    codec_parser.add_argument("--min-bytes", type=int, default=1024, help="Compression size threshold.")
+    asset_parser = subparsers.add_parser(
+        "asset-bench",
+        help="Benchmark module1 asset lookups on synthetic CMDB tables of growing size.",
+    )
+    asset_parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10000, 100000],
+        help="Asset table sizes.",
+    )
+    asset_parser.add_argument("--lookups", type=int, default=20000, help="Lookups per size.")
+    expiry_parser = subparsers.add_parser(
+        "expiry-bench",
+        help="Benchmark module1 bucket expiry against the number of open buckets.",
+    )
+    expiry_parser.add_argument(
+        "--buckets",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000, 500000],
+        help="Open bucket counts.",
+    )
+    expiry_parser.add_argument("--alerts", type=int, default=20000, help="Alerts (one flush each) per bucket count.")
+    partition_parser = subparsers.add_parser(
+        "partition-bench",
+        help="Replay alert samples through 1..N hash-partitioned module1 workers and compare results.",
+    )
+    partition_parser.add_argument("--files", nargs="+", default=SAMPLE_ALERT_FILES, help="JSON array or JSONL alert dumps.")
+    partition_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts.")
+    partition_parser.add_argument("--alerts", type=int, default=200000, help="Alerts replayed per run.")
+    partition_parser.add_argument("--ip-pool", type=int, default=5000, help="Distinct source IPs stamped onto the alerts.")
+    partition_parser.add_argument(
+        "--span-s",
+        type=float,
+        default=3600.0,
+        help="Event-time span the replay is stamped over, so windows expire during the run.",
+    )
+    checkpoint_parser = subparsers.add_parser(
+        "checkpoint-bench",
+        help="Measure module1 window checkpoint cost against the number of open buckets.",
+    )
+    checkpoint_parser.add_argument(
+        "--buckets",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="Open bucket counts.",
+    )
+    checkpoint_parser.add_argument(
+        "--dirty-ratio",
+        type=float,
+        default=0.1,
+        help="Share of open buckets touched between two checkpoints.",
+    )
+    history_parser = subparsers.add_parser(
+        "history-migrate",
+        help="Build module1 rolling history from the per-day hashes and check it against them.",
+    )
+    history_parser.add_argument(
+        "--check-only",
+        action="store_true",
+        help="Only compare rolling averages with the per-day computation.",
+    )
+    history_parser.add_argument("--sample", type=int, default=10000, help="Bucket keys compared by the check.")
+    history_parser.add_argument(
+        "--from-digest-bits",
+        type=int,
+        default=None,
+        help="key_digest_bits of the existing per-day hashes (default: history.key_digest_bits).",
+    )
+    history_memory_parser = subparsers.add_parser(
+        "history-memory",
+        help="Compare Redis memory of full-key and digest-keyed module1 history on a synthetic load.",
+    )
+    history_memory_parser.add_argument("--buckets", type=int, default=50000, help="Distinct bucket keys.")
+    history_memory_parser.add_argument("--days", type=int, default=14, help="Days of history written.")
+    history_memory_parser.add_argument(
+        "--active-ratio",
+        type=float,
+        default=0.5,
+        help="Share of bucket keys recorded on each day.",
+    )
+    history_inspect_parser = subparsers.add_parser(
+        "history-inspect",
+        help="List the largest module1 history counts of one day, resolving digests through debug_keys.",
+    )
+    history_inspect_parser.add_argument("--day", default=None, help="UTC day as YYYY-MM-DD (default: today).")
+    history_inspect_parser.add_argument("--limit", type=int, default=20, help="Buckets listed.")
+    history_bench_parser = subparsers.add_parser(
+        "history-bench",
+        help="Compare module1 history read/record cost across the daily, rolling and scripted modes.",
+    )
+    history_bench_parser.add_argument("--snapshots", type=int, default=20000, help="Snapshots replayed per mode.")
+    history_bench_parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=[1, 500],
+        help="Snapshots per read/record call (1 = per-snapshot path).",
+    )
+    history_bench_parser.add_argument("--buckets", type=int, default=5000, help="Distinct bucket keys.")
+    normalize_parser = subparsers.add_parser(
+        "normalize-bench",
+        help="Benchmark module1 alert normalization throughput with and without the URI template cache.",
+    )
+    normalize_parser.add_argument("--files", nargs="+", default=SAMPLE_ALERT_FILES, help="JSON array or JSONL alert dumps.")
+    normalize_parser.add_argument("--rounds", type=int, default=2000, help="Passes over the loaded alerts.")
+    normalize_parser.add_argument(
+        "--uri-pool",
+        type=int,
+        default=500,
+        help="Distinct scanner-style URIs stamped onto the alerts (0 keeps the sample URIs).",
+    )
     return parser
 
 
+def _load_alert_samples(path: str) -> list[dict[str, Any]]:
+    file_path = Path(path)
+    if not file_path.is_absolute():
+        file_path = ROOT_DIR / file_path
+    text = file_path.read_text(encoding="utf-8")
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError:
+        payload = [json.loads(line) for line in text.splitlines() if line.strip()]
+    rows = payload if isinstance(payload, list) else [payload]
+    return [row for row in rows if isinstance(row, dict)]
+
+
+def projection_report(system_cfg: dict[str, Any], files: list[str], index: str | None, filters: str | None) -> None:
+    es_cfg = build_receiver_config(system_cfg).elastic
+    target_index = index or es_cfg.index
+    source_filters = es_cfg.source_filters
+    if filters:
+        filters_path = Path(filters) if Path(filters).is_absolute() else ROOT_DIR / filters
+        source_filters = json.loads(filters_path.read_text(encoding="utf-8"))
+    source_filter = resolve_source_filter(source_filters, target_index)
+    if source_filter is None:
+        raise SystemExit(f"No source filter entry matches index={target_index}")
+    for path in files:
+        report = measure_projection(_load_alert_samples(path), source_filter)
+        print(
+            "projection",
+            f"file={path}",
+            f"alerts={report.alerts}",
+            f"full_bytes_per_alert={report.full_bytes_per_alert:.1f}",
+            f"projected_bytes_per_alert={report.projected_bytes_per_alert:.1f}",
+            f"saved_bytes_per_alert={report.saved_bytes_per_alert:.1f}",
+            f"saved_ratio={report.saved_ratio:.3f}",
+        )
+
+
+def push_bench(
+    system_cfg: dict[str, Any],
+    files: list[str],
+    alerts: int,
+    page_sizes: list[int],
+    maxlen: int | None,
+) -> None:
+    redis_cfg = build_receiver_config(system_cfg).redis
+    samples = [alert for path in files for alert in _load_alert_samples(path)]
+    if not samples:
+        raise SystemExit("No alerts loaded from --files")
+    stream = [samples[idx % len(samples)] for idx in range(alerts)]
+    buffer = build_buffer(
+        "list",
+        url=redis_cfg.url,
+        queue_key=f"{redis_cfg.queue_key}:bench",
+        maxlen=maxlen,
+        codec=redis_cfg.codec,
+    )
+    client = buffer.connect()
+    for page_size in page_sizes:
+        report = measure_push(buffer, client, stream, page_size=page_size)
+        print(
+            "push",
+            f"alerts={report.alerts}",
+            f"page_size={report.page_size}",
+            f"maxlen={maxlen or '-'}",
+            f"per_alert_per_s={report.per_alert_rate:.0f}",
+            f"push_many_per_s={report.batched_rate:.0f}",
+            f"speedup={report.batched_rate / max(report.per_alert_rate, 1e-9):.1f}x",
+        )
+
+
+def receiver_bench(
+    system_cfg: dict[str, Any],
+    files: list[str],
+    alerts: int,
+    page_size: int,
+    es_latency_ms: float,
+) -> None:
+    receiver_cfg = build_receiver_config(system_cfg)
+    samples = [alert for path in files for alert in _load_alert_samples(path)]
+    if not samples:
+        raise SystemExit("No alerts loaded from --files")
+    stream = [samples[idx % len(samples)] for idx in range(alerts)]
+    buffer = build_buffer(
+        "list",
+        url=receiver_cfg.redis.url,
+        queue_key=f"{receiver_cfg.redis.queue_key}:bench",
+        codec=receiver_cfg.redis.codec,
+    )
+    for report in measure_receiver_modes(
+        stream,
+        buffer,
+        page_size=page_size,
+        es_latency_s=es_latency_ms / 1000.0,
+        prefetch_pages=receiver_cfg.elastic.prefetch_pages,
+    ):
+        print(
+            "receiver",
+            f"mode={report.mode}",
+            f"pages={report.pages}",
+            f"alerts={report.alerts}",
+            f"es_latency_ms={es_latency_ms:g}",
+            f"elapsed_s={report.elapsed_s:.2f}",
+            f"alerts_per_s={report.alerts_per_s:.0f}",
+        )
+
+
+def codec_report(files: list[str], rounds: int, compression: str | None, min_bytes: int) -> None:
+    compressor = get_compressor(compression)
+    for path in files:
+        alerts = _load_alert_samples(path)
+        for name in available_codecs():
+            try:
+                codec = get_codec(name)
+            except ImportError as exc:
+                print("codec", f"file={path}", f"codec={name}", f"skipped={exc}")
+                continue
+            report = measure_codec(alerts, codec, rounds=rounds, compressor=compressor, min_bytes=min_bytes)
+            print(
+                "codec",
+                f"file={path}",
+                f"codec={report.codec}",
+                f"alerts={report.alerts}",
+                f"bytes_per_alert={report.bytes_per_alert:.1f}",
+                f"encode_us_per_alert={report.encode_us_per_alert:.2f}",
+                f"decode_us_per_alert={report.decode_us_per_alert:.2f}",
+            )
+
+
+def asset_bench(sizes: list[int], lookups: int) -> None:
+    for size in sizes:
+        report = measure_asset_lookup(size, lookups=lookups)
+        print(
+            "asset-lookup",
+            f"entries={report.entries}",
+            f"build_ms={report.build_s * 1000:.1f}",
+            f"indexed_us={report.lookup_us:.2f}",
+            f"linear_us={report.linear_lookup_us:.1f}",
+            f"speedup={report.linear_lookup_us / max(report.lookup_us, 1e-9):.0f}x",
+        )
+
+
+def expiry_bench(bucket_counts: list[int], alerts: int) -> None:
+    for open_buckets in bucket_counts:
+        report = measure_expiry(open_buckets, alerts=alerts)
+        print(
+            "bucket-expiry",
+            f"open_buckets={report.open_buckets}",
+            f"flushes={report.flushes}",
+            f"expired={report.expired}",
+            f"heap_us={report.flush_us:.2f}",
+            f"linear_us={report.linear_flush_us:.1f}",
+            f"speedup={report.linear_flush_us / max(report.flush_us, 1e-9):.0f}x",
+            f"bytes_per_bucket={report.bytes_per_bucket:.0f}",
+        )
+
+
+def partition_bench(files: list[str], worker_counts: list[int], alerts: int, ip_pool: int, span_s: float) -> None:
+    import random
+    from datetime import UTC, datetime, timedelta
+
+    samples = [alert for path in files for alert in _load_alert_samples(path)]
+    # Random sources leave irregular gaps, so some buckets expire mid-replay and others keep growing.
+    rng = random.Random(0)
+    origin = datetime(2024, 1, 1, tzinfo=UTC)
+    replay = []
+    for idx in range(alerts):
+        ip = rng.randrange(ip_pool)
+        replay.append(
+            {
+                **samples[idx % len(samples)],
+                "source.ip": f"10.{ip >> 8 & 255}.{ip & 255}.7",
+                "@timestamp": (origin + timedelta(seconds=idx * span_s / max(alerts, 1))).isoformat(),
+            }
+        )
+    baseline = None
+    for workers in worker_counts:
+        report = measure_partition_scaling(replay, workers)
+        baseline = baseline or report
+        print(
+            "partition",
+            f"workers={report.workers}",
+            f"alerts={report.alerts}",
+            f"buckets={report.buckets}",
+            f"expired={report.expired}",
+            f"partition_s={report.partition_s:.2f}",
+            f"aggregate_s={report.aggregate_s:.2f}",
+            f"alerts_per_s={report.alerts_per_s:.0f}",
+            f"speedup={baseline.aggregate_s / max(report.aggregate_s, 1e-9):.2f}x",
+            f"same_result={report.result_digest == baseline.result_digest}",
+        )
+
+
+def checkpoint_bench(bucket_counts: list[int], dirty_ratio: float) -> None:
+    for open_buckets in bucket_counts:
+        report = measure_window_checkpoint(open_buckets, dirty_ratio=dirty_ratio)
+        print(
+            "window-checkpoint",
+            f"open_buckets={report.open_buckets}",
+            f"dirty={report.dirty_buckets}",
+            f"incremental_ms={report.incremental_s * 1000:.1f}",
+            f"incremental_kb={report.incremental_bytes / 1024:.0f}",
+            f"full_file_ms={report.full_s * 1000:.1f}",
+            f"full_file_kb={report.full_bytes / 1024:.0f}",
+        )
+
+
+def history_migrate(
+    system_cfg: dict[str, Any],
+    check_only: bool,
+    sample: int,
+    from_digest_bits: int | None,
+) -> None:
+    import redis
+    from datetime import UTC, datetime
+
+    cfg = build_module1_config(system_cfg)
+    client = redis.Redis.from_url(cfg.queue.redis_url, decode_responses=False)
+    daily = RedisHistoryStore(
+        key_prefix=cfg.history.key_prefix,
+        history_days=cfg.aggregation.history_days,
+        key_digest_bits=cfg.history.key_digest_bits if from_digest_bits is None else from_digest_bits,
+    )
+    rolling = RollingHistoryStore(
+        key_prefix=cfg.history.key_prefix,
+        history_days=cfg.aggregation.history_days,
+        key_digest_bits=cfg.history.key_digest_bits,
+        debug_keys=cfg.history.debug_keys,
+    )
+    now = datetime.now(UTC)
+    if not check_only:
+        report = migrate_daily_history(client, daily, rolling, now)
+        print(
+            "history-migrate",
+            f"days={report.days}",
+            f"fields={report.fields}",
+            f"elapsed_s={report.elapsed_s:.2f}",
+        )
+    check = check_history_consistency(client, daily, rolling, now, sample_size=sample)
+    print(
+        "history-check",
+        f"checked={check.checked}",
+        f"mismatched={check.mismatched}",
+        f"max_abs_diff={check.max_abs_diff:.6f}",
+    )
+
+
+def history_inspect(system_cfg: dict[str, Any], day: str | None, limit: int) -> None:
+    import redis
+    from datetime import UTC, date, datetime
+
+    cfg = build_module1_config(system_cfg)
+    client = redis.Redis.from_url(cfg.queue.redis_url, decode_responses=False)
+    store = build_history_store(cfg.history, history_days=cfg.aggregation.history_days)
+    inspected = date.fromisoformat(day) if day else datetime.now(UTC).date()
+    for row in top_history_buckets(client, store, inspected, limit=limit):
+        print(
+            "history-inspect",
+            f"day={inspected.isoformat()}",
+            f"count={row.count}",
+            f"field={row.field}",
+            f"bucket_key={row.bucket_key if row.bucket_key is not None else '-'}",
+        )
+
+
+def history_memory(system_cfg: dict[str, Any], buckets: int, days: int, active_ratio: float) -> None:
+    import redis
+
+    cfg = build_module1_config(system_cfg)
+    client = redis.Redis.from_url(cfg.queue.redis_url, decode_responses=False)
+    for report in measure_history_memory(client, cfg.history.key_prefix, buckets, days=days, active_ratio=active_ratio):
+        redis_mb = "n/a" if report.redis_bytes is None else f"{report.redis_bytes / 1024 / 1024:.1f}"
+        print(
+            "history-memory",
+            f"layout={report.layout}",
+            f"buckets={report.buckets}",
+            f"days={report.days}",
+            f"fields={report.fields}",
+            f"field_mb={report.field_bytes / 1024 / 1024:.1f}",
+            f"side_table_mb={report.side_table_bytes / 1024 / 1024:.1f}",
+            f"redis_mb={redis_mb}",
+        )
+
+
+def history_bench(system_cfg: dict[str, Any], snapshots: int, batch_sizes: list[int], buckets: int) -> None:
+    import redis
+
+    cfg = build_module1_config(system_cfg)
+    client = redis.Redis.from_url(cfg.queue.redis_url, decode_responses=False)
+    for batch_size in batch_sizes:
+        for report in measure_history_paths(
+            client,
+            cfg.history.key_prefix,
+            snapshots=snapshots,
+            batch_size=batch_size,
+            buckets=buckets,
+        ):
+            print(
+                "history-bench",
+                f"mode={report.mode}",
+                f"batch_size={report.batch_size}",
+                f"snapshots={report.snapshots}",
+                f"elapsed_s={report.elapsed_s:.2f}",
+                f"us_per_snapshot={report.elapsed_s / max(report.snapshots, 1) * 1e6:.1f}",
+                f"mismatched={report.mismatched}",
+            )
+
+
+def _scanner_uris(count: int) -> list[str]:
+    paths = ["/admin/login.php", "/api/v1/users/{n}", "/static//js/app.{h}.js", "/wp-content/uploads/{n}/{t}"]
+    queries = ["?id={n}&_dc={ts}", "?token={t}&page=1", "?session={h}", "?q=select&ts={ts}", ""]
+    uris = []
+    for idx in range(count):
+        template = paths[idx % len(paths)] + queries[idx % len(queries)]
+        uris.append(
+            template.format(
+                n=100000 + idx,
+                h=f"{idx * 2654435761 % (1 << 64):016x}",
+                t=f"tok{idx:08d}AbCdEfGhIjKlMnOp",
+                ts=1700000000000 + idx,
+            )
+        )
+    return uris
+
+
+def normalize_bench(files: list[str], rounds: int, uri_pool: int) -> None:
+    alerts = [alert for path in files for alert in _load_alert_samples(path)]
+    total = len(alerts) * max(rounds, 1)
+    if uri_pool > 0:
+        uris = _scanner_uris(uri_pool)
+        alerts = [{**alerts[idx % len(alerts)], "uri": uris[idx % len(uris)]} for idx in range(total)]
+        rounds = 1
+    for label, cache_size in (("uncached", 0), ("cached", 65536)):
+        normalizer = AlertNormalizer(uri_cache_size=cache_size)
+        started = time.perf_counter()
+        for _ in range(max(rounds, 1)):
+            for alert in alerts:
+                normalizer.normalize(alert)
+        elapsed_s = time.perf_counter() - started
+        print(
+            "normalize",
+            f"mode={label}",
+            f"alerts={total}",
+            f"elapsed_s={elapsed_s:.2f}",
+            f"alerts_per_s={total / max(elapsed_s, 1e-9):.0f}",
+        )
+
+
 def main() -> None:
     args = build_parser().parse_args()
     system_cfg = load_system_config(args.config)
-    if args.command.startswith("run-"):
+    if args.command.startswith("run-") or args.command in {
+        "backfill",
+        "replay",
+        "push-bench",
+        "receiver-bench",
+        "history-migrate",
+        "history-memory",
+        "history-bench",
+        "history-inspect",
+    }:
         try:
             validate_runtime_connectivity(args.command, system_cfg)
         except ConnectivityError as exc:
@@ -259,7 +852,13 @@ def main() -> None:
         run_receiver(build_receiver_config(system_cfg))
         return
     if args.command == "run-module1":
-        run_module1(build_module1_config(system_cfg))
+        module1_cfg = build_module1_config(system_cfg)
+        if args.workers:
+            module1_cfg = dataclasses.replace(
+                module1_cfg,
+                aggregation=dataclasses.replace(module1_cfg.aggregation, workers=args.workers),
+            )
+        run_module1(module1_cfg)
         return
     if args.command == "run-module2":
         run_module2(build_module2_config(system_cfg))
@@ -280,6 +879,83 @@ def main() -> None:
             f"threshold={summary.threshold:.4f}",
         )
         return
+    if args.command == "projection-report":
+        projection_report(system_cfg, args.files, args.index, args.filters)
+        return
+    if args.command == "replay":
+        report = run_replay(
+            build_receiver_config(system_cfg),
+            paths=args.files,
+            speed=args.speed or None,
+            batch_size=args.batch_size,
+            repeat=args.repeat,
+        )
+        print(
+            "replayed",
+            f"files={report.files}",
+            f"speed={report.speed or 'max'}",
+            f"pages={report.pages}",
+            f"alerts={report.alerts}",
+            f"elapsed_s={report.elapsed_s:.2f}",
+            f"alerts_per_s={report.alerts_per_s:.1f}",
+        )
+        return
+    if args.command == "normalize-bench":
+        normalize_bench(args.files, args.rounds, args.uri_pool)
+        return
+    if args.command == "expiry-bench":
+        expiry_bench(args.buckets, args.alerts)
+        return
+    if args.command == "partition-bench":
+        partition_bench(args.files, args.workers, args.alerts, args.ip_pool, args.span_s)
+        return
+    if args.command == "checkpoint-bench":
+        checkpoint_bench(args.buckets, args.dirty_ratio)
+        return
+    if args.command == "history-migrate":
+        history_migrate(system_cfg, args.check_only, args.sample, args.from_digest_bits)
+        return
+    if args.command == "history-bench":
+        history_bench(system_cfg, args.snapshots, args.batch_sizes, args.buckets)
+        return
+    if args.command == "history-memory":
+        history_memory(system_cfg, args.buckets, args.days, args.active_ratio)
+        return
+    if args.command == "history-inspect":
+        history_inspect(system_cfg, args.day, args.limit)
+        return
+    if args.command == "asset-bench":
+        asset_bench(args.sizes, args.lookups)
+        return
+    if args.command == "push-bench":
+        push_bench(system_cfg, args.files, args.alerts, args.page_sizes, args.maxlen)
+        return
+    if args.command == "receiver-bench":
+        receiver_bench(system_cfg, args.files, args.alerts, args.page_size, args.es_latency_ms)
+        return
+    if args.command == "codec-report":
+        codec_report(args.files, args.rounds, args.compression, args.min_bytes)
+        return
+    if args.command == "backfill":
+        report = run_backfill(
+            build_receiver_config(system_cfg),
+            start_time=args.start,
+            end_time=args.end,
+            workers=args.workers,
+            slices=args.slices,
+        )
+        print(
+            "backfilled",
+            f"range={report.start_time}..{report.end_time}",
+            f"workers={report.workers}",
+            f"slices={report.slices}",
+            f"pages={report.pages}",
+            f"alerts={report.alerts}",
+            f"duplicates={report.duplicates}",
+            f"elapsed_s={report.elapsed_s:.2f}",
+            f"alerts_per_s={report.alerts_per_s:.1f}",
+        )
+        return
 
     raise ValueError(f"Unsupported command: {args.command}")
 
@@ -1,13 +1,46 @@
 from __future__ import annotations
 
+import heapq
+import itertools
 import math
+import random
+import sys
+import time
+import tracemalloc
 from dataclasses import dataclass, field
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
+from typing import Any, Iterable
+
+from module_alert_receiver.fields import compile_path
 
 from .models import AlertBucketSnapshot, NormalizedAlert
 
+# The representative alert only feeds the bucket snapshot; module2 re-fetches full documents by
+# raw_ref_ids, so a bucket keeps this projection rather than a whole (possibly multi-KB) alert.
+REPRESENTATIVE_FIELDS = (
+    "@timestamp",
+    "_id",
+    "_index",
+    "event.id",
+    "event.dataset",
+    "rule.name",
+    "rule.severity",
+    "url.path",
+    "message",
+)
+_REPRESENTATIVE_GETTERS = tuple((path, compile_path(path)) for path in REPRESENTATIVE_FIELDS)
 
-@dataclass
+
+def project_representative(raw: dict[str, Any]) -> dict[str, Any]:
+    projected: dict[str, Any] = {}
+    for path, getter in _REPRESENTATIVE_GETTERS:
+        value = getter(raw)
+        if value is not None:
+            projected[path] = value
+    return projected
+
+
+@dataclass(slots=True)
 class _BucketState:
     bucket_key: str
     sip: str
@@ -38,52 +71,166 @@ class _BucketState:
             self.window_start = alert.timestamp
         if alert.timestamp > self.window_end:
             self.window_end = alert.timestamp
-            self.representative_alert = alert.raw
+            self.representative_alert = project_representative(alert.raw)
         if len(self.raw_ref_ids) < max_ref_ids:
             self.raw_ref_ids.append(alert.raw_id)
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "bucket_key": self.bucket_key,
+            "sip": self.sip,
+            "dip": self.dip,
+            "proto": self.proto,
+            "rule_name": self.rule_name,
+            "log_type": self.log_type,
+            "uri_template": self.uri_template,
+            "window_start": self.window_start.isoformat(),
+            "window_end": self.window_end.isoformat(),
+            "count": self.count,
+            "sum_severity": self.sum_severity,
+            "sum_confidence": self.sum_confidence,
+            "src_external_count": self.src_external_count,
+            "dst_sensitive_count": self.dst_sensitive_count,
+            "representative_alert": self.representative_alert,
+            "raw_ref_ids": self.raw_ref_ids,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "_BucketState":
+        return cls(
+            bucket_key=str(payload["bucket_key"]),
+            sip=sys.intern(str(payload["sip"])),
+            dip=sys.intern(str(payload["dip"])),
+            proto=sys.intern(str(payload["proto"])),
+            rule_name=sys.intern(str(payload["rule_name"])),
+            log_type=sys.intern(str(payload["log_type"])),
+            uri_template=sys.intern(str(payload["uri_template"])),
+            window_start=datetime.fromisoformat(payload["window_start"]),
+            window_end=datetime.fromisoformat(payload["window_end"]),
+            count=int(payload["count"]),
+            sum_severity=float(payload["sum_severity"]),
+            sum_confidence=float(payload["sum_confidence"]),
+            src_external_count=int(payload["src_external_count"]),
+            dst_sensitive_count=int(payload["dst_sensitive_count"]),
+            representative_alert=dict(payload.get("representative_alert") or {}),
+            raw_ref_ids=[str(item) for item in payload.get("raw_ref_ids", [])],
+        )
+
 
 @dataclass
 class LightweightAggregator:
     window_s: int = 300
     max_ref_ids: int = 200
+    max_open_buckets: int | None = None
+    track_changes: bool = False
 
     def __post_init__(self) -> None:
         self._buckets: dict[str, _BucketState] = {}
+        self._early: list[AlertBucketSnapshot] = []
+        self.early_flushed = 0
+        # Bucket keys touched or closed since the last drain_changes(), for incremental checkpoints.
+        self._dirty: set[str] = set()
+        self._closed: set[str] = set()
+        # Lazy-deletion expiry heap of (deadline_ts, seq, state); a bucket is pushed once and only
+        # re-pushed when its entry surfaces with a deadline that later alerts have moved on.
+        self._expiry: list[tuple[float, int, _BucketState]] = []
+        self._seq = itertools.count()
+
+    @property
+    def open_buckets(self) -> int:
+        return len(self._buckets)
 
     def add(self, alert: NormalizedAlert) -> None:
-        state = self._buckets.get(alert.bucket_key)
+        bucket_key = alert.bucket_key
+        state = self._buckets.get(bucket_key)
         if state is None:
+            if self.max_open_buckets and len(self._buckets) >= self.max_open_buckets:
+                self._flush_oldest()
+            # A scanner fanning out over dips repeats the other dimensions in every bucket.
             state = _BucketState(
-                bucket_key=alert.bucket_key,
-                sip=alert.sip,
-                dip=alert.dip,
-                proto=alert.proto,
-                rule_name=alert.rule_name,
-                log_type=alert.log_type,
-                uri_template=alert.uri_template,
+                bucket_key=bucket_key,
+                sip=sys.intern(alert.sip),
+                dip=sys.intern(alert.dip),
+                proto=sys.intern(alert.proto),
+                rule_name=sys.intern(alert.rule_name),
+                log_type=sys.intern(alert.log_type),
+                uri_template=sys.intern(alert.uri_template),
                 window_start=alert.timestamp,
                 window_end=alert.timestamp,
-                representative_alert=alert.raw,
+                representative_alert=project_representative(alert.raw),
             )
-            self._buckets[alert.bucket_key] = state
+            self._buckets[bucket_key] = state
+            self._schedule(state)
         state.add(alert, self.max_ref_ids)
+        if self.track_changes:
+            self._dirty.add(bucket_key)
 
     def flush_expired(self, now: datetime | None = None) -> list[AlertBucketSnapshot]:
-        now_ts = now or datetime.now(UTC)
-        expired_keys: list[str] = []
-        for bucket_key, state in self._buckets.items():
-            idle_seconds = (now_ts - state.window_end).total_seconds()
-            if idle_seconds >= self.window_s:
-                expired_keys.append(bucket_key)
-
-        return [self._to_snapshot(self._buckets.pop(key)) for key in expired_keys]
+        now_ts = (now or datetime.now(UTC)).timestamp()
+        expiry = self._expiry
+        snapshots, self._early = self._early, []
+        while expiry and expiry[0][0] <= now_ts:
+            _deadline, _seq, state = heapq.heappop(expiry)
+            if self._buckets.get(state.bucket_key) is not state:
+                continue
+            if self._deadline(state) > now_ts:
+                self._schedule(state)
+                continue
+            snapshots.append(self._close(state))
+        return snapshots
 
     def force_flush(self) -> list[AlertBucketSnapshot]:
-        snapshots = [self._to_snapshot(state) for state in self._buckets.values()]
-        self._buckets.clear()
+        snapshots, self._early = self._early, []
+        snapshots.extend(self._close(state) for state in list(self._buckets.values()))
+        self._expiry.clear()
         return snapshots
 
+    def export_states(self) -> list[dict[str, Any]]:
+        return [state.to_dict() for state in self._buckets.values()]
+
+    def drain_changes(self) -> tuple[list[dict[str, Any]], list[str]]:
+        upserts = [self._buckets[key].to_dict() for key in self._dirty if key in self._buckets]
+        deletes = [key for key in self._closed if key not in self._buckets]
+        self._dirty = set()
+        self._closed = set()
+        return upserts, deletes
+
+    def restore(self, payloads: Iterable[dict[str, Any]]) -> int:
+        restored = 0
+        for payload in payloads:
+            state = _BucketState.from_dict(payload)
+            self._buckets[state.bucket_key] = state
+            self._schedule(state)
+            restored += 1
+        return restored
+
+    def _close(self, state: _BucketState) -> AlertBucketSnapshot:
+        del self._buckets[state.bucket_key]
+        if self.track_changes:
+            self._closed.add(state.bucket_key)
+        return self._to_snapshot(state)
+
+    def _flush_oldest(self) -> None:
+        # Over the cap, the bucket closest to its deadline is emitted early; it is handed out with
+        # the next flush_expired so the pipeline scores it like any other closed bucket.
+        expiry = self._expiry
+        while expiry:
+            deadline, _seq, state = heapq.heappop(expiry)
+            if self._buckets.get(state.bucket_key) is not state:
+                continue
+            if self._deadline(state) > deadline:
+                self._schedule(state)
+                continue
+            self._early.append(self._close(state))
+            self.early_flushed += 1
+            return
+
+    def _deadline(self, state: _BucketState) -> float:
+        return state.window_end.timestamp() + self.window_s
+
+    def _schedule(self, state: _BucketState) -> None:
+        heapq.heappush(self._expiry, (self._deadline(state), next(self._seq), state))
+
     def _to_snapshot(self, state: _BucketState) -> AlertBucketSnapshot:
         return AlertBucketSnapshot(
             bucket_key=state.bucket_key,
@@ -108,3 +255,94 @@ class LightweightAggregator:
     def normalize_frequency(count: int) -> float:
         # log-scale keeps large bursts bounded without flattening small differences.
         return max(0.0, min(math.log1p(count) / math.log(51), 1.0))
+
+
+@dataclass
+class ExpiryReport:
+    open_buckets: int
+    flushes: int
+    expired: int
+    flush_s: float
+    linear_flushes: int
+    linear_flush_s: float
+    bytes_per_bucket: float
+
+    @property
+    def flush_us(self) -> float:
+        return self.flush_s * 1e6 / max(self.flushes, 1)
+
+    @property
+    def linear_flush_us(self) -> float:
+        return self.linear_flush_s * 1e6 / max(self.linear_flushes, 1)
+
+
+def _synthetic_alert(idx: int, timestamp: datetime, raw: dict[str, Any] | None = None) -> NormalizedAlert:
+    return NormalizedAlert(
+        raw_id=f"bench-{idx}",
+        timestamp=timestamp,
+        sip=f"10.{idx >> 16 & 255}.{idx >> 8 & 255}.{idx & 255}",
+        dip="192.168.0.10",
+        proto="tcp",
+        rule_name="bench-scan",
+        log_type="ids",
+        uri_template="/",
+        severity_score=0.5,
+        confidence_score=0.5,
+        src_external=True,
+        dst_sensitive=False,
+        raw=raw if raw is not None else {},
+    )
+
+
+def measure_expiry(
+    open_buckets: int,
+    alerts: int = 20000,
+    window_s: int = 300,
+    seed: int = 0,
+) -> ExpiryReport:
+    # Open buckets spread over one window, then a live stream that refreshes random buckets and
+    # flushes after every alert, as the pipeline did before flush_interval_s was honoured.
+    rng = random.Random(seed)
+    origin = datetime(2024, 1, 1, tzinfo=UTC)
+    aggregator = LightweightAggregator(window_s=window_s)
+    tracemalloc.start()
+    for idx in range(open_buckets):
+        timestamp = origin + timedelta(seconds=window_s * idx / max(open_buckets, 1))
+        raw = {
+            "_id": f"bench-{idx}",
+            "@timestamp": timestamp.isoformat(),
+            "rule": {"name": "bench-scan", "severity": "high"},
+            "url": {"path": "/"},
+            "http": {"request": {"body": {"content": f"probe {idx} " * 64}}},
+        }
+        aggregator.add(_synthetic_alert(idx, timestamp, raw))
+    bytes_per_bucket = tracemalloc.get_traced_memory()[0] / max(open_buckets, 1)
+    tracemalloc.stop()
+
+    step = timedelta(seconds=window_s / max(alerts, 1))
+    now = origin + timedelta(seconds=window_s)
+    expired = 0
+    start = time.perf_counter()
+    for _ in range(alerts):
+        now += step
+        aggregator.add(_synthetic_alert(rng.randrange(max(open_buckets, 1)), now))
+        expired += len(aggregator.flush_expired(now=now))
+    flush_s = time.perf_counter() - start
+
+    # Reference: the previous full scan over open buckets, on a sample small enough to finish quickly.
+    buckets = list(aggregator._buckets.values())
+    linear_flushes = max(1, min(alerts, 5_000_000 // max(len(buckets), 1)))
+    start = time.perf_counter()
+    for _ in range(linear_flushes):
+        [state for state in buckets if (now - state.window_end).total_seconds() >= window_s]
+    linear_flush_s = time.perf_counter() - start
+
+    return ExpiryReport(
+        open_buckets=open_buckets,
+        flushes=alerts,
+        expired=expired,
+        flush_s=flush_s,
+        linear_flushes=linear_flushes,
+        linear_flush_s=linear_flush_s,
+        bytes_per_bucket=bytes_per_bucket,
+    )
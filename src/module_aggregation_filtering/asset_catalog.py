@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import ipaddress
 import json
+import random
+import time
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -17,12 +20,37 @@ class AssetProfile:
 @dataclass
 class AssetCatalog:
     entries: list[dict[str, Any]]
+    cache_size: int = 65536
+
+    def __post_init__(self) -> None:
+        self._exact: dict[str, dict[str, Any]] = {}
+        # version -> [(prefixlen, {network_int: row})], longest prefix first.
+        self._prefixes: dict[int, list[tuple[int, dict[int, dict[str, Any]]]]] = {4: [], 6: []}
+        by_length: dict[tuple[int, int], dict[int, dict[str, Any]]] = {}
+        for row in self.entries:
+            row_ip = row.get("ip")
+            if isinstance(row_ip, str):
+                self._exact.setdefault(row_ip, row)
+            row_cidr = row.get("cidr")
+            if isinstance(row_cidr, str):
+                try:
+                    network = ipaddress.ip_network(row_cidr, strict=False)
+                except ValueError:
+                    continue
+                table = by_length.setdefault((network.version, network.prefixlen), {})
+                table.setdefault(int(network.network_address), row)
+        for (version, prefixlen), table in sorted(by_length.items(), key=lambda item: -item[0][1]):
+            self._prefixes[version].append((prefixlen, table))
+        if self.cache_size > 0:
+            self._resolve_cached = lru_cache(maxsize=self.cache_size)(self._resolve)
+        else:
+            self._resolve_cached = self._resolve
 
     @classmethod
-    def from_json_file(cls, path: str) -> "AssetCatalog":
+    def from_json_file(cls, path: str, cache_size: int = 65536) -> "AssetCatalog":
         file_path = Path(path)
         if not file_path.exists():
-            return cls(entries=[])
+            return cls(entries=[], cache_size=cache_size)
         raw = json.loads(file_path.read_text(encoding="utf-8"))
         if isinstance(raw, dict):
             rows = raw.get("assets", [])
@@ -30,29 +58,17 @@ class AssetCatalog:
             rows = raw
         else:
             rows = []
-        return cls(entries=[row for row in rows if isinstance(row, dict)])
+        return cls(entries=[row for row in rows if isinstance(row, dict)], cache_size=cache_size)
 
     def resolve(self, ip_text: str) -> AssetProfile:
+        return self._resolve_cached(ip_text)
+
+    def _resolve(self, ip_text: str) -> AssetProfile:
         ip_obj = self._to_ip(ip_text)
         if ip_obj is None:
             return AssetProfile()
 
-        direct_match: dict[str, Any] | None = None
-        cidr_match: dict[str, Any] | None = None
-        for row in self.entries:
-            row_ip = row.get("ip")
-            if isinstance(row_ip, str) and row_ip == ip_text:
-                direct_match = row
-                break
-            row_cidr = row.get("cidr")
-            if isinstance(row_cidr, str) and cidr_match is None:
-                try:
-                    if ip_obj in ipaddress.ip_network(row_cidr, strict=False):
-                        cidr_match = row
-                except ValueError:
-                    continue
-
-        matched = direct_match or cidr_match
+        matched = self._exact.get(ip_text) or self._longest_prefix_match(ip_obj)
         if matched is None:
             return self._default_profile(ip_obj)
         return AssetProfile(
@@ -61,6 +77,16 @@ class AssetCatalog:
             sensitive=bool(matched.get("sensitive", False)),
         )
 
+    def _longest_prefix_match(self, ip_obj: Any) -> dict[str, Any] | None:
+        ip_int = int(ip_obj)
+        max_bits = ip_obj.max_prefixlen
+        for prefixlen, table in self._prefixes[ip_obj.version]:
+            host_bits = max_bits - prefixlen
+            row = table.get(ip_int >> host_bits << host_bits)
+            if row is not None:
+                return row
+        return None
+
     def _default_profile(self, ip_obj: Any) -> AssetProfile:
         if ip_obj.is_private:
             return AssetProfile(criticality=0.45, exposure=0.2, sensitive=False)
@@ -78,3 +104,76 @@ class AssetCatalog:
         except (TypeError, ValueError):
             numeric = 0.0
         return max(0.0, min(numeric, 1.0))
+
+
+@dataclass(frozen=True)
+class AssetLookupReport:
+    entries: int
+    lookups: int
+    build_s: float
+    lookup_s: float
+    linear_lookups: int
+    linear_lookup_s: float
+
+    @property
+    def lookup_us(self) -> float:
+        return self.lookup_s * 1e6 / max(self.lookups, 1)
+
+    @property
+    def linear_lookup_us(self) -> float:
+        return self.linear_lookup_s * 1e6 / max(self.linear_lookups, 1)
+
+
+def synthetic_asset_rows(size: int, seed: int = 0) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    rows: list[dict[str, Any]] = []
+    for idx in range(size):
+        base = (10 << 24) | rng.getrandbits(24)
+        if idx % 2 == 0:
+            rows.append({"ip": str(ipaddress.IPv4Address(base)), "criticality": 0.9})
+        elif idx % 10 == 1:
+            prefix = rng.randint(32, 64)
+            network = ipaddress.IPv6Network(((0x20010DB8 << 96) | rng.getrandbits(96), prefix), strict=False)
+            rows.append({"cidr": str(network), "criticality": 0.6})
+        else:
+            prefix = rng.randint(16, 30)
+            network = ipaddress.IPv4Network((base, prefix), strict=False)
+            rows.append({"cidr": str(network), "criticality": 0.7, "sensitive": prefix >= 28})
+    return rows
+
+
+def measure_asset_lookup(size: int, lookups: int = 20000, seed: int = 0) -> AssetLookupReport:
+    rows = synthetic_asset_rows(size, seed=seed)
+    rng = random.Random(seed + 1)
+    ips = [str(ipaddress.IPv4Address((10 << 24) | rng.getrandbits(24))) for _ in range(lookups)]
+
+    start = time.perf_counter()
+    catalog = AssetCatalog(entries=rows, cache_size=0)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for ip_text in ips:
+        catalog.resolve(ip_text)
+    lookup_s = time.perf_counter() - start
+
+    # Reference: the previous per-lookup scan, on a sample small enough to finish quickly.
+    linear_ips = ips[: max(1, min(lookups, 2_000_000 // max(size, 1)))]
+    start = time.perf_counter()
+    for ip_text in linear_ips:
+        ip_obj = ipaddress.ip_address(ip_text)
+        for row in rows:
+            if row.get("ip") == ip_text:
+                break
+            row_cidr = row.get("cidr")
+            if isinstance(row_cidr, str) and ip_obj in ipaddress.ip_network(row_cidr, strict=False):
+                break
+    linear_lookup_s = time.perf_counter() - start
+
+    return AssetLookupReport(
+        entries=size,
+        lookups=len(ips),
+        build_s=build_s,
+        lookup_s=lookup_s,
+        linear_lookups=len(linear_ips),
+        linear_lookup_s=linear_lookup_s,
+    )
@@ -12,11 +12,26 @@ class QueueConfig:
     suppressed_key: str = "socrates:alerts:suppressed"
     output_maxlen: int | None = None
     suppressed_maxlen: int | None = None
+    backend: str = "list"
+    consumer_group: str = "module1"
+    consumer_name: str | None = None
+    claim_idle_ms: int = 60000
+    codec: str = "json"
+    compression: str | None = None
+    compression_min_bytes: int = 1024
+    output_high_watermark: int | None = None
+    output_low_watermark: int | None = None
+    overflow_policy: str = "block"
+    output_spill_key: str | None = None
+    max_stall_s: float = 30.0
+    processing_key: str | None = None
 
     @classmethod
     def from_env(cls) -> "QueueConfig":
         output_maxlen_env = getenv("AGGR_OUTPUT_MAXLEN", "")
         suppressed_maxlen_env = getenv("AGGR_SUPPRESSED_MAXLEN", "")
+        high_env = getenv("AGGR_OUTPUT_HIGH_WATERMARK", "")
+        low_env = getenv("AGGR_OUTPUT_LOW_WATERMARK", "")
         return cls(
             redis_url=getenv("AGGR_REDIS_URL", cls.redis_url),
             input_key=getenv("AGGR_INPUT_KEY", cls.input_key),
@@ -24,6 +39,19 @@ class QueueConfig:
             suppressed_key=getenv("AGGR_SUPPRESSED_KEY", cls.suppressed_key),
             output_maxlen=int(output_maxlen_env) if output_maxlen_env else None,
             suppressed_maxlen=int(suppressed_maxlen_env) if suppressed_maxlen_env else None,
+            backend=getenv("AGGR_QUEUE_BACKEND", cls.backend),
+            consumer_group=getenv("AGGR_CONSUMER_GROUP", cls.consumer_group),
+            consumer_name=getenv("AGGR_CONSUMER_NAME", "") or None,
+            claim_idle_ms=int(getenv("AGGR_CLAIM_IDLE_MS", str(cls.claim_idle_ms))),
+            codec=getenv("AGGR_QUEUE_CODEC", cls.codec),
+            compression=getenv("AGGR_QUEUE_COMPRESSION", "") or None,
+            compression_min_bytes=int(getenv("AGGR_COMPRESSION_MIN_BYTES", str(cls.compression_min_bytes))),
+            output_high_watermark=int(high_env) if high_env else None,
+            output_low_watermark=int(low_env) if low_env else None,
+            overflow_policy=getenv("AGGR_OVERFLOW_POLICY", cls.overflow_policy),
+            output_spill_key=getenv("AGGR_OUTPUT_SPILL_KEY", "") or None,
+            max_stall_s=float(getenv("AGGR_MAX_STALL_S", str(cls.max_stall_s))),
+            processing_key=getenv("AGGR_PROCESSING_KEY", "") or None,
         )
 
 
@@ -32,17 +60,26 @@ class AggregationConfig:
     window_s: int = 300
     flush_interval_s: float = 1.0
     pop_timeout_s: int = 1
+    pop_batch_size: int = 100
     max_ref_ids: int = 200
     history_days: int = 14
+    uri_cache_size: int = 65536
+    max_open_buckets: int | None = None
+    workers: int = 1
 
     @classmethod
     def from_env(cls) -> "AggregationConfig":
+        max_open_buckets_env = getenv("AGGR_MAX_OPEN_BUCKETS", "")
         return cls(
             window_s=int(getenv("AGGR_WINDOW_S", str(cls.window_s))),
             flush_interval_s=float(getenv("AGGR_FLUSH_INTERVAL_S", str(cls.flush_interval_s))),
             pop_timeout_s=int(getenv("AGGR_POP_TIMEOUT_S", str(cls.pop_timeout_s))),
+            pop_batch_size=int(getenv("AGGR_POP_BATCH_SIZE", str(cls.pop_batch_size))),
             max_ref_ids=int(getenv("AGGR_MAX_REF_IDS", str(cls.max_ref_ids))),
             history_days=int(getenv("AGGR_HISTORY_DAYS", str(cls.history_days))),
+            uri_cache_size=int(getenv("AGGR_URI_CACHE_SIZE", str(cls.uri_cache_size))),
+            max_open_buckets=int(max_open_buckets_env) if max_open_buckets_env else None,
+            workers=int(getenv("AGGR_WORKERS", str(cls.workers))),
         )
 
 
@@ -68,19 +105,48 @@ class ScoringConfig:
 @dataclass(frozen=True)
 class AssetConfig:
     table_path: str = "config/assets_static.json"
+    cache_size: int = 65536
 
     @classmethod
     def from_env(cls) -> "AssetConfig":
-        return cls(table_path=getenv("AGGR_ASSET_TABLE_PATH", cls.table_path))
+        return cls(
+            table_path=getenv("AGGR_ASSET_TABLE_PATH", cls.table_path),
+            cache_size=int(getenv("AGGR_ASSET_CACHE_SIZE", str(cls.cache_size))),
+        )
 
 
 @dataclass(frozen=True)
 class HistoryConfig:
     key_prefix: str = "socrates:aggr:hist"
+    mode: str = "daily"
+    key_digest_bits: int = 0
+    debug_keys: bool = False
 
     @classmethod
     def from_env(cls) -> "HistoryConfig":
-        return cls(key_prefix=getenv("AGGR_HISTORY_PREFIX", cls.key_prefix))
+        return cls(
+            key_prefix=getenv("AGGR_HISTORY_PREFIX", cls.key_prefix),
+            mode=getenv("AGGR_HISTORY_MODE", cls.mode),
+            key_digest_bits=int(getenv("AGGR_HISTORY_DIGEST_BITS", str(cls.key_digest_bits))),
+            debug_keys=getenv("AGGR_HISTORY_DEBUG_KEYS", "false").strip().lower() in ("1", "true", "yes"),
+        )
+
+
+@dataclass(frozen=True)
+class WindowCheckpointConfig:
+    backend: str | None = None
+    key: str = "socrates:aggr:windows"
+    path: str = "data/module1_windows.json"
+    interval_s: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> "WindowCheckpointConfig":
+        return cls(
+            backend=getenv("AGGR_CHECKPOINT_BACKEND", "") or None,
+            key=getenv("AGGR_CHECKPOINT_KEY", cls.key),
+            path=getenv("AGGR_CHECKPOINT_PATH", cls.path),
+            interval_s=float(getenv("AGGR_CHECKPOINT_INTERVAL_S", str(cls.interval_s))),
+        )
 
 
 @dataclass(frozen=True)
@@ -90,6 +156,7 @@ class Module1Config:
     scoring: ScoringConfig
     asset: AssetConfig
     history: HistoryConfig
+    checkpoint: WindowCheckpointConfig
 
     @classmethod
     def from_env(cls) -> "Module1Config":
@@ -99,4 +166,5 @@ class Module1Config:
             scoring=ScoringConfig.from_env(),
             asset=AssetConfig.from_env(),
             history=HistoryConfig.from_env(),
+            checkpoint=WindowCheckpointConfig.from_env(),
         )
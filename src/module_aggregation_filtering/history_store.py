@@ -1,60 +1,886 @@
 from __future__ import annotations
 
+import hashlib
+import heapq
+import random
+import time
 from dataclasses import dataclass
-from datetime import UTC, datetime, timedelta
-from typing import Any
+from datetime import UTC, date, datetime, timedelta
+from typing import Any, Iterable
+
+from .config import HistoryConfig
+
+KEY_DIGEST_BITS = (0, 64, 128)
 
 
 @dataclass
 class RedisHistoryStore:
     key_prefix: str
     history_days: int = 14
+    key_digest_bits: int = 0
+    debug_keys: bool = False
+
+    def __post_init__(self) -> None:
+        if self.key_digest_bits not in KEY_DIGEST_BITS:
+            raise ValueError(f"Unsupported key_digest_bits: {self.key_digest_bits}")
 
     @property
     def _days_index_key(self) -> str:
         return f"{self.key_prefix}:days"
 
+    @property
+    def _debug_keys_key(self) -> str:
+        return f"{self.key_prefix}:keys"
+
+    def bucket_field(self, bucket_key: str) -> str | bytes:
+        # A fixed 8/16-byte digest replaces the full key (URI templates of up to 2 KB) as the hash
+        # field. At 64 bits the odds of any collision stay below 1e-7 for a million live buckets.
+        if not self.key_digest_bits:
+            return bucket_key
+        return hashlib.blake2b(bucket_key.encode("utf-8"), digest_size=self.key_digest_bits // 8).digest()
+
+    def resolve_bucket_keys(self, redis_client: Any, fields: list[str | bytes]) -> list[str | None]:
+        # Digests map back to bucket keys only through the debug_keys side table.
+        if not self.key_digest_bits:
+            return [self._day_text(field) for field in fields]
+        if not fields:
+            return []
+        return [None if key is None else self._day_text(key) for key in redis_client.hmget(self._debug_keys_key, fields)]
+
     def get_14d_daily_avg(self, redis_client: Any, bucket_key: str, now: datetime) -> float:
-        start_day = datetime(now.year, now.month, now.day, tzinfo=UTC) - timedelta(days=self.history_days - 1)
+        return self.get_daily_avgs(redis_client, [bucket_key], now)[0]
+
+    def get_daily_avgs(self, redis_client: Any, bucket_keys: list[str], now: datetime) -> list[float]:
+        return self._field_avgs(redis_client, [self.bucket_field(bucket_key) for bucket_key in bucket_keys], now)
+
+    def _field_avgs(self, redis_client: Any, bucket_keys: list[str | bytes], now: datetime) -> list[float]:
+        if not bucket_keys:
+            return []
+        pipe = redis_client.pipeline()
+        day_keys = self._queue_read(pipe, bucket_keys, now)
+        return self._read_avgs(day_keys, pipe.execute(), len(bucket_keys))
+
+    def _queue_read(self, pipe: Any, fields: list[str | bytes], now: datetime) -> list[str]:
+        # The days index read and one HMGET per calendar day of the window go out together, so
+        # the divisor is the live day count rather than a cached copy of the index.
         end_day = datetime(now.year, now.month, now.day, tzinfo=UTC)
-        day_keys = redis_client.zrangebyscore(
+        day_keys = [(end_day - timedelta(days=offset)).date().isoformat() for offset in range(self.history_days)]
+        pipe.zrangebyscore(
             self._days_index_key,
-            min=start_day.timestamp(),
+            min=(end_day - timedelta(days=self.history_days - 1)).timestamp(),
             max=end_day.timestamp(),
         )
-        if not day_keys:
-            return 0.0
-
-        pipe = redis_client.pipeline()
         for day_key in day_keys:
-            pipe.hget(self._daily_hash_key(day_key), bucket_key)
-        values = pipe.execute()
-        total = sum(int(value or 0) for value in values)
-        return total / max(len(day_keys), 1)
+            pipe.hmget(self._daily_hash_key(day_key), fields)
+        return day_keys
+
+    def _read_avgs(self, day_keys: list[str], results: list[Any], size: int) -> list[float]:
+        indexed = {self._day_text(day_key) for day_key in results[0]}
+        if not indexed:
+            return [0.0] * size
+        totals = [0] * size
+        for day_key, values in zip(day_keys, results[1 : 1 + len(day_keys)]):
+            if day_key not in indexed:
+                continue
+            for idx, value in enumerate(values):
+                totals[idx] += int(value or 0)
+        return [total / len(indexed) for total in totals]
 
     def record(self, redis_client: Any, bucket_key: str, count: int, event_time: datetime) -> None:
-        day_key = event_time.date().isoformat()
-        day_epoch = datetime(event_time.year, event_time.month, event_time.day, tzinfo=UTC).timestamp()
-        hash_key = self._daily_hash_key(day_key)
+        self.record_many(redis_client, [(bucket_key, count, event_time)])
 
+    def read_and_record(
+        self,
+        redis_client: Any,
+        records: Iterable[tuple[str, int, datetime]],
+        now: datetime,
+    ) -> list[float]:
+        # Reads, writes and the prune share one pipeline; the reads run first, so averages see
+        # history as it stood before these records.
+        records = list(records)
+        if not records:
+            return []
+        fields = [self.bucket_field(bucket_key) for bucket_key, _count, _ts in records]
         pipe = redis_client.pipeline()
-        pipe.hincrby(hash_key, bucket_key, count)
-        pipe.zadd(self._days_index_key, {day_key: day_epoch})
-        pipe.expire(hash_key, int((self.history_days + 2) * 86400))
+        day_keys = self._queue_read(pipe, fields, now)
+        self.queue_record_many(redis_client, pipe, records)
+        return self._read_avgs(day_keys, pipe.execute(), len(fields))
+
+    def record_many(self, redis_client: Any, records: Iterable[tuple[str, int, datetime]]) -> None:
+        records = list(records)
+        if not records:
+            return
+        pipe = redis_client.pipeline()
+        self.queue_record_many(redis_client, pipe, records)
         pipe.execute()
 
-        self._prune_old_days(redis_client, event_time)
+    def queue_record_many(self, redis_client: Any, pipe: Any, records: Iterable[tuple[str, int, datetime]]) -> None:
+        # Queues the writes into the caller's pipeline, which may be a MULTI shared with other
+        # commands. Nothing here reads Redis or changes local state before that pipeline runs.
+        records = list(records)
+        if not records:
+            return
+        days: dict[str, float] = {}
+        for bucket_key, count, event_time in records:
+            day_key = event_time.date().isoformat()
+            if day_key not in days:
+                days[day_key] = datetime(event_time.year, event_time.month, event_time.day, tzinfo=UTC).timestamp()
+            pipe.hincrby(self._daily_hash_key(day_key), self.bucket_field(bucket_key), count)
+        self._queue_debug_keys(pipe, [bucket_key for bucket_key, _count, _event_time in records])
+        pipe.zadd(self._days_index_key, days)
+        for day_key in days:
+            pipe.expire(self._daily_hash_key(day_key), int((self.history_days + 2) * 86400))
+
+        self._queue_prune(pipe, max(event_time for _key, _count, event_time in records))
 
-    def _prune_old_days(self, redis_client: Any, now: datetime) -> None:
+    def _queue_prune(self, pipe: Any, now: datetime) -> None:
+        # Queued blind with every write batch instead of reading the index first. The newest days
+        # past the cutoff are deleted eagerly; any older hash still carries the TTL set above.
         cutoff = datetime(now.year, now.month, now.day, tzinfo=UTC) - timedelta(days=self.history_days)
-        stale_days = redis_client.zrangebyscore(self._days_index_key, min="-inf", max=cutoff.timestamp())
-        if not stale_days:
+        pipe.zremrangebyscore(self._days_index_key, min="-inf", max=cutoff.timestamp())
+        pipe.delete(*(self._daily_hash_key((cutoff - timedelta(days=offset)).date().isoformat()) for offset in range(3)))
+
+    def _queue_debug_keys(self, pipe: Any, bucket_keys: list[str]) -> None:
+        if not (self.debug_keys and self.key_digest_bits):
             return
+        pipe.hset(self._debug_keys_key, mapping={self.bucket_field(bucket_key): bucket_key for bucket_key in bucket_keys})
+        pipe.expire(self._debug_keys_key, int((self.history_days + 2) * 86400))
+
+    def _daily_hash_key(self, day_key: str | bytes) -> str:
+        return f"{self.key_prefix}:{self._day_text(day_key)}"
+
+    @staticmethod
+    def _day_text(day_key: str | bytes) -> str:
+        # The shared queue client returns raw bytes (decode_responses=False).
+        if isinstance(day_key, bytes):
+            return day_key.decode("utf-8")
+        return day_key
+
+
+# Running-sum layout: <prefix>:rolling:sum holds each bucket's total over the window, and
+# <prefix>:rolling:<day> keeps that day's counts so the rollover can subtract them again.
+ROLLING_RECORD_LUA = """
+-- KEYS: sum hash, day hash, days index, meta hash
+-- ARGV: day key, day epoch, latest accepted day epoch, then bucket/count pairs
+local window_start = redis.call('HGET', KEYS[4], 'window_start')
+if window_start and tonumber(ARGV[2]) < tonumber(window_start) then
+  return 0
+end
+if tonumber(ARGV[2]) > tonumber(ARGV[3]) then
+  return 0
+end
+for i = 4, #ARGV, 2 do
+  redis.call('HINCRBY', KEYS[2], ARGV[i], ARGV[i + 1])
+  redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('ZADD', KEYS[3], ARGV[2], ARGV[1])
+return 1
+"""
+
+ROLLING_READ_LUA = """
+-- KEYS: sum hash, days index, retiring days
+-- ARGV: window start epoch, window end epoch, day hash key prefix, then fields
+-- The day count and the sums come from one atomic read. Counts of days outside the window, and
+-- whatever a retiring day still holds, are taken back out of the running sum.
+local result = {redis.call('ZCOUNT', KEYS[2], ARGV[1], ARGV[2])}
+if result[1] == 0 then
+  return result
+end
+local outside = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', '(' .. ARGV[1])
+for _, day in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '(' .. ARGV[2], '+inf')) do
+  outside[#outside + 1] = day
+end
+for _, day in ipairs(redis.call('ZRANGE', KEYS[3], 0, -1)) do
+  outside[#outside + 1] = day
+end
+for offset = 4, #ARGV, 1000 do
+  local last = math.min(offset + 999, #ARGV)
+  local totals = {}
+  for i, value in ipairs(redis.call('HMGET', KEYS[1], unpack(ARGV, offset, last))) do
+    totals[i] = value and tonumber(value) or 0
+  end
+  for _, day in ipairs(outside) do
+    local values = redis.call('HMGET', ARGV[3] .. day, unpack(ARGV, offset, last))
+    for i = 1, last - offset + 1 do
+      if values[i] then
+        totals[i] = totals[i] - tonumber(values[i])
+      end
+    end
+  end
+  for i = 1, last - offset + 1 do
+    result[offset - 3 + i] = totals[i]
+  end
+end
+return result
+"""
+
+ROLLING_RETIRE_LUA = """
+-- KEYS: days index, retiring days, meta hash
+-- ARGV: cutoff epoch (first day kept)
+-- Moves the days before the cutoff to the retiring set and returns every day still retiring.
+local window_start = redis.call('HGET', KEYS[3], 'window_start')
+if not window_start or tonumber(window_start) < tonumber(ARGV[1]) then
+  local stale = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1], 'WITHSCORES')
+  for i = 1, #stale, 2 do
+    redis.call('ZADD', KEYS[2], stale[i + 1], stale[i])
+  end
+  redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1])
+  redis.call('HSET', KEYS[3], 'window_start', ARGV[1])
+end
+return redis.call('ZRANGE', KEYS[2], 0, -1)
+"""
+
+ROLLING_RETIRE_CHUNK_LUA = """
+-- KEYS: sum hash, day hash, retiring days
+-- ARGV: day key, then fields
+-- Each count is read here rather than passed in, so two workers retiring the same chunk subtract
+-- it once. The day leaves the retiring set when its hash is empty.
+for i = 2, #ARGV do
+  local count = redis.call('HGET', KEYS[2], ARGV[i])
+  if count then
+    if redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(count)) <= 0 then
+      redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+    redis.call('HDEL', KEYS[2], ARGV[i])
+  end
+end
+if redis.call('EXISTS', KEYS[2]) == 0 then
+  redis.call('ZREM', KEYS[3], ARGV[1])
+  return 1
+end
+return 0
+"""
+
+
+@dataclass
+class RollingHistoryStore(RedisHistoryStore):
+    retire_chunk_size: int = 1000
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._rolled_cutoff: date | None = None
+        self._scripts: dict[str, Any] = {}
+
+    @property
+    def _days_index_key(self) -> str:
+        return f"{self.key_prefix}:rolling:days"
+
+    @property
+    def _retiring_key(self) -> str:
+        return f"{self.key_prefix}:rolling:retiring"
+
+    @property
+    def _sum_key(self) -> str:
+        return f"{self.key_prefix}:rolling:sum"
+
+    @property
+    def _meta_key(self) -> str:
+        return f"{self.key_prefix}:rolling:meta"
+
+    def _field_avgs(self, redis_client: Any, bucket_keys: list[str | bytes], now: datetime) -> list[float]:
+        if not bucket_keys:
+            return []
+        self.rollover(redis_client, now)
+        end_day = datetime(now.year, now.month, now.day, tzinfo=UTC).timestamp()
+        start_day = end_day - (self.history_days - 1) * 86400
+        day_count, *totals = self._script(redis_client, ROLLING_READ_LUA)(
+            keys=[self._sum_key, self._days_index_key, self._retiring_key],
+            args=[int(start_day), int(end_day), f"{self.key_prefix}:rolling:", *bucket_keys],
+            client=redis_client,
+        )
+        if not day_count:
+            return [0.0] * len(bucket_keys)
+        return [int(total) / int(day_count) for total in totals]
+
+    def read_and_record(
+        self,
+        redis_client: Any,
+        records: Iterable[tuple[str, int, datetime]],
+        now: datetime,
+    ) -> list[float]:
+        records = list(records)
+        avgs = self.get_daily_avgs(redis_client, [bucket_key for bucket_key, _count, _ts in records], now)
+        self.record_many(redis_client, records)
+        return avgs
+
+    def record_many(self, redis_client: Any, records: Iterable[tuple[str, int, datetime]]) -> None:
+        records = list(records)
+        if not records:
+            return
+        pipe = redis_client.pipeline()
+        self.queue_record_many(redis_client, pipe, records)
+        pipe.execute()
+
+    def queue_record_many(self, redis_client: Any, pipe: Any, records: Iterable[tuple[str, int, datetime]]) -> None:
+        by_day: dict[str, dict[str | bytes, int]] = {}
+        bucket_keys: list[str] = []
+        for bucket_key, count, event_time in records:
+            field = self.bucket_field(bucket_key)
+            day_counts = by_day.setdefault(event_time.date().isoformat(), {})
+            day_counts[field] = day_counts.get(field, 0) + int(count)
+            bucket_keys.append(bucket_key)
+        if not by_day:
+            return
+        # Days after today are dropped, so a skewed sensor clock cannot park counts in the sum.
+        today = datetime.now(UTC)
+        for day_key, day_counts in by_day.items():
+            self._queue_record(redis_client, pipe, day_key, day_counts, today)
+        self._queue_debug_keys(pipe, bucket_keys)
+
+    def rollover(self, redis_client: Any, now: datetime) -> int:
+        # Idempotent, so every worker may call it; each one does so once per day. Stale days move
+        # to the retiring set in one step, then leave the sum in retire_chunk_size HSCAN slices so
+        # no script walks a whole day. Reads subtract whatever a retiring day still holds.
+        cutoff = datetime(now.year, now.month, now.day, tzinfo=UTC) - timedelta(days=self.history_days - 1)
+        if self._rolled_cutoff is not None and cutoff.date() <= self._rolled_cutoff:
+            return 0
+        retiring = self._script(redis_client, ROLLING_RETIRE_LUA)(
+            keys=[self._days_index_key, self._retiring_key, self._meta_key],
+            args=[int(cutoff.timestamp())],
+            client=redis_client,
+        )
+        for day_key in retiring:
+            fields: list[bytes] = []
+            for field, _count in redis_client.hscan_iter(self._daily_hash_key(day_key), count=self.retire_chunk_size):
+                fields.append(field)
+                if len(fields) >= self.retire_chunk_size:
+                    self._retire_chunk(redis_client, day_key, fields)
+                    fields = []
+            self._retire_chunk(redis_client, day_key, fields)
+        self._rolled_cutoff = cutoff.date()
+        return len(retiring)
+
+    def _retire_chunk(self, redis_client: Any, day_key: str | bytes, fields: list[bytes]) -> None:
+        self._script(redis_client, ROLLING_RETIRE_CHUNK_LUA)(
+            keys=[self._sum_key, self._daily_hash_key(day_key), self._retiring_key],
+            args=[self._day_text(day_key), *fields],
+            client=redis_client,
+        )
+
+    def _daily_hash_key(self, day_key: str | bytes) -> str:
+        return f"{self.key_prefix}:rolling:{self._day_text(day_key)}"
+
+    def reset(self, redis_client: Any, window_start: datetime) -> None:
+        day_keys = redis_client.zrangebyscore(self._days_index_key, min="-inf", max="+inf")
+        day_keys += redis_client.zrange(self._retiring_key, 0, -1)
         pipe = redis_client.pipeline()
-        for day_key in stale_days:
+        for day_key in day_keys:
             pipe.delete(self._daily_hash_key(day_key))
-        pipe.zremrangebyscore(self._days_index_key, min="-inf", max=cutoff.timestamp())
+        pipe.delete(self._sum_key, self._days_index_key, self._retiring_key)
+        pipe.hset(self._meta_key, "window_start", int(window_start.timestamp()))
         pipe.execute()
+        self._rolled_cutoff = window_start.date()
+
+    def _queue_record(
+        self,
+        redis_client: Any,
+        pipe: Any,
+        day_key: str,
+        day_counts: dict[str | bytes, int],
+        now: datetime,
+    ) -> None:
+        day = date.fromisoformat(day_key)
+        args: list[Any] = [
+            day_key,
+            int(datetime(day.year, day.month, day.day, tzinfo=UTC).timestamp()),
+            int(datetime(now.year, now.month, now.day, tzinfo=UTC).timestamp()),
+        ]
+        for field, count in day_counts.items():
+            args.extend((field, count))
+        self._script(redis_client, ROLLING_RECORD_LUA)(
+            keys=[self._sum_key, self._daily_hash_key(day_key), self._days_index_key, self._meta_key],
+            args=args,
+            client=pipe,
+        )
+
+    def _script(self, redis_client: Any, source: str) -> Any:
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = redis_client.register_script(source)
+        return script
+
+
+# Same key layout as RedisHistoryStore. The script derives day hash names from the prefix in ARGV,
+# so like the rolling scripts it assumes a single (non-cluster) Redis.
+SCRIPTED_HISTORY_LUA = """
+-- KEYS: days index
+-- ARGV: day hash key prefix, window start epoch, window end epoch, ttl seconds, prune cutoff epoch,
+--       n, n fields to read, then per day to record: day key, day epoch, field count, field/count pairs
+local n = tonumber(ARGV[6])
+local result = {0}
+if n > 0 then
+  local days = redis.call('ZRANGEBYSCORE', KEYS[1], ARGV[2], ARGV[3])
+  result[1] = #days
+  for i = 1, n do
+    result[i + 1] = 0
+  end
+  for _, day in ipairs(days) do
+    local day_key = ARGV[1] .. day
+    for offset = 7, 6 + n, 1000 do
+      local values = redis.call('HMGET', day_key, unpack(ARGV, offset, math.min(offset + 999, 6 + n)))
+      for i = 1, #values do
+        if values[i] then
+          result[offset - 6 + i] = result[offset - 6 + i] + tonumber(values[i])
+        end
+      end
+    end
+  end
+end
+local i = 7 + n
+if i > #ARGV then
+  return result
+end
+while i <= #ARGV do
+  local day_key = ARGV[1] .. ARGV[i]
+  local last = i + 2 + 2 * tonumber(ARGV[i + 2])
+  for j = i + 3, last, 2 do
+    redis.call('HINCRBY', day_key, ARGV[j], ARGV[j + 1])
+  end
+  redis.call('ZADD', KEYS[1], ARGV[i + 1], ARGV[i])
+  redis.call('EXPIRE', day_key, ARGV[4])
+  i = last + 1
+end
+local stale = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[5])
+for _, day in ipairs(stale) do
+  redis.call('DEL', ARGV[1] .. day)
+end
+if #stale > 0 then
+  redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[5])
+end
+return result
+"""
+
+
+@dataclass
+class ScriptedHistoryStore(RedisHistoryStore):
+    # Reads, records and prunes run as one EVALSHA against the shared days index, so workers
+    # cannot interleave a prune with a write.
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._script: Any = None
+
+    def _field_avgs(self, redis_client: Any, bucket_keys: list[str | bytes], now: datetime) -> list[float]:
+        if not bucket_keys:
+            return []
+        return self._run(redis_client, bucket_keys, now, [])
+
+    def record_many(self, redis_client: Any, records: Iterable[tuple[str, int, datetime]]) -> None:
+        records = list(records)
+        if records:
+            self._run(redis_client, [], None, records)
+
+    def read_and_record(
+        self,
+        redis_client: Any,
+        records: Iterable[tuple[str, int, datetime]],
+        now: datetime,
+    ) -> list[float]:
+        records = list(records)
+        if not records:
+            return []
+        return self._run(redis_client, [self.bucket_field(bucket_key) for bucket_key, _count, _ts in records], now, records)
+
+    def queue_record_many(self, redis_client: Any, pipe: Any, records: Iterable[tuple[str, int, datetime]]) -> None:
+        records = list(records)
+        if not records:
+            return
+        self._script_on(redis_client)(keys=[self._days_index_key], args=self._args([], None, records), client=pipe)
+        self._queue_debug_keys(pipe, [bucket_key for bucket_key, _count, _ts in records])
+
+    def _script_on(self, redis_client: Any) -> Any:
+        if self._script is None:
+            self._script = redis_client.register_script(SCRIPTED_HISTORY_LUA)
+        return self._script
+
+    def _run(
+        self,
+        redis_client: Any,
+        fields: list[str | bytes],
+        now: datetime | None,
+        records: list[tuple[str, int, datetime]],
+    ) -> list[float]:
+        script = self._script_on(redis_client)
+        args = self._args(fields, now, records)
+        if records and self.debug_keys and self.key_digest_bits:
+            # A pipeline holding a script adds a SCRIPT EXISTS round trip, so only pay it here.
+            pipe = redis_client.pipeline()
+            script(keys=[self._days_index_key], args=args, client=pipe)
+            self._queue_debug_keys(pipe, [bucket_key for bucket_key, _count, _ts in records])
+            day_count, *totals = pipe.execute()[0]
+        else:
+            day_count, *totals = script(keys=[self._days_index_key], args=args, client=redis_client)
+        if not day_count:
+            return [0.0] * len(fields)
+        return [int(total) / int(day_count) for total in totals]
+
+    def _args(
+        self,
+        fields: list[str | bytes],
+        now: datetime | None,
+        records: list[tuple[str, int, datetime]],
+    ) -> list[Any]:
+        start_day = end_day = cutoff = 0.0
+        if now is not None:
+            end_day = datetime(now.year, now.month, now.day, tzinfo=UTC).timestamp()
+            start_day = end_day - (self.history_days - 1) * 86400
+        by_day: dict[str, dict[str | bytes, int]] = {}
+        if records:
+            latest = max(event_time for _key, _count, event_time in records)
+            cutoff = datetime(latest.year, latest.month, latest.day, tzinfo=UTC).timestamp() - self.history_days * 86400
+            for bucket_key, count, event_time in records:
+                day_counts = by_day.setdefault(event_time.date().isoformat(), {})
+                field = self.bucket_field(bucket_key)
+                day_counts[field] = day_counts.get(field, 0) + int(count)
+
+        args: list[Any] = [
+            f"{self.key_prefix}:",
+            start_day,
+            end_day,
+            int((self.history_days + 2) * 86400),
+            cutoff,
+            len(fields),
+            *fields,
+        ]
+        for day_key, day_counts in by_day.items():
+            day = date.fromisoformat(day_key)
+            args.extend((day_key, datetime(day.year, day.month, day.day, tzinfo=UTC).timestamp(), len(day_counts)))
+            for field, count in day_counts.items():
+                args.extend((field, count))
+        return args
+
+
+@dataclass
+class HistoryMigrationReport:
+    days: int
+    fields: int
+    elapsed_s: float
+
+
+@dataclass
+class HistoryConsistencyReport:
+    checked: int
+    mismatched: int
+    max_abs_diff: float
+
+
+def migrate_daily_history(
+    redis_client: Any,
+    source: RedisHistoryStore,
+    target: RollingHistoryStore,
+    now: datetime,
+    chunk_size: int = 1000,
+) -> HistoryMigrationReport:
+    # Rebuilds the rolling layout from the per-day hashes that are still inside the window. The
+    # source keys are left untouched, so switching history.mode back is always possible.
+    _check_field_layouts(source, target)
+    started = time.perf_counter()
+    start_day = datetime(now.year, now.month, now.day, tzinfo=UTC) - timedelta(days=target.history_days - 1)
+    end_day = datetime(now.year, now.month, now.day, tzinfo=UTC)
+    target.reset(redis_client, window_start=start_day)
+    day_keys = [
+        source._day_text(day_key)
+        for day_key in redis_client.zrangebyscore(
+            source._days_index_key,
+            min=start_day.timestamp(),
+            max=end_day.timestamp(),
+        )
+    ]
+    fields = 0
+    for day_key in day_keys:
+        chunk: dict[str | bytes, int] = {}
+        for field, value in redis_client.hscan_iter(source._daily_hash_key(day_key), count=chunk_size):
+            chunk[field] = int(value)
+            if len(chunk) >= chunk_size:
+                fields += _migrate_chunk(redis_client, source, target, day_key, chunk, now)
+                chunk = {}
+        if chunk:
+            fields += _migrate_chunk(redis_client, source, target, day_key, chunk, now)
+    return HistoryMigrationReport(days=len(day_keys), fields=fields, elapsed_s=time.perf_counter() - started)
+
+
+def _migrate_chunk(
+    redis_client: Any,
+    source: RedisHistoryStore,
+    target: RollingHistoryStore,
+    day_key: str,
+    chunk: dict[str | bytes, int],
+    now: datetime,
+) -> int:
+    pipe = redis_client.pipeline()
+    target._queue_record(
+        redis_client,
+        pipe,
+        day_key,
+        {_convert_field(source, target, field): count for field, count in chunk.items()},
+        now,
+    )
+    if source.key_digest_bits != target.key_digest_bits:
+        target._queue_debug_keys(pipe, [source._day_text(field) for field in chunk])
+    pipe.execute()
+    return len(chunk)
+
+
+def _check_field_layouts(source: RedisHistoryStore, target: RedisHistoryStore) -> None:
+    # Full bucket keys can be re-keyed into digests, but a digest cannot be turned back.
+    if source.key_digest_bits and source.key_digest_bits != target.key_digest_bits:
+        raise ValueError(
+            f"Cannot convert {source.key_digest_bits}-bit digest fields to key_digest_bits={target.key_digest_bits}"
+        )
+
+
+def _convert_field(source: RedisHistoryStore, target: RedisHistoryStore, field: str | bytes) -> str | bytes:
+    if source.key_digest_bits == target.key_digest_bits:
+        return field
+    return target.bucket_field(source._day_text(field))
+
+
+def check_history_consistency(
+    redis_client: Any,
+    source: RedisHistoryStore,
+    target: RedisHistoryStore,
+    now: datetime,
+    sample_size: int = 10000,
+    batch_size: int = 500,
+) -> HistoryConsistencyReport:
+    # Compares averages for fields sampled from the source's in-window day hashes.
+    _check_field_layouts(source, target)
+    start_day = datetime(now.year, now.month, now.day, tzinfo=UTC) - timedelta(days=source.history_days - 1)
+    end_day = datetime(now.year, now.month, now.day, tzinfo=UTC)
+    fields: list[str | bytes] = []
+    seen: set[str | bytes] = set()
+    for day_key in redis_client.zrangebyscore(source._days_index_key, min=start_day.timestamp(), max=end_day.timestamp()):
+        for field, _value in redis_client.hscan_iter(source._daily_hash_key(day_key), count=batch_size):
+            if field not in seen:
+                seen.add(field)
+                fields.append(field)
+            if len(fields) >= sample_size:
+                break
+        if len(fields) >= sample_size:
+            break
+
+    mismatched = 0
+    max_abs_diff = 0.0
+    for offset in range(0, len(fields), batch_size):
+        batch = fields[offset : offset + batch_size]
+        expected = source._field_avgs(redis_client, batch, now)
+        actual = target._field_avgs(redis_client, [_convert_field(source, target, field) for field in batch], now)
+        for left, right in zip(expected, actual):
+            diff = abs(left - right)
+            max_abs_diff = max(max_abs_diff, diff)
+            if diff > 1e-9:
+                mismatched += 1
+    return HistoryConsistencyReport(checked=len(fields), mismatched=mismatched, max_abs_diff=max_abs_diff)
+
+
+@dataclass
+class HistoryBucketCount:
+    bucket_key: str | None
+    field: str
+    count: int
+
+
+def top_history_buckets(
+    redis_client: Any,
+    store: RedisHistoryStore,
+    day: date,
+    limit: int = 20,
+    scan_count: int = 1000,
+) -> list[HistoryBucketCount]:
+    # The largest counts of one day hash. Digest fields are shown as hex, and map back to bucket
+    # keys only where the debug_keys side table has them.
+    top = heapq.nlargest(
+        limit,
+        ((int(count), field) for field, count in redis_client.hscan_iter(store._daily_hash_key(day.isoformat()), count=scan_count)),
+    )
+    bucket_keys = store.resolve_bucket_keys(redis_client, [field for _count, field in top])
+    return [
+        HistoryBucketCount(
+            bucket_key=bucket_key,
+            field=field.hex() if store.key_digest_bits and isinstance(field, bytes) else store._day_text(field),
+            count=count,
+        )
+        for (count, field), bucket_key in zip(top, bucket_keys)
+    ]
+
+
+@dataclass
+class HistoryMemoryReport:
+    layout: str
+    buckets: int
+    days: int
+    fields: int
+    field_bytes: int
+    side_table_bytes: int
+    redis_bytes: int | None
+
+
+HISTORY_MEMORY_LAYOUTS = (
+    ("full", 0, False),
+    ("blake2b-64", 64, False),
+    ("blake2b-128", 128, False),
+    ("blake2b-64+keys", 64, True),
+)
+
+_BENCH_RULE_NAMES = ("SQL注入攻击尝试", "WebShell上传检测", "目录遍历漏洞利用", "暴力破解登录", "bench-scan")
+
+
+def _synthetic_bucket_keys(buckets: int, rng: random.Random) -> list[str]:
+    # Mostly short templates with a long tail up to the 2048-char URI cap.
+    keys = []
+    for idx in range(buckets):
+        roll = rng.random()
+        length = rng.randint(20, 120) if roll < 0.7 else rng.randint(120, 600) if roll < 0.95 else rng.randint(600, 2048)
+        template = (f"/api/v1/{idx}/" + "a" * length)[:length]
+        keys.append(
+            "|".join(
+                (
+                    f"10.{idx >> 16 & 255}.{idx >> 8 & 255}.{idx & 255}",
+                    "192.168.0.10",
+                    "tcp",
+                    _BENCH_RULE_NAMES[idx % len(_BENCH_RULE_NAMES)],
+                    "ids",
+                    template,
+                )
+            )
+        )
+    return keys
+
+
+def measure_history_memory(
+    redis_client: Any,
+    key_prefix: str,
+    buckets: int,
+    days: int = 14,
+    active_ratio: float = 0.5,
+    seed: int = 0,
+    chunk_size: int = 5000,
+) -> list[HistoryMemoryReport]:
+    # Writes the same synthetic load once per layout under <key_prefix>:bench:<layout>, sizes it
+    # and deletes it again. redis_bytes is MEMORY USAGE and stays None where the server lacks it.
+    rng = random.Random(seed)
+    bucket_keys = _synthetic_bucket_keys(buckets, rng)
+    today = datetime.now(UTC).replace(hour=12, minute=0, second=0, microsecond=0)
+    daily_keys = [
+        (today - timedelta(days=days - 1 - day), rng.sample(bucket_keys, int(buckets * active_ratio)))
+        for day in range(days)
+    ]
+
+    reports = []
+    for layout, digest_bits, debug_keys in HISTORY_MEMORY_LAYOUTS:
+        store = RedisHistoryStore(
+            key_prefix=f"{key_prefix}:bench:{layout}",
+            history_days=days,
+            key_digest_bits=digest_bits,
+            debug_keys=debug_keys,
+        )
+        fields = 0
+        field_bytes = 0
+        for event_time, active in daily_keys:
+            for offset in range(0, len(active), chunk_size):
+                chunk = active[offset : offset + chunk_size]
+                store.record_many(redis_client, [(bucket_key, rng.randint(1, 50), event_time) for bucket_key in chunk])
+            fields += len(active)
+            field_bytes += sum(len(_field_bytes(store.bucket_field(bucket_key))) for bucket_key in active)
+        side_table_bytes = 0
+        if debug_keys:
+            side_table_bytes = sum(len(bucket_key.encode("utf-8")) + digest_bits // 8 for bucket_key in bucket_keys)
+
+        keys = [store._days_index_key, store._debug_keys_key]
+        keys.extend(store._daily_hash_key(event_time.date().isoformat()) for event_time, _active in daily_keys)
+        try:
+            redis_bytes: int | None = sum(int(redis_client.memory_usage(key, samples=0) or 0) for key in keys)
+        except Exception:
+            redis_bytes = None
+        redis_client.delete(*keys)
+        reports.append(
+            HistoryMemoryReport(
+                layout=layout,
+                buckets=buckets,
+                days=days,
+                fields=fields,
+                field_bytes=field_bytes,
+                side_table_bytes=side_table_bytes,
+                redis_bytes=redis_bytes,
+            )
+        )
+    return reports
+
+
+@dataclass
+class HistoryPathReport:
+    mode: str
+    batch_size: int
+    snapshots: int
+    elapsed_s: float
+    mismatched: int
+
+
+def measure_history_paths(
+    redis_client: Any,
+    key_prefix: str,
+    snapshots: int = 20000,
+    batch_size: int = 1,
+    buckets: int = 5000,
+    days: int = 14,
+    seed: int = 0,
+) -> list[HistoryPathReport]:
+    # Replays the same snapshot stream through read_and_record in every mode, each under
+    # <key_prefix>:bench:<mode>. batch_size=1 is the per-snapshot cost; mismatched is against daily.
+    rng = random.Random(seed)
+    bucket_keys = _synthetic_bucket_keys(buckets, rng)
+    today = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    origin = today - timedelta(days=days - 1)
+    step_s = days * 86400 / max(snapshots, 1)
+    stream = [
+        (rng.choice(bucket_keys), rng.randint(1, 50), origin + timedelta(seconds=idx * step_s)) for idx in range(snapshots)
+    ]
+
+    reports = []
+    baseline: list[float] = []
+    for mode in HISTORY_MODES:
+        store = build_history_store(HistoryConfig(key_prefix=f"{key_prefix}:bench:{mode}", mode=mode), history_days=days)
+        avgs: list[float] = []
+        started = time.perf_counter()
+        for offset in range(0, len(stream), batch_size):
+            batch = stream[offset : offset + batch_size]
+            avgs.extend(store.read_and_record(redis_client, batch, batch[-1][2]))
+        elapsed_s = time.perf_counter() - started
+        if not baseline:
+            baseline = avgs
+        stale_keys = list(redis_client.scan_iter(match=f"{key_prefix}:bench:{mode}:*", count=1000))
+        if stale_keys:
+            redis_client.delete(*stale_keys)
+        reports.append(
+            HistoryPathReport(
+                mode=mode,
+                batch_size=batch_size,
+                snapshots=snapshots,
+                elapsed_s=elapsed_s,
+                mismatched=sum(1 for left, right in zip(baseline, avgs) if abs(left - right) > 1e-9),
+            )
+        )
+    return reports
+
+
+def _field_bytes(field: str | bytes) -> bytes:
+    return field if isinstance(field, bytes) else field.encode("utf-8")
+
+
+HISTORY_MODES = ("daily", "rolling", "scripted")
+
 
-    def _daily_hash_key(self, day_key: str) -> str:
-        return f"{self.key_prefix}:{day_key}"
+def build_history_store(cfg: HistoryConfig, history_days: int = 14) -> RedisHistoryStore:
+    if cfg.mode == "daily":
+        store_cls = RedisHistoryStore
+    elif cfg.mode == "rolling":
+        store_cls = RollingHistoryStore
+    elif cfg.mode == "scripted":
+        store_cls = ScriptedHistoryStore
+    else:
+        raise ValueError(f"Unsupported history mode: {cfg.mode}")
+    return store_cls(
+        key_prefix=cfg.key_prefix,
+        history_days=history_days,
+        key_digest_bits=cfg.key_digest_bits,
+        debug_keys=cfg.debug_keys,
+    )
@@ -4,9 +4,12 @@ import hashlib
 import ipaddress
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import UTC, datetime
 from typing import Any
 
+from module_alert_receiver.fields import FieldAccessor
+
 from .models import NormalizedAlert
 
 UUID_RE = re.compile(
@@ -20,6 +23,22 @@ EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
 TIMESTAMP_RE = re.compile(r"\b\d{10,13}\b")
 LONG_NUM_RE = re.compile(r"\b\d{4,}\b")
 QUERY_KEY_VALUE_RE = re.compile(r"([?&])([^=&]+)=([^&]*)")
+MULTI_SLASH_RE = re.compile(r"/{2,}")
+PATH_TOKEN_RE = re.compile(r"(?<=/)[A-Za-z0-9_-]{20,}(?=/|$)")
+DIGIT_RE = re.compile(r"\d")
+
+TIMESTAMP_FIELD = FieldAccessor(("@timestamp", "timestamp", "time"))
+SIP_FIELD = FieldAccessor(("source.ip", "src_ip", "sip"))
+DIP_FIELD = FieldAccessor(("destination.ip", "dst_ip", "dip"))
+PROTO_FIELD = FieldAccessor(("network.transport", "proto", "protocol"))
+RULE_NAME_FIELD = FieldAccessor(("rule.name", "rule_name", "signature", "alert.rule"))
+LOG_TYPE_FIELD = FieldAccessor(("log_type", "event.dataset", "type", "event.module"))
+URI_FIELD = FieldAccessor(("url.path", "http.request.uri", "uri"))
+SEVERITY_FIELD = FieldAccessor(("severity", "rule.severity", "priority"))
+CONFIDENCE_FIELD = FieldAccessor(("confidence", "risk_score", "risk.score"))
+RAW_ID_FIELD = FieldAccessor(("event.id", "id", "alert_id", "_id"))
+ASSET_TIER_FIELD = FieldAccessor(("asset.criticality", "destination.asset_tier", "asset.tier"))
+ASSET_TAGS_FIELD = FieldAccessor(("destination.tags", "asset.tags"))
 
 PRIVATE_SEVERITY_MAP = {
     "critical": 1.0,
@@ -32,35 +51,33 @@ PRIVATE_SEVERITY_MAP = {
 
 @dataclass
 class AlertNormalizer:
+    uri_cache_size: int = 65536
+
+    def __post_init__(self) -> None:
+        # Scanner traffic repeats the same URIs; templating is a pure function of the raw string.
+        if self.uri_cache_size > 0:
+            self._normalize_uri = lru_cache(maxsize=self.uri_cache_size)(self._template_uri)
+        else:
+            self._normalize_uri = self._template_uri
+
     def normalize(self, alert: dict[str, Any]) -> NormalizedAlert:
-        timestamp = self._parse_timestamp(self._first_value(alert, "@timestamp", "timestamp", "time"))
-        sip = self._string_or_default(self._first_value(alert, "source.ip", "src_ip", "sip"), "unknown_src")
-        dip = self._string_or_default(
-            self._first_value(alert, "destination.ip", "dst_ip", "dip"),
-            "unknown_dst",
-        )
-        proto = self._string_or_default(
-            self._first_value(alert, "network.transport", "proto", "protocol"),
-            "unknown_proto",
-        ).lower()
-        rule_name = self._string_or_default(
-            self._first_value(alert, "rule.name", "rule_name", "signature", "alert.rule"),
-            "unknown_rule",
-        )
-        log_type = self._string_or_default(
-            self._first_value(alert, "log_type", "event.dataset", "type", "event.module"),
-            "unknown_log_type",
-        )
-        uri = self._string_or_default(self._first_value(alert, "url.path", "http.request.uri", "uri"), "-")
+        event_timestamp = self._parse_event_timestamp(TIMESTAMP_FIELD.first(alert))
+        timestamp = event_timestamp if event_timestamp is not None else datetime.now(UTC)
+        sip = self._string_or_default(SIP_FIELD.first(alert), "unknown_src")
+        dip = self._string_or_default(DIP_FIELD.first(alert), "unknown_dst")
+        proto = self._string_or_default(PROTO_FIELD.first(alert), "unknown_proto").lower()
+        rule_name = self._string_or_default(RULE_NAME_FIELD.first(alert), "unknown_rule")
+        log_type = self._string_or_default(LOG_TYPE_FIELD.first(alert), "unknown_log_type")
+        uri = self._string_or_default(URI_FIELD.first(alert), "-")
         uri_template = self._normalize_uri(uri)
 
-        severity_score = self._normalize_score(self._first_value(alert, "severity", "rule.severity", "priority"))
-        confidence_score = self._normalize_score(self._first_value(alert, "confidence", "risk_score", "risk.score"))
+        severity_score = self._normalize_score(SEVERITY_FIELD.first(alert))
+        confidence_score = self._normalize_score(CONFIDENCE_FIELD.first(alert))
         src_external = self._is_external_ip(sip)
         dst_sensitive = self._is_sensitive_asset(alert)
 
         return NormalizedAlert(
-            raw_id=self._derive_raw_id(alert, timestamp),
+            raw_id=self._derive_raw_id(alert, event_timestamp),
             timestamp=timestamp,
             sip=sip,
             dip=dip,
@@ -75,14 +92,32 @@ class AlertNormalizer:
             raw=alert,
         )
 
-    def _derive_raw_id(self, alert: dict[str, Any], timestamp: datetime) -> str:
-        direct_id = self._first_value(alert, "event.id", "id", "alert_id", "_id")
+    def partition_key(self, alert: dict[str, Any]) -> str:
+        # Both parts are bucket_key dimensions, so one bucket never spans two partitions.
+        sip = self._string_or_default(SIP_FIELD.first(alert), "unknown_src")
+        dip = self._string_or_default(DIP_FIELD.first(alert), "unknown_dst")
+        return f"{sip}|{dip}"
+
+    def event_time(self, alert: dict[str, Any]) -> datetime:
+        return self._parse_timestamp(TIMESTAMP_FIELD.first(alert))
+
+    def raw_id(self, alert: dict[str, Any]) -> str:
+        return self._derive_raw_id(alert, self._parse_event_timestamp(TIMESTAMP_FIELD.first(alert)))
+
+    def _derive_raw_id(self, alert: dict[str, Any], timestamp: datetime | None) -> str:
+        direct_id = RAW_ID_FIELD.first(alert)
         if direct_id:
             return str(direct_id)
-        raw_blob = f"{timestamp.isoformat()}|{alert}".encode("utf-8", errors="ignore")
+        # Never hash the wall clock: the same alert read twice must get the same id.
+        stamp = timestamp.isoformat() if timestamp is not None else ""
+        raw_blob = f"{stamp}|{alert}".encode("utf-8", errors="ignore")
         return hashlib.sha256(raw_blob).hexdigest()
 
     def _parse_timestamp(self, value: Any) -> datetime:
+        timestamp = self._parse_event_timestamp(value)
+        return timestamp if timestamp is not None else datetime.now(UTC)
+
+    def _parse_event_timestamp(self, value: Any) -> datetime | None:
         if isinstance(value, datetime):
             return value.astimezone(UTC)
         if isinstance(value, str) and value:
@@ -91,21 +126,29 @@ class AlertNormalizer:
                 return datetime.fromisoformat(normalized).astimezone(UTC)
             except ValueError:
                 pass
-        return datetime.now(UTC)
+        return None
 
-    def _normalize_uri(self, uri: str) -> str:
+    def _template_uri(self, uri: str) -> str:
         cleaned = uri.strip() or "-"
-        cleaned = QUERY_KEY_VALUE_RE.sub(self._replace_query_value, cleaned)
-        cleaned = UUID_RE.sub("<UUID>", cleaned)
+        if "=" in cleaned:
+            cleaned = QUERY_KEY_VALUE_RE.sub(self._replace_query_value, cleaned)
+        # The substitution order is significant, so the passes stay sequential; each one is
+        # skipped only when a cheap check proves it cannot match.
+        has_digit = DIGIT_RE.search(cleaned) is not None
+        if has_digit:
+            cleaned = UUID_RE.sub("<UUID>", cleaned)
         cleaned = SHA_RE.sub("<HASH>", cleaned)
         cleaned = HEX_TOKEN_RE.sub("<TOKEN>", cleaned)
         cleaned = BASE64_TOKEN_RE.sub("<B64TOKEN>", cleaned)
-        cleaned = EMAIL_RE.sub("<EMAIL>", cleaned)
-        cleaned = IP_RE.sub("<IP>", cleaned)
-        cleaned = TIMESTAMP_RE.sub("<TIMESTAMP>", cleaned)
-        cleaned = LONG_NUM_RE.sub("<NUM>", cleaned)
-        cleaned = re.sub(r"/{2,}", "/", cleaned)
-        cleaned = re.sub(r"(?<=/)[A-Za-z0-9_-]{20,}(?=/|$)", "<TOKEN>", cleaned)
+        if "@" in cleaned:
+            cleaned = EMAIL_RE.sub("<EMAIL>", cleaned)
+        if has_digit:
+            cleaned = IP_RE.sub("<IP>", cleaned)
+            cleaned = TIMESTAMP_RE.sub("<TIMESTAMP>", cleaned)
+            cleaned = LONG_NUM_RE.sub("<NUM>", cleaned)
+        if "//" in cleaned:
+            cleaned = MULTI_SLASH_RE.sub("/", cleaned)
+        cleaned = PATH_TOKEN_RE.sub("<TOKEN>", cleaned)
         return cleaned[:2048]
 
     def _replace_query_value(self, match: re.Match[str]) -> str:
@@ -149,8 +192,8 @@ class AlertNormalizer:
 
     def _is_sensitive_asset(self, alert: dict[str, Any]) -> bool:
         candidates = (
-            self._first_value(alert, "asset.criticality", "destination.asset_tier", "asset.tier"),
-            self._first_value(alert, "destination.tags", "asset.tags"),
+            ASSET_TIER_FIELD.first(alert),
+            ASSET_TAGS_FIELD.first(alert),
         )
         for value in candidates:
             text = str(value).lower()
@@ -158,23 +201,6 @@ class AlertNormalizer:
                 return True
         return False
 
-    def _first_value(self, payload: dict[str, Any], *paths: str) -> Any:
-        for path in paths:
-            value = self._lookup_path(payload, path)
-            if value is not None and value != "":
-                return value
-        return None
-
-    def _lookup_path(self, payload: dict[str, Any], dotted_path: str) -> Any:
-        if dotted_path in payload:
-            return payload[dotted_path]
-        current: Any = payload
-        for part in dotted_path.split("."):
-            if not isinstance(current, dict) or part not in current:
-                return None
-            current = current[part]
-        return current
-
     def _string_or_default(self, value: Any, default: str) -> str:
         if value is None:
             return default
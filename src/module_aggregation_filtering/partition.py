@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import math
+import multiprocessing as mp
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from module_alert_receiver.buffer import build_buffer
+from module_alert_receiver.replay import iter_json_values
+
+from .aggregator import LightweightAggregator
+from .config import Module1Config
+from .normalizer import AlertNormalizer
+from .window_checkpoint import FileWindowCheckpoint
+
+
+def partition_queue_key(input_key: str, index: int) -> str:
+    return f"{input_key}:p{index}"
+
+
+def partition_index(normalizer: AlertNormalizer, alert: dict[str, Any], partitions: int) -> int:
+    # crc32 rather than hash(): str hashing is salted per process.
+    return zlib.crc32(normalizer.partition_key(alert).encode("utf-8", errors="ignore")) % partitions
+
+
+def worker_config(cfg: Module1Config, index: int, workers: int) -> Module1Config:
+    queue = cfg.queue
+    checkpoint = cfg.checkpoint
+    checkpoint_path = Path(checkpoint.path)
+    max_open_buckets = cfg.aggregation.max_open_buckets
+    return dataclasses.replace(
+        cfg,
+        queue=dataclasses.replace(
+            queue,
+            input_key=partition_queue_key(queue.input_key, index),
+            processing_key=f"{queue.processing_key}:p{index}" if queue.processing_key else None,
+        ),
+        aggregation=dataclasses.replace(
+            cfg.aggregation,
+            workers=1,
+            max_open_buckets=math.ceil(max_open_buckets / workers) if max_open_buckets else max_open_buckets,
+        ),
+        checkpoint=dataclasses.replace(
+            checkpoint,
+            key=f"{checkpoint.key}:p{index}",
+            path=str(checkpoint_path.with_name(f"{checkpoint_path.stem}.p{index}{checkpoint_path.suffix}")),
+        ),
+    )
+
+
+def partition_state(redis_client: Any, cfg: Module1Config, workers: int) -> list[str]:
+    # Non-empty keys and files holding alerts or open buckets for one worker-count layout. The
+    # unsuffixed input and processing list are read by the partitioner too, so they never strand.
+    layouts = [worker_config(cfg, index, workers) for index in range(workers)] if workers > 1 else [cfg]
+    keys: list[str] = []
+    paths: list[str] = []
+    for layout in layouts:
+        if workers > 1:
+            keys.append(layout.queue.input_key)
+            if layout.queue.processing_key:
+                keys.append(layout.queue.processing_key)
+        if layout.checkpoint.backend == "redis":
+            keys.append(layout.checkpoint.key)
+        elif layout.checkpoint.backend == "file":
+            paths.append(layout.checkpoint.path)
+    found = [key for key in keys if _key_size(redis_client, key)]
+    found.extend(path for path in paths if FileWindowCheckpoint(path=path).load(None))
+    return found
+
+
+def _key_size(redis_client: Any, key: str) -> int:
+    kind = redis_client.type(key)
+    kind = kind.decode("utf-8") if isinstance(kind, bytes) else kind
+    if kind == "list":
+        return int(redis_client.llen(key))
+    if kind == "stream":
+        # Acked entries are trimmed, so whatever is left still needs a worker.
+        return int(redis_client.xlen(key))
+    if kind == "hash":
+        return int(redis_client.hlen(key))
+    return 0
+
+
+def _untracked_partition_state(redis_client: Any, cfg: Module1Config, workers: int) -> list[str]:
+    # State written before the layout marker existed: any partition index this run will not serve,
+    # plus the single-worker checkpoint when running partitioned.
+    found = partition_state(redis_client, cfg, 1) if workers > 1 else []
+    prefixes = [cfg.queue.input_key, cfg.queue.processing_key]
+    if cfg.checkpoint.backend == "redis":
+        prefixes.append(cfg.checkpoint.key)
+    for prefix in filter(None, prefixes):
+        for key in redis_client.scan_iter(match=f"{prefix}:p*"):
+            key = key.decode("utf-8") if isinstance(key, bytes) else key
+            suffix = key[len(prefix) + 2 :]
+            if suffix.isdigit() and (workers == 1 or int(suffix) >= workers) and _key_size(redis_client, key):
+                found.append(key)
+    if cfg.checkpoint.backend == "file":
+        path = Path(cfg.checkpoint.path)
+        for candidate in sorted(path.parent.glob(f"{path.stem}.p*{path.suffix}")):
+            suffix = candidate.name[len(path.stem) + 2 : len(candidate.name) - len(path.suffix)]
+            if suffix.isdigit() and (workers == 1 or int(suffix) >= workers):
+                if FileWindowCheckpoint(path=str(candidate)).load(None):
+                    found.append(str(candidate))
+    return found
+
+
+def check_partition_layout(redis_client: Any, cfg: Module1Config, workers: int) -> None:
+    # Partition queues, processing lists and checkpoints are keyed by crc32 % workers, so state
+    # left by another worker count belongs to no worker of this run. Refuse rather than drop it.
+    marker = f"{cfg.queue.input_key}:workers"
+    recorded = redis_client.get(marker)
+    previous = int(recorded) if recorded is not None else None
+    if previous is None:
+        leftover = _untracked_partition_state(redis_client, cfg, workers)
+    elif previous != workers:
+        leftover = partition_state(redis_client, cfg, previous)
+    else:
+        leftover = []
+    if leftover:
+        shown = ", ".join(leftover[:5]) + (f" (+{len(leftover) - 5} more)" if len(leftover) > 5 else "")
+        raise RuntimeError(
+            f"module1 state from a run with {previous or 'another number of'} workers is still pending: {shown}. "
+            f"Restart with --workers {previous or '<previous count>'}, stop the input and let the open windows "
+            f"flush until these are empty, then change the worker count."
+        )
+    redis_client.set(marker, workers)
+
+
+@dataclass
+class AlertPartitioner:
+    cfg: Module1Config
+    workers: int
+
+    def __post_init__(self) -> None:
+        self.normalizer = AlertNormalizer(uri_cache_size=0)
+
+    def run(self) -> None:
+        queue = self.cfg.queue
+        input_buffer = build_buffer(
+            queue.backend,
+            url=queue.redis_url,
+            queue_key=queue.input_key,
+            group=queue.consumer_group,
+            consumer=queue.consumer_name,
+            claim_idle_ms=queue.claim_idle_ms,
+            codec=queue.codec,
+            processing_key=queue.processing_key,
+        )
+        partition_buffers = [
+            build_buffer(
+                queue.backend,
+                url=queue.redis_url,
+                queue_key=partition_queue_key(queue.input_key, index),
+                codec=queue.codec,
+                compression=queue.compression,
+                compression_min_bytes=queue.compression_min_bytes,
+            )
+            for index in range(self.workers)
+        ]
+        redis_client = input_buffer.connect()
+
+        while True:
+            raw_alerts = input_buffer.pop_many(
+                redis_client,
+                self.cfg.aggregation.pop_batch_size,
+                timeout_s=self.cfg.aggregation.pop_timeout_s,
+            )
+            pages: list[list[dict[str, Any]]] = [[] for _ in range(self.workers)]
+            for raw_alert in raw_alerts:
+                pages[partition_index(self.normalizer, raw_alert, self.workers)].append(raw_alert)
+            for buffer, page in zip(partition_buffers, pages):
+                buffer.push_many(redis_client, page)
+            input_buffer.ack(redis_client)
+
+
+def _run_partitioner(cfg: Module1Config, workers: int) -> None:
+    AlertPartitioner(cfg=cfg, workers=workers).run()
+
+
+def _run_worker(cfg: Module1Config) -> None:
+    # Built in the child: the pipeline holds per-process state (URI LRU, Redis clients).
+    from .pipeline import LightweightAggregationPipeline
+
+    LightweightAggregationPipeline.from_config(cfg).run()
+
+
+def run_partitioned(cfg: Module1Config, workers: int) -> None:
+    processes = [mp.Process(target=_run_partitioner, args=(cfg, workers), name="module1-partitioner")]
+    processes.extend(
+        mp.Process(target=_run_worker, args=(worker_config(cfg, index, workers),), name=f"module1-p{index}")
+        for index in range(workers)
+    )
+    for process in processes:
+        process.start()
+    try:
+        while True:
+            dead = [process.name for process in processes if not process.is_alive()]
+            if dead:
+                raise RuntimeError(f"module1 process exited: {', '.join(dead)}")
+            time.sleep(1.0)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(timeout=5)
+
+
+@dataclass
+class PartitionScaleReport:
+    workers: int
+    alerts: int
+    buckets: int
+    expired: int
+    partition_s: float
+    aggregate_s: float
+    result_digest: str
+
+    @property
+    def alerts_per_s(self) -> float:
+        return self.alerts / max(self.aggregate_s, 1e-9)
+
+
+def _aggregate_partition(path: str, window_s: int) -> tuple[list[str], int]:
+    # Each row carries the replay clock, which stands in for the wall clock every worker shares.
+    # Flushing against it before each add closes a bucket at the same point whatever the layout.
+    normalizer = AlertNormalizer()
+    aggregator = LightweightAggregator(window_s=window_s)
+    snapshots = []
+    for row in iter_json_values(path):
+        snapshots.extend(aggregator.flush_expired(now=datetime.fromtimestamp(row["clock"], UTC)))
+        aggregator.add(normalizer.normalize(row["alert"]))
+    expired = len(snapshots)
+    snapshots.extend(aggregator.force_flush())
+    rows = [
+        "|".join(
+            (
+                snapshot.bucket_key,
+                str(snapshot.count),
+                snapshot.window_start.isoformat(),
+                snapshot.window_end.isoformat(),
+                ",".join(snapshot.raw_ref_ids),
+            )
+        )
+        for snapshot in snapshots
+    ]
+    return rows, expired
+
+
+def measure_partition_scaling(
+    alerts: list[dict[str, Any]],
+    workers: int,
+    window_s: int = 300,
+) -> PartitionScaleReport:
+    # Replay shape: the partitioner writes one JSONL file per partition, then every worker process
+    # decodes, normalizes and aggregates its own file. The digest covers buckets closed by expiry
+    # as well as the final flush, and must not depend on `workers`.
+    workers = max(int(workers), 1)
+    normalizer = AlertNormalizer(uri_cache_size=0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [str(Path(tmp_dir) / f"p{index}.jsonl") for index in range(workers)]
+        started = time.perf_counter()
+        handles = [open(path, "w", encoding="utf-8") for path in paths]
+        clock = 0.0
+        try:
+            for alert in alerts:
+                clock = max(clock, normalizer.event_time(alert).timestamp())
+                row = {"clock": clock, "alert": alert}
+                handles[partition_index(normalizer, alert, workers)].write(json.dumps(row) + "\n")
+        finally:
+            for handle in handles:
+                handle.close()
+        partition_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with mp.Pool(processes=workers) as pool:
+            results = pool.starmap(_aggregate_partition, [(path, window_s) for path in paths])
+        aggregate_s = time.perf_counter() - started
+
+    rows = sorted(row for result_rows, _expired in results for row in result_rows)
+    digest = hashlib.sha256("\n".join(rows).encode("utf-8")).hexdigest()[:16]
+    return PartitionScaleReport(
+        workers=workers,
+        alerts=len(alerts),
+        buckets=len(rows),
+        expired=sum(expired for _rows, expired in results),
+        partition_s=partition_s,
+        aggregate_s=aggregate_s,
+        result_digest=digest,
+    )
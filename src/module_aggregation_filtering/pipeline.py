@@ -1,18 +1,21 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Any
 
-from module_alert_receiver.buffer import RedisAlertBuffer
+from module_alert_receiver.backpressure import BackpressureGate, with_backpressure
+from module_alert_receiver.buffer import AlertBuffer, build_buffer
 
 from .aggregator import LightweightAggregator
 from .asset_catalog import AssetCatalog
 from .config import Module1Config
-from .history_store import RedisHistoryStore
+from .history_store import RedisHistoryStore, build_history_store
 from .models import AggregatedAlert, AlertBucketSnapshot
 from .normalizer import AlertNormalizer
 from .scorer import LightweightRiskScorer
+from .window_checkpoint import RedisWindowCheckpoint, WindowCheckpoint, build_window_checkpoint
 
 
 @dataclass
@@ -28,73 +31,134 @@ class LightweightAggregationPipeline:
     def from_config(cls, cfg: Module1Config) -> "LightweightAggregationPipeline":
         return cls(
             cfg=cfg,
-            normalizer=AlertNormalizer(),
+            normalizer=AlertNormalizer(uri_cache_size=cfg.aggregation.uri_cache_size),
             aggregator=LightweightAggregator(
                 window_s=cfg.aggregation.window_s,
                 max_ref_ids=cfg.aggregation.max_ref_ids,
+                max_open_buckets=cfg.aggregation.max_open_buckets,
             ),
             scorer=LightweightRiskScorer(cfg.scoring),
-            asset_catalog=AssetCatalog.from_json_file(cfg.asset.table_path),
-            history_store=RedisHistoryStore(
-                key_prefix=cfg.history.key_prefix,
-                history_days=cfg.aggregation.history_days,
-            ),
+            asset_catalog=AssetCatalog.from_json_file(cfg.asset.table_path, cache_size=cfg.asset.cache_size),
+            history_store=build_history_store(cfg.history, history_days=cfg.aggregation.history_days),
         )
 
     def run(self) -> None:
-        input_buffer = RedisAlertBuffer(
-            url=self.cfg.queue.redis_url,
-            queue_key=self.cfg.queue.input_key,
+        queue = self.cfg.queue
+        input_buffer = build_buffer(
+            queue.backend,
+            url=queue.redis_url,
+            queue_key=queue.input_key,
+            group=queue.consumer_group,
+            consumer=queue.consumer_name,
+            claim_idle_ms=queue.claim_idle_ms,
+            codec=queue.codec,
+            processing_key=queue.processing_key,
         )
-        output_buffer = RedisAlertBuffer(
-            url=self.cfg.queue.redis_url,
-            queue_key=self.cfg.queue.output_key,
-            maxlen=self.cfg.queue.output_maxlen,
+        output_buffer = with_backpressure(
+            build_buffer(
+                queue.backend,
+                url=queue.redis_url,
+                queue_key=queue.output_key,
+                maxlen=queue.output_maxlen,
+                codec=queue.codec,
+                compression=queue.compression,
+                compression_min_bytes=queue.compression_min_bytes,
+            ),
+            high_watermark=queue.output_high_watermark,
+            low_watermark=queue.output_low_watermark,
+            overflow_policy=queue.overflow_policy,
+            spill_key=queue.output_spill_key,
+            max_stall_s=queue.max_stall_s,
         )
-        suppressed_buffer = RedisAlertBuffer(
-            url=self.cfg.queue.redis_url,
-            queue_key=self.cfg.queue.suppressed_key,
-            maxlen=self.cfg.queue.suppressed_maxlen,
+        suppressed_buffer = build_buffer(
+            queue.backend,
+            url=queue.redis_url,
+            queue_key=queue.suppressed_key,
+            maxlen=queue.suppressed_maxlen,
+            codec=queue.codec,
+            compression=queue.compression,
+            compression_min_bytes=queue.compression_min_bytes,
         )
         redis_client = input_buffer.connect()
 
+        # Restored buckets plus the alerts still on the processing list rebuild the pre-crash state.
+        window_checkpoint = build_window_checkpoint(self.cfg.checkpoint)
+        if window_checkpoint is not None:
+            self.aggregator.track_changes = True
+            self.aggregator.restore(window_checkpoint.load(redis_client))
+            next_checkpoint = time.monotonic() + window_checkpoint.next_interval_s()
+
+        next_flush = 0.0
         while True:
-            raw_alert = input_buffer.pop(redis_client, timeout_s=self.cfg.aggregation.pop_timeout_s)
-            if raw_alert is not None:
+            raw_alerts = input_buffer.pop_many(
+                redis_client,
+                self.cfg.aggregation.pop_batch_size,
+                timeout_s=self.cfg.aggregation.pop_timeout_s,
+            )
+            for raw_alert in raw_alerts:
                 normalized = self.normalizer.normalize(raw_alert)
                 self.aggregator.add(normalized)
-            self._flush_expired(redis_client, output_buffer, suppressed_buffer)
+            checkpointed = False
+            if time.monotonic() >= next_flush:
+                next_flush = time.monotonic() + self.cfg.aggregation.flush_interval_s
+                checkpointed = self._flush_expired(
+                    redis_client, output_buffer, suppressed_buffer, input_buffer, window_checkpoint
+                )
+            if window_checkpoint is None:
+                input_buffer.ack(redis_client)
+            elif checkpointed:
+                next_checkpoint = time.monotonic() + window_checkpoint.next_interval_s()
+            elif time.monotonic() >= next_checkpoint:
+                window_checkpoint.save(redis_client, self.aggregator, ack=input_buffer.ack)
+                next_checkpoint = time.monotonic() + window_checkpoint.next_interval_s()
 
     def _flush_expired(
         self,
         redis_client: Any,
-        output_buffer: RedisAlertBuffer,
-        suppressed_buffer: RedisAlertBuffer,
-    ) -> None:
+        output_buffer: AlertBuffer | BackpressureGate,
+        suppressed_buffer: AlertBuffer,
+        input_buffer: AlertBuffer | None = None,
+        window_checkpoint: WindowCheckpoint | None = None,
+    ) -> bool:
+        # Returns True when the flush also saved the window checkpoint.
         now = datetime.now(UTC)
         snapshots = self.aggregator.flush_expired(now=now)
-        for snapshot in snapshots:
-            payload = self._build_payload(redis_client, snapshot)
+        if not snapshots:
+            return False
+        records = [(snapshot.bucket_key, snapshot.count, snapshot.window_end) for snapshot in snapshots]
+        atomic = input_buffer is not None and isinstance(window_checkpoint, RedisWindowCheckpoint)
+        # The whole flush batch reads history as it stood before the batch.
+        if atomic:
+            historical_daily_avgs = self.history_store.get_daily_avgs(
+                redis_client, [bucket_key for bucket_key, _count, _ts in records], now
+            )
+        else:
+            historical_daily_avgs = self.history_store.read_and_record(redis_client=redis_client, records=records, now=now)
+        outputs: list[dict[str, Any]] = []
+        suppressed: list[dict[str, Any]] = []
+        for snapshot, historical_daily_avg in zip(snapshots, historical_daily_avgs):
+            payload = self._build_payload(snapshot, historical_daily_avg)
             if self.scorer.is_high_priority(payload["score_breakdown"]):
-                output_buffer.push(redis_client, payload["alert"])
+                outputs.append(payload["alert"])
             else:
-                suppressed_buffer.push(redis_client, payload["alert"])
+                suppressed.append(payload["alert"])
+        if not atomic:
+            output_buffer.push_many(redis_client, outputs)
+            suppressed_buffer.push_many(redis_client, suppressed)
+            return False
 
-    def _build_payload(self, redis_client: Any, snapshot: AlertBucketSnapshot) -> dict[str, Any]:
-        now = datetime.now(UTC)
-        historical_daily_avg = self.history_store.get_14d_daily_avg(
-            redis_client=redis_client,
-            bucket_key=snapshot.bucket_key,
-            now=now,
-        )
+        # History writes, both pushes and a checkpoint that drops the flushed buckets and acks the
+        # input commit in one MULTI, so a restart can never emit these snapshots a second time.
+        pipe = redis_client.pipeline(transaction=True)
+        self.history_store.queue_record_many(redis_client, pipe, records)
+        output_buffer.queue_push_many(redis_client, pipe, outputs)
+        suppressed_buffer.queue_push_many(redis_client, pipe, suppressed)
+        window_checkpoint.save(redis_client, self.aggregator, ack=input_buffer.ack, pipe=pipe)
+        return True
+
+    def _build_payload(self, snapshot: AlertBucketSnapshot, historical_daily_avg: float) -> dict[str, Any]:
         asset_profile = self.asset_catalog.resolve(snapshot.dip)
         score = self.scorer.score(snapshot, historical_daily_avg=historical_daily_avg, asset_profile=asset_profile)
-        self.history_store.record(
-            redis_client=redis_client,
-            bucket_key=snapshot.bucket_key,
-            count=snapshot.count,
-            event_time=snapshot.window_end,
-        )
 
         aggregated = AggregatedAlert(
             sip=snapshot.sip,
@@ -113,5 +177,13 @@ class LightweightAggregationPipeline:
 
 
 def run_pipeline(config: Module1Config) -> None:
+    from .partition import check_partition_layout, run_partitioned
+
+    queue = config.queue
+    redis_client = build_buffer(queue.backend, url=queue.redis_url, queue_key=queue.input_key).connect()
+    check_partition_layout(redis_client, config, config.aggregation.workers)
+    if config.aggregation.workers > 1:
+        run_partitioned(config, config.aggregation.workers)
+        return
     pipeline = LightweightAggregationPipeline.from_config(config)
     pipeline.run()
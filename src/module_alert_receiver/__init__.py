@@ -1,17 +1,66 @@
 """Alert receiver module: stream alerts from Elasticsearch into a buffer."""
 
-from .buffer import RedisAlertBuffer
+from .adaptive import AdaptivePager, ReceiverMetrics
+from .async_receiver import AsyncElasticAlertReceiver, run_async_receiver
+from .backpressure import BackpressureGate, BackpressureStats, with_backpressure
+from .backfill import BackfillReport, run_backfill
+from .buffer import AlertBuffer, PushReport, RedisAlertBuffer, build_buffer, measure_push
+from .compression import CompressionStats, get_compressor
 from .consumer import AlertConsumer, run_consumer
-from .config import ElasticConfig, ReceiverConfig, RedisConfig
+from .codec import CodecReport, available_codecs, get_codec, measure_codec
+from .checkpoint import FileCursorCheckpoint, RedisCursorCheckpoint
+from .config import CheckpointConfig, DedupeConfig, ElasticConfig, ReceiverConfig, RedisConfig
+from .dedupe import AlertDeduplicator, RotatingBloomFilter
+from .fanin import FanInReceiver, FanInSource, run_fanin_receiver
+from .fields import FieldAccessor, compile_path
+from .projection import SourceFilter, measure_projection
 from .receiver import ElasticAlertReceiver, run_receiver
+from .replay import ReplayReceiver, ReplayReport, run_replay
+from .stream_buffer import RedisStreamAlertBuffer
 
 __all__ = [
+    "AdaptivePager",
+    "AlertBuffer",
+    "AlertDeduplicator",
+    "AsyncElasticAlertReceiver",
+    "BackfillReport",
+    "BackpressureGate",
+    "BackpressureStats",
+    "CheckpointConfig",
+    "CodecReport",
+    "CompressionStats",
+    "DedupeConfig",
     "ElasticAlertReceiver",
     "ElasticConfig",
+    "FanInReceiver",
+    "FanInSource",
+    "FieldAccessor",
+    "FileCursorCheckpoint",
+    "PushReport",
     "ReceiverConfig",
     "RedisAlertBuffer",
+    "RedisStreamAlertBuffer",
+    "ReceiverMetrics",
     "RedisConfig",
+    "ReplayReceiver",
+    "ReplayReport",
+    "SourceFilter",
+    "RedisCursorCheckpoint",
+    "RotatingBloomFilter",
     "AlertConsumer",
+    "available_codecs",
+    "build_buffer",
+    "compile_path",
+    "get_codec",
+    "get_compressor",
+    "measure_codec",
+    "measure_projection",
+    "measure_push",
+    "run_async_receiver",
+    "run_backfill",
     "run_receiver",
+    "run_replay",
     "run_consumer",
+    "run_fanin_receiver",
+    "with_backpressure",
 ]
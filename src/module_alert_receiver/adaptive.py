@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+
+@dataclass
+class AdaptivePager:
+    min_batch_size: int = 50
+    max_batch_size: int = 2000
+    min_poll_interval_s: float = 0.25
+    max_poll_interval_s: float = 10.0
+    growth_factor: float = 2.0
+    shrink_factor: float = 0.5
+    page_size: int = field(init=False)
+    idle_sleep_s: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.page_size = self.min_batch_size
+        self.idle_sleep_s = self.min_poll_interval_s
+
+    def on_page(self, hit_count: int) -> None:
+        # Full pages mean we are behind: fetch more per round trip until we catch up.
+        if hit_count >= self.page_size:
+            self.page_size = min(int(self.page_size * self.growth_factor), self.max_batch_size)
+        else:
+            shrunk = int(self.page_size * self.shrink_factor)
+            self.page_size = max(shrunk, hit_count, self.min_batch_size)
+        self.idle_sleep_s = self.min_poll_interval_s
+
+    def on_idle(self) -> float:
+        sleep_s = self.idle_sleep_s
+        self.idle_sleep_s = min(self.idle_sleep_s * 2.0, self.max_poll_interval_s)
+        self.page_size = self.min_batch_size
+        return sleep_s
+
+
+@dataclass
+class ReceiverMetrics:
+    page_size: int = 0
+    lag_s: float | None = None
+    pages: int = 0
+    alerts: int = 0
+    idle_polls: int = 0
+
+    def observe_page(self, page_size: int, hit_count: int, last_sort: list[Any] | None) -> None:
+        self.page_size = page_size
+        self.pages += 1
+        self.alerts += hit_count
+        lag_s = sort_value_lag_s(last_sort)
+        if lag_s is not None:
+            self.lag_s = lag_s
+
+    def observe_idle(self, page_size: int) -> None:
+        self.page_size = page_size
+        self.idle_polls += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "page_size": self.page_size,
+            "lag_s": None if self.lag_s is None else round(self.lag_s, 3),
+            "pages": self.pages,
+            "alerts": self.alerts,
+            "idle_polls": self.idle_polls,
+        }
+
+
+def sort_value_lag_s(last_sort: list[Any] | None, now: datetime | None = None) -> float | None:
+    if not last_sort:
+        return None
+    value = last_sort[0]
+    now_ts = (now or datetime.now(UTC)).timestamp()
+    # Date sort values come back from Elasticsearch as epoch milliseconds.
+    if isinstance(value, (int, float)):
+        return max(now_ts - float(value) / 1000.0, 0.0)
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=UTC)
+        return max(now_ts - parsed.timestamp(), 0.0)
+    return None
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+from elasticsearch import AsyncElasticsearch
+
+from .backpressure import BackpressureGate
+from .buffer import AlertBuffer, RedisAlertBuffer
+from .checkpoint import CursorCheckpoint, build_checkpoint
+from .dedupe import AlertDeduplicator, build_deduplicator
+from .config import ReceiverConfig
+from .projection import resolve_source_filter
+from .receiver import ElasticAlertReceiver, build_pager, build_receiver_buffer
+
+
+@dataclass
+class AsyncElasticAlertReceiver(ElasticAlertReceiver):
+    client: AsyncElasticsearch
+
+    async def astream_pages(self) -> AsyncIterator[list[dict[str, Any]]]:
+        query = self._build_query()
+        while True:
+            page_size = self.page_size
+            resp = await self.client.search(index=self.index, body=self._build_body(query, page_size))
+            hits = resp.get("hits", {}).get("hits", [])
+            if not hits:
+                await asyncio.sleep(self._on_idle(page_size))
+                continue
+            yield self._accept_page(hits, page_size)
+
+
+async def _fetch_pages(receiver: AsyncElasticAlertReceiver, pages: asyncio.Queue) -> None:
+    async for page in receiver.astream_pages():
+        # The cursor travels with its page: prefetch runs ahead of what has been pushed.
+        await pages.put((page, receiver.search_after))
+
+
+async def _push_pages(
+    buffer: AlertBuffer | BackpressureGate,
+    redis_client: Any,
+    pages: asyncio.Queue,
+    checkpoint: CursorCheckpoint | None,
+    dedupe: AlertDeduplicator | None,
+) -> None:
+    while True:
+        page, cursor = await pages.get()
+        if dedupe is not None:
+            page = await asyncio.to_thread(dedupe.filter_page, page)
+        await buffer.apush_many(redis_client, page)
+        if dedupe is not None:
+            await asyncio.to_thread(dedupe.mark, page)
+        if checkpoint is not None:
+            await asyncio.to_thread(checkpoint.save, cursor)
+
+
+async def run_async_receiver(config: ReceiverConfig) -> None:
+    es_cfg = config.elastic
+    # httpx backs the async transport here: it is already locked, while aiohttp (the default
+    # async node class) is not a dependency of this project.
+    es = AsyncElasticsearch(f"{es_cfg.scheme}://{es_cfg.host}:{es_cfg.port}", node_class="httpxasync")
+    checkpoint = build_checkpoint(config.checkpoint, config.redis.url)
+    receiver = AsyncElasticAlertReceiver(
+        client=es,
+        index=es_cfg.index,
+        sort_field=es_cfg.sort_field,
+        batch_size=es_cfg.batch_size,
+        poll_interval_s=es_cfg.poll_interval_s,
+        start_time=es_cfg.start_time,
+        search_after=checkpoint.load() if checkpoint is not None else None,
+        pager=build_pager(es_cfg),
+        source_filter=resolve_source_filter(es_cfg.source_filters, es_cfg.index),
+    )
+    buffer = build_receiver_buffer(config.redis)
+    redis_client = buffer.connect_async()
+    dedupe = build_deduplicator(config.dedupe, config.redis.url)
+
+    pages: asyncio.Queue = asyncio.Queue(maxsize=max(es_cfg.prefetch_pages, 1))
+    tasks = {
+        asyncio.create_task(_fetch_pages(receiver, pages)),
+        asyncio.create_task(_push_pages(buffer, redis_client, pages, checkpoint, dedupe)),
+    }
+    try:
+        done, _pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await es.close()
+        await redis_client.aclose()
+
+
+@dataclass
+class ReceiverModeReport:
+    mode: str
+    pages: int
+    alerts: int
+    elapsed_s: float
+
+    @property
+    def alerts_per_s(self) -> float:
+        return self.alerts / max(self.elapsed_s, 1e-9)
+
+
+class _StubElastic:
+    # Serves alerts as search_after pages with a fixed per-request latency, standing in for ES.
+    def __init__(self, alerts: list[dict[str, Any]], latency_s: float) -> None:
+        self.hits = [{"_id": str(idx), "_source": alert, "sort": [idx]} for idx, alert in enumerate(alerts)]
+        self.latency_s = latency_s
+
+    def _page(self, body: dict[str, Any]) -> dict[str, Any]:
+        start = body["search_after"][0] + 1 if body.get("search_after") else 0
+        return {"hits": {"hits": self.hits[start : start + body["size"]]}}
+
+    def search(self, index: str, body: dict[str, Any]) -> dict[str, Any]:
+        time.sleep(self.latency_s)
+        return self._page(body)
+
+
+class _AsyncStubElastic(_StubElastic):
+    async def search(self, index: str, body: dict[str, Any]) -> dict[str, Any]:
+        await asyncio.sleep(self.latency_s)
+        return self._page(body)
+
+
+def measure_receiver_modes(
+    alerts: list[dict[str, Any]],
+    buffer: RedisAlertBuffer,
+    page_size: int = 200,
+    es_latency_s: float = 0.005,
+    prefetch_pages: int = 4,
+) -> list[ReceiverModeReport]:
+    # Same pages through the sync loop and the async fetch/push pipeline against a stub ES and
+    # the real Redis behind buffer; the bench queue is deleted after each run.
+    pages = -(-len(alerts) // max(page_size, 1))
+    reports = []
+
+    receiver = ElasticAlertReceiver(client=_StubElastic(alerts, es_latency_s), index="bench", batch_size=page_size)
+    client = buffer.connect()
+    client.delete(buffer.queue_key)
+    started = time.perf_counter()
+    pushed = 0
+    for page_no, page in enumerate(receiver.stream_pages(), start=1):
+        pushed += buffer.push_many(client, page)
+        if page_no >= pages:
+            break
+    reports.append(ReceiverModeReport("sync", pages, pushed, time.perf_counter() - started))
+    client.delete(buffer.queue_key)
+
+    async def run_async() -> ReceiverModeReport:
+        receiver = AsyncElasticAlertReceiver(
+            client=_AsyncStubElastic(alerts, es_latency_s),
+            index="bench",
+            batch_size=page_size,
+        )
+        redis_client = buffer.connect_async()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(prefetch_pages, 1))
+        started = time.perf_counter()
+        fetch = asyncio.create_task(_fetch_pages(receiver, queue))
+        pushed = 0
+        try:
+            for _ in range(pages):
+                page, _cursor = await queue.get()
+                pushed += await buffer.apush_many(redis_client, page)
+            return ReceiverModeReport("async", pages, pushed, time.perf_counter() - started)
+        finally:
+            fetch.cancel()
+            await asyncio.gather(fetch, return_exceptions=True)
+            await redis_client.aclose()
+
+    reports.append(asyncio.run(run_async()))
+    client.delete(buffer.queue_key)
+    return reports
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Iterable
+
+from elasticsearch import Elasticsearch
+
+from .backpressure import BackpressureGate
+from .buffer import AlertBuffer
+from .config import ReceiverConfig
+from .dedupe import AlertDeduplicator, build_deduplicator
+from .projection import SourceFilter, hit_to_alert, resolve_source_filter
+from .receiver import build_receiver_buffer
+
+
+@dataclass
+class BackfillReport:
+    start_time: str
+    end_time: str
+    workers: int
+    slices: int
+    pages: int = 0
+    alerts: int = 0
+    duplicates: int = 0
+    elapsed_s: float = 0.0
+    slice_alerts: list[int] = field(default_factory=list)
+
+    @property
+    def alerts_per_s(self) -> float:
+        return self.alerts / max(self.elapsed_s, 1e-9)
+
+
+@dataclass
+class ElasticPitBackfill:
+    client: Elasticsearch
+    index: str
+    sort_field: str = "@timestamp"
+    batch_size: int = 1000
+    keep_alive: str = "5m"
+    source_filter: SourceFilter | None = None
+
+    def open_pit(self) -> str:
+        resp = self.client.open_point_in_time(index=self.index, keep_alive=self.keep_alive)
+        return str(resp["id"])
+
+    def close_pit(self, pit_id: str) -> None:
+        try:
+            self.client.close_point_in_time(id=pit_id)
+        except Exception:
+            pass
+
+    def stream_slice(self, pit_id: str, gte: str, lt: str, last: bool = False) -> Iterable[list[dict[str, Any]]]:
+        upper = "lte" if last else "lt"
+        body: dict[str, Any] = {
+            "query": {"range": {self.sort_field: {"gte": gte, upper: lt}}},
+            "sort": [{self.sort_field: "asc"}, {"_shard_doc": "asc"}],
+            "size": self.batch_size,
+            "pit": {"id": pit_id, "keep_alive": self.keep_alive},
+        }
+        if self.source_filter is not None:
+            body["_source"] = self.source_filter.to_es()
+        while True:
+            resp = self.client.search(body=body)
+            hits = resp.get("hits", {}).get("hits", [])
+            if not hits:
+                return
+            body["pit"]["id"] = resp.get("pit_id", body["pit"]["id"])
+            body["search_after"] = hits[-1].get("sort")
+            yield [hit_to_alert(hit, self.source_filter) for hit in hits]
+
+
+def split_time_range(start: datetime, end: datetime, slices: int) -> list[tuple[str, str]]:
+    if end <= start:
+        raise ValueError(f"Backfill end {end.isoformat()} must be after start {start.isoformat()}")
+    slices = max(int(slices), 1)
+    step = (end - start) / slices
+    bounds = [start + step * idx for idx in range(slices)] + [end]
+    return [(bounds[idx].isoformat(), bounds[idx + 1].isoformat()) for idx in range(slices)]
+
+
+def parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC)
+
+
+def run_backfill(
+    config: ReceiverConfig,
+    start_time: str,
+    end_time: str | None = None,
+    workers: int | None = None,
+    slices: int | None = None,
+) -> BackfillReport:
+    es_cfg = config.elastic
+    workers = max(int(workers or es_cfg.backfill_workers), 1)
+    slices = max(int(slices or es_cfg.backfill_slices), workers)
+    start = parse_time(start_time)
+    end = parse_time(end_time) if end_time else datetime.now(UTC)
+    ranges = split_time_range(start, end, slices)
+
+    es = Elasticsearch(f"{es_cfg.scheme}://{es_cfg.host}:{es_cfg.port}")
+    backfill = ElasticPitBackfill(
+        client=es,
+        index=es_cfg.index,
+        sort_field=es_cfg.sort_field,
+        batch_size=es_cfg.backfill_batch_size,
+        source_filter=resolve_source_filter(es_cfg.source_filters, es_cfg.index),
+    )
+    buffer = build_receiver_buffer(config.redis)
+    redis_client = buffer.connect()
+    dedupe = build_deduplicator(config.dedupe, config.redis.url)
+
+    report = BackfillReport(
+        start_time=start.isoformat(),
+        end_time=end.isoformat(),
+        workers=workers,
+        slices=len(ranges),
+        slice_alerts=[0] * len(ranges),
+    )
+    pit_id = backfill.open_pit()
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as pool:
+            futures = {
+                pool.submit(
+                    _drain_slice,
+                    backfill,
+                    buffer,
+                    redis_client,
+                    dedupe,
+                    pit_id,
+                    gte,
+                    lt,
+                    idx == len(ranges) - 1,
+                ): idx
+                for idx, (gte, lt) in enumerate(ranges)
+            }
+            for future in as_completed(futures):
+                pages, alerts = future.result()
+                report.pages += pages
+                report.alerts += alerts
+                report.slice_alerts[futures[future]] = alerts
+    finally:
+        report.elapsed_s = time.perf_counter() - started
+        report.duplicates = dedupe.dropped if dedupe is not None else 0
+        backfill.close_pit(pit_id)
+        es.close()
+    return report
+
+
+def _drain_slice(
+    backfill: ElasticPitBackfill,
+    buffer: AlertBuffer | BackpressureGate,
+    redis_client: Any,
+    dedupe: AlertDeduplicator | None,
+    pit_id: str,
+    gte: str,
+    lt: str,
+    last: bool,
+) -> tuple[int, int]:
+    pages = 0
+    alerts = 0
+    for page in backfill.stream_slice(pit_id, gte, lt, last=last):
+        if dedupe is not None:
+            page = dedupe.filter_page(page)
+        alerts += buffer.push_many(redis_client, page)
+        if dedupe is not None:
+            dedupe.mark(page)
+        pages += 1
+    return pages, alerts
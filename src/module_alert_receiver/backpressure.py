@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from .buffer import AlertBuffer
+
+OVERFLOW_POLICIES = ("block", "spill")
+
+
+@dataclass
+class BackpressureStats:
+    stalls: int = 0
+    stalled_s: float = 0.0
+    spilled_pages: int = 0
+    spilled_alerts: int = 0
+    max_depth: int = 0
+
+    def observe_depth(self, depth: int) -> None:
+        self.max_depth = max(self.max_depth, depth)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stalls": self.stalls,
+            "stalled_s": round(self.stalled_s, 3),
+            "spilled_pages": self.spilled_pages,
+            "spilled_alerts": self.spilled_alerts,
+            "max_depth": self.max_depth,
+        }
+
+
+@dataclass
+class BackpressureGate:
+    buffer: AlertBuffer
+    high_watermark: int
+    low_watermark: int
+    overflow_policy: str = "block"
+    spill_buffer: AlertBuffer | None = None
+    max_stall_s: float = 30.0
+    poll_interval_s: float = 0.5
+    stats: BackpressureStats = field(default_factory=BackpressureStats)
+
+    def __post_init__(self) -> None:
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy: {self.overflow_policy}")
+        if self.overflow_policy == "spill" and self.spill_buffer is None:
+            raise ValueError("overflow_policy=spill requires a spill queue")
+        self.low_watermark = min(self.low_watermark, self.high_watermark)
+
+    @property
+    def queue_key(self) -> str:
+        return self.buffer.queue_key
+
+    def connect(self) -> Any:
+        return self.buffer.connect()
+
+    def connect_async(self) -> Any:
+        return self.buffer.connect_async()
+
+    def push_many(self, client: Any, alerts: Iterable[dict[str, Any]]) -> int:
+        alerts = list(alerts)
+        if not alerts:
+            return 0
+        if self._admit(client):
+            return self.buffer.push_many(client, alerts)
+        self._observe_spill(len(alerts))
+        return self.spill_buffer.push_many(client, alerts)
+
+    def queue_push_many(self, client: Any, pipe: Any, alerts: Iterable[dict[str, Any]]) -> int:
+        # Admission reads the live depth through client; only the push itself goes into pipe.
+        alerts = list(alerts)
+        if not alerts:
+            return 0
+        if self._admit(client):
+            return self.buffer.queue_push_many(client, pipe, alerts)
+        self._observe_spill(len(alerts))
+        return self.spill_buffer.queue_push_many(client, pipe, alerts)
+
+    async def apush_many(self, client: Any, alerts: Iterable[dict[str, Any]]) -> int:
+        alerts = list(alerts)
+        if not alerts:
+            return 0
+        if await self._aadmit(client):
+            return await self.buffer.apush_many(client, alerts)
+        self._observe_spill(len(alerts))
+        return await self.spill_buffer.apush_many(client, alerts)
+
+    def _admit(self, client: Any) -> bool:
+        depth = self.buffer.depth(client)
+        self.stats.observe_depth(depth)
+        if depth < self.high_watermark:
+            return True
+        # Hysteresis: once over the high watermark, hold until the consumer drains to the low one.
+        self.stats.stalls += 1
+        start = time.monotonic()
+        try:
+            while depth > self.low_watermark:
+                if self._stall_expired(start):
+                    return False
+                time.sleep(self.poll_interval_s)
+                depth = self.buffer.depth(client)
+            return True
+        finally:
+            self.stats.stalled_s += time.monotonic() - start
+
+    async def _aadmit(self, client: Any) -> bool:
+        depth = await self.buffer.adepth(client)
+        self.stats.observe_depth(depth)
+        if depth < self.high_watermark:
+            return True
+        self.stats.stalls += 1
+        start = time.monotonic()
+        try:
+            while depth > self.low_watermark:
+                if self._stall_expired(start):
+                    return False
+                await asyncio.sleep(self.poll_interval_s)
+                depth = await self.buffer.adepth(client)
+            return True
+        finally:
+            self.stats.stalled_s += time.monotonic() - start
+
+    def _stall_expired(self, start: float) -> bool:
+        return self.overflow_policy == "spill" and time.monotonic() - start >= self.max_stall_s
+
+    def _observe_spill(self, count: int) -> None:
+        self.stats.spilled_pages += 1
+        self.stats.spilled_alerts += count
+
+
+def with_backpressure(
+    buffer: AlertBuffer,
+    high_watermark: int | None,
+    low_watermark: int | None = None,
+    overflow_policy: str = "block",
+    spill_key: str | None = None,
+    max_stall_s: float = 30.0,
+) -> AlertBuffer | BackpressureGate:
+    if not high_watermark:
+        return buffer
+    spill_buffer = None
+    if overflow_policy == "spill":
+        spill_buffer = dataclasses.replace(
+            buffer,
+            queue_key=spill_key or f"{buffer.queue_key}:spill",
+            maxlen=None,
+        )
+    return BackpressureGate(
+        buffer=buffer,
+        high_watermark=high_watermark,
+        low_watermark=low_watermark if low_watermark is not None else high_watermark // 2,
+        overflow_policy=overflow_policy,
+        spill_buffer=spill_buffer,
+        max_stall_s=max_stall_s,
+    )
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
-import json
+import time
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterable, Union
 
 import redis
+import redis.asyncio
+
+from .codec import decode_message, encode_message, get_codec
+from .compression import CompressionStats, get_compressor
+
+if TYPE_CHECKING:
+    from .stream_buffer import RedisStreamAlertBuffer
 
 
 @dataclass
@@ -12,24 +19,220 @@ class RedisAlertBuffer:
     url: str
     queue_key: str
     maxlen: int | None = None
+    codec: str = "json"
+    compression: str | None = None
+    compression_min_bytes: int = 1024
+    processing_key: str | None = None
+
+    def __post_init__(self) -> None:
+        self._codec = get_codec(self.codec)
+        self._compressor = get_compressor(self.compression)
+        self.compression_stats = CompressionStats()
+        self._recover_processing = self.processing_key is not None
 
     def connect(self) -> redis.Redis:
-        return redis.Redis.from_url(self.url, decode_responses=True)
+        # Raw bytes: framed codecs such as msgpack are not valid UTF-8.
+        return redis.Redis.from_url(self.url, decode_responses=False)
+
+    def connect_async(self) -> redis.asyncio.Redis:
+        return redis.asyncio.Redis.from_url(self.url, decode_responses=False)
 
     def push(self, client: redis.Redis, alert: dict[str, Any]) -> None:
-        payload = json.dumps(alert, ensure_ascii=True)
+        self.push_many(client, [alert])
+
+    def push_many(self, client: redis.Redis, alerts: Iterable[dict[str, Any]]) -> int:
+        payloads = self._encode_many(alerts)
+        if not payloads:
+            return 0
         if self.maxlen is None:
-            client.rpush(self.queue_key, payload)
-            return
+            client.rpush(self.queue_key, *payloads)
+            return len(payloads)
 
+        # One multi-value RPUSH plus a single trailing LTRIM per batch.
         pipe = client.pipeline()
-        pipe.rpush(self.queue_key, payload)
+        pipe.rpush(self.queue_key, *payloads)
         pipe.ltrim(self.queue_key, -self.maxlen, -1)
         pipe.execute()
+        return len(payloads)
+
+    def queue_push_many(self, client: redis.Redis, pipe: Any, alerts: Iterable[dict[str, Any]]) -> int:
+        # Queues the push into the caller's pipeline, e.g. a MULTI that also commits a checkpoint.
+        payloads = self._encode_many(alerts)
+        if payloads:
+            pipe.rpush(self.queue_key, *payloads)
+            if self.maxlen is not None:
+                pipe.ltrim(self.queue_key, -self.maxlen, -1)
+        return len(payloads)
+
+    async def apush_many(self, client: Any, alerts: Iterable[dict[str, Any]]) -> int:
+        payloads = self._encode_many(alerts)
+        if not payloads:
+            return 0
+        if self.maxlen is None:
+            await client.rpush(self.queue_key, *payloads)
+            return len(payloads)
+
+        pipe = client.pipeline()
+        pipe.rpush(self.queue_key, *payloads)
+        pipe.ltrim(self.queue_key, -self.maxlen, -1)
+        await pipe.execute()
+        return len(payloads)
+
+    def depth(self, client: redis.Redis) -> int:
+        return int(client.llen(self.queue_key))
+
+    async def adepth(self, client: Any) -> int:
+        return int(await client.llen(self.queue_key))
+
+    def _encode_many(self, alerts: Iterable[dict[str, Any]]) -> list[bytes]:
+        return [
+            encode_message(
+                alert,
+                self._codec,
+                self._compressor,
+                self.compression_min_bytes,
+                self.compression_stats,
+            )
+            for alert in alerts
+        ]
 
     def pop(self, client: redis.Redis, timeout_s: int = 1) -> dict[str, Any] | None:
+        if self.processing_key is not None:
+            alerts = self.pop_many(client, 1, timeout_s=timeout_s)
+            return alerts[0] if alerts else None
         item = client.blpop(self.queue_key, timeout=timeout_s)
         if not item:
             return None
         _key, payload = item
-        return json.loads(payload)
+        return decode_message(payload, self.compression_stats)
+
+    def pop_many(self, client: redis.Redis, max_items: int, timeout_s: int = 1) -> list[dict[str, Any]]:
+        # Drain without blocking first; only fall back to BLPOP while the queue is empty.
+        max_items = max(int(max_items), 1)
+        if self.processing_key is not None:
+            payloads = self._move_many(client, max_items, timeout_s)
+            return [decode_message(payload, self.compression_stats) for payload in payloads]
+        payloads = client.lpop(self.queue_key, max_items) or []
+        if not payloads:
+            item = client.blpop(self.queue_key, timeout=timeout_s)
+            if not item:
+                return []
+            _key, payload = item
+            payloads = [payload]
+            if max_items > 1:
+                payloads.extend(client.lpop(self.queue_key, max_items - 1) or [])
+        return [decode_message(payload, self.compression_stats) for payload in payloads]
+
+    def ack(self, client: Any) -> None:
+        # Plain list pops are destructive, so there is nothing left to acknowledge. With a
+        # processing list, everything moved since the last ack is released; client may be a
+        # pipeline so the release commits together with the caller's own writes.
+        if self.processing_key is not None:
+            client.delete(self.processing_key)
+
+    def _move_many(self, client: redis.Redis, max_items: int, timeout_s: int) -> list[bytes]:
+        # Alerts left in the processing list by a crashed run come back before new ones.
+        if self._recover_processing:
+            self._recover_processing = False
+            pending = client.lrange(self.processing_key, 0, -1)
+            if pending:
+                return list(pending)
+        payloads = self._lmove_batch(client, max_items)
+        if payloads:
+            return payloads
+        payload = client.blmove(self.queue_key, self.processing_key, timeout_s, "LEFT", "RIGHT")
+        if payload is None:
+            return []
+        return [payload, *self._lmove_batch(client, max_items - 1)]
+
+    def _lmove_batch(self, client: redis.Redis, count: int) -> list[bytes]:
+        if count <= 0:
+            return []
+        pipe = client.pipeline(transaction=False)
+        for _ in range(count):
+            pipe.lmove(self.queue_key, self.processing_key, "LEFT", "RIGHT")
+        return [payload for payload in pipe.execute() if payload is not None]
+
+
+AlertBuffer = Union[RedisAlertBuffer, "RedisStreamAlertBuffer"]
+
+
+@dataclass
+class PushReport:
+    alerts: int
+    page_size: int
+    per_alert_s: float
+    batched_s: float
+
+    @property
+    def per_alert_rate(self) -> float:
+        return self.alerts / max(self.per_alert_s, 1e-9)
+
+    @property
+    def batched_rate(self) -> float:
+        return self.alerts / max(self.batched_s, 1e-9)
+
+
+def measure_push(
+    buffer: AlertBuffer,
+    client: redis.Redis,
+    alerts: list[dict[str, Any]],
+    page_size: int = 200,
+) -> PushReport:
+    # Same alerts pushed one round trip per alert (the old receiver loop) and one push_many per
+    # page. The bench queue is deleted before and after each pass.
+    page_size = max(int(page_size), 1)
+    client.delete(buffer.queue_key)
+    start = time.perf_counter()
+    for alert in alerts:
+        buffer.push(client, alert)
+    per_alert_s = time.perf_counter() - start
+    client.delete(buffer.queue_key)
+
+    start = time.perf_counter()
+    for offset in range(0, len(alerts), page_size):
+        buffer.push_many(client, alerts[offset : offset + page_size])
+    batched_s = time.perf_counter() - start
+    client.delete(buffer.queue_key)
+    return PushReport(alerts=len(alerts), page_size=page_size, per_alert_s=per_alert_s, batched_s=batched_s)
+
+
+def build_buffer(
+    backend: str,
+    url: str,
+    queue_key: str,
+    maxlen: int | None = None,
+    group: str | None = None,
+    consumer: str | None = None,
+    claim_idle_ms: int = 60000,
+    codec: str = "json",
+    compression: str | None = None,
+    compression_min_bytes: int = 1024,
+    processing_key: str | None = None,
+) -> AlertBuffer:
+    if backend == "list":
+        return RedisAlertBuffer(
+            url=url,
+            queue_key=queue_key,
+            maxlen=maxlen,
+            codec=codec,
+            compression=compression,
+            compression_min_bytes=compression_min_bytes,
+            processing_key=processing_key,
+        )
+    if backend == "stream":
+        from .stream_buffer import RedisStreamAlertBuffer, default_consumer_name
+
+        return RedisStreamAlertBuffer(
+            url=url,
+            queue_key=queue_key,
+            maxlen=maxlen,
+            group=group or "socrates",
+            consumer=consumer or default_consumer_name(),
+            stable_consumer=consumer is not None,
+            claim_idle_ms=claim_idle_ms,
+            codec=codec,
+            compression=compression,
+            compression_min_bytes=compression_min_bytes,
+        )
+    raise ValueError(f"Unsupported queue backend: {backend}")
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Union
+
+import redis
+
+from .config import CheckpointConfig
+
+
+@dataclass
+class RedisCursorCheckpoint:
+    url: str
+    key: str
+
+    def __post_init__(self) -> None:
+        self._client = redis.Redis.from_url(self.url, decode_responses=True)
+
+    def load(self) -> list[Any] | None:
+        payload = self._client.get(self.key)
+        return _decode_cursor(payload)
+
+    def save(self, cursor: list[Any] | None) -> None:
+        if cursor is None:
+            return
+        self._client.set(self.key, json.dumps(cursor))
+
+
+@dataclass
+class FileCursorCheckpoint:
+    path: str
+
+    def load(self) -> list[Any] | None:
+        file_path = Path(self.path)
+        if not file_path.exists():
+            return None
+        return _decode_cursor(file_path.read_text(encoding="utf-8"))
+
+    def save(self, cursor: list[Any] | None) -> None:
+        if cursor is None:
+            return
+        file_path = Path(self.path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(cursor), encoding="utf-8")
+        # Atomic rename so a crash mid-write never leaves a truncated cursor behind.
+        os.replace(tmp_path, file_path)
+
+
+CursorCheckpoint = Union[RedisCursorCheckpoint, FileCursorCheckpoint]
+
+
+def build_checkpoint(
+    cfg: CheckpointConfig,
+    redis_url: str,
+    name: str | None = None,
+) -> CursorCheckpoint | None:
+    if not cfg.backend:
+        return None
+    if cfg.backend == "redis":
+        return RedisCursorCheckpoint(url=redis_url, key=f"{cfg.key}:{name}" if name else cfg.key)
+    if cfg.backend == "file":
+        path = Path(cfg.path)
+        if name:
+            path = path.with_name(f"{path.stem}.{name}{path.suffix}")
+        return FileCursorCheckpoint(path=str(path))
+    raise ValueError(f"Unsupported checkpoint backend: {cfg.backend}")
+
+
+def _decode_cursor(payload: str | None) -> list[Any] | None:
+    if not payload:
+        return None
+    try:
+        cursor = json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+    return cursor if isinstance(cursor, list) and cursor else None
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from .compression import CompressionStats, Compressor, compressor_for_flags
+
+# Framed messages start with MAGIC, then codec id and flags. Bare JSON (the legacy wire
+# format) starts with "{" or "[", so old producers and consumers keep interoperating.
+MAGIC = 0xA5
+HEADER_SIZE = 3
+
+
+class AlertCodec(Protocol):
+    name: str
+    codec_id: int
+
+    def encode(self, obj: Any) -> bytes: ...
+
+    def decode(self, data: bytes) -> Any: ...
+
+
+class JsonCodec:
+    name = "json"
+    codec_id = 0
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    name = "orjson"
+    codec_id = 1
+
+    def __init__(self) -> None:
+        try:
+            import orjson
+        except ImportError as exc:
+            raise ImportError("Missing dependency for orjson codec. Install orjson.") from exc
+        self._orjson = orjson
+
+    def encode(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def decode(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgpackCodec:
+    name = "msgpack"
+    codec_id = 2
+
+    def __init__(self) -> None:
+        try:
+            import msgpack
+        except ImportError as exc:
+            raise ImportError("Missing dependency for msgpack codec. Install msgpack.") from exc
+        self._msgpack = msgpack
+
+    def encode(self, obj: Any) -> bytes:
+        return self._msgpack.packb(obj, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False)
+
+
+_CODEC_TYPES: dict[str, type] = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgpackCodec.name: MsgpackCodec,
+}
+_CODEC_NAMES_BY_ID = {codec.codec_id: name for name, codec in _CODEC_TYPES.items()}
+_CODEC_CACHE: dict[str, AlertCodec] = {}
+
+
+def get_codec(name: str) -> AlertCodec:
+    codec = _CODEC_CACHE.get(name)
+    if codec is not None:
+        return codec
+    codec_type = _CODEC_TYPES.get(name)
+    if codec_type is None:
+        raise ValueError(f"Unsupported queue codec: {name}")
+    codec = codec_type()
+    _CODEC_CACHE[name] = codec
+    return codec
+
+
+def available_codecs() -> list[str]:
+    return list(_CODEC_TYPES)
+
+
+def encode_message(
+    obj: Any,
+    codec: AlertCodec,
+    compressor: Compressor | None = None,
+    min_bytes: int = 0,
+    stats: CompressionStats | None = None,
+) -> bytes:
+    body = codec.encode(obj)
+    raw_size = len(body)
+    flags = 0
+    elapsed_s = 0.0
+    if compressor is not None and raw_size >= min_bytes:
+        start = time.perf_counter()
+        packed = compressor.compress(body)
+        elapsed_s = time.perf_counter() - start
+        # Small or high-entropy bodies can grow; keep those uncompressed.
+        if len(packed) < raw_size:
+            body = packed
+            flags = compressor.flag
+    if stats is not None:
+        stats.observe_encode(raw_size, len(body), bool(flags), elapsed_s)
+    if codec.codec_id == JsonCodec.codec_id and not flags:
+        return body
+    return bytes((MAGIC, codec.codec_id, flags)) + body
+
+
+def decode_message(payload: bytes | str, stats: CompressionStats | None = None) -> Any:
+    if isinstance(payload, str):
+        return json.loads(payload)
+    if not payload or payload[0] != MAGIC:
+        return json.loads(payload)
+    codec_name = _CODEC_NAMES_BY_ID.get(payload[1])
+    if codec_name is None:
+        raise ValueError(f"Unknown codec id in queue message header: {payload[1]}")
+    body = payload[HEADER_SIZE:]
+    compressor = compressor_for_flags(payload[2])
+    if compressor is not None:
+        start = time.perf_counter()
+        body = compressor.decompress(body)
+        if stats is not None:
+            stats.observe_decode(time.perf_counter() - start)
+    return get_codec(codec_name).decode(body)
+
+
+@dataclass(frozen=True)
+class CodecReport:
+    codec: str
+    alerts: int
+    encoded_bytes: int
+    encode_s: float
+    decode_s: float
+
+    @property
+    def bytes_per_alert(self) -> float:
+        return self.encoded_bytes / max(self.alerts, 1)
+
+    @property
+    def encode_us_per_alert(self) -> float:
+        return self.encode_s * 1e6 / max(self.alerts, 1)
+
+    @property
+    def decode_us_per_alert(self) -> float:
+        return self.decode_s * 1e6 / max(self.alerts, 1)
+
+
+def measure_codec(
+    alerts: list[dict[str, Any]],
+    codec: AlertCodec,
+    rounds: int = 20,
+    compressor: Compressor | None = None,
+    min_bytes: int = 0,
+) -> CodecReport:
+    rounds = max(int(rounds), 1)
+    payloads = [encode_message(alert, codec, compressor, min_bytes) for alert in alerts]
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for alert in alerts:
+            encode_message(alert, codec, compressor, min_bytes)
+    encode_s = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for payload in payloads:
+            decode_message(payload)
+    decode_s = (time.perf_counter() - start) / rounds
+
+    return CodecReport(
+        codec=codec.name if compressor is None else f"{codec.name}+{compressor.name}",
+        alerts=len(alerts),
+        encoded_bytes=sum(len(payload) for payload in payloads),
+        encode_s=encode_s,
+        decode_s=decode_s,
+    )
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+# Bits of the codec header flags byte.
+FLAG_ZLIB = 0x01
+FLAG_ZSTD = 0x02
+
+
+class Compressor(Protocol):
+    name: str
+    flag: int
+
+    def compress(self, data: bytes) -> bytes: ...
+
+    def decompress(self, data: bytes) -> bytes: ...
+
+
+class ZlibCompressor:
+    name = "zlib"
+    flag = FLAG_ZLIB
+
+    def __init__(self, level: int = 6) -> None:
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCompressor:
+    name = "zstd"
+    flag = FLAG_ZSTD
+
+    def __init__(self, level: int = 3) -> None:
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise ImportError("Missing dependency for zstd compression. Install zstandard.") from exc
+        self.level = level
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+_COMPRESSOR_TYPES: dict[str, type] = {
+    ZlibCompressor.name: ZlibCompressor,
+    ZstdCompressor.name: ZstdCompressor,
+}
+_COMPRESSOR_NAMES_BY_FLAG = {compressor.flag: name for name, compressor in _COMPRESSOR_TYPES.items()}
+_COMPRESSOR_CACHE: dict[str, Compressor] = {}
+
+
+def get_compressor(name: str | None) -> Compressor | None:
+    if not name or name == "none":
+        return None
+    compressor = _COMPRESSOR_CACHE.get(name)
+    if compressor is not None:
+        return compressor
+    compressor_type = _COMPRESSOR_TYPES.get(name)
+    if compressor_type is None:
+        raise ValueError(f"Unsupported queue compression: {name}")
+    compressor = compressor_type()
+    _COMPRESSOR_CACHE[name] = compressor
+    return compressor
+
+
+def compressor_for_flags(flags: int) -> Compressor | None:
+    name = _COMPRESSOR_NAMES_BY_FLAG.get(flags & (FLAG_ZLIB | FLAG_ZSTD))
+    if name is None:
+        if flags:
+            raise ValueError(f"Unknown compression flags in queue message header: {flags}")
+        return None
+    return get_compressor(name)
+
+
+@dataclass
+class CompressionStats:
+    messages: int = 0
+    compressed: int = 0
+    raw_bytes: int = 0
+    stored_bytes: int = 0
+    compress_s: float = 0.0
+    decompressed: int = 0
+    decompress_s: float = 0.0
+
+    def observe_encode(self, raw_size: int, stored_size: int, compressed: bool, elapsed_s: float) -> None:
+        self.messages += 1
+        self.raw_bytes += raw_size
+        self.stored_bytes += stored_size
+        self.compress_s += elapsed_s
+        if compressed:
+            self.compressed += 1
+
+    def observe_decode(self, elapsed_s: float) -> None:
+        self.decompressed += 1
+        self.decompress_s += elapsed_s
+
+    @property
+    def ratio(self) -> float:
+        return self.stored_bytes / max(self.raw_bytes, 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "messages": self.messages,
+            "compressed": self.compressed,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": self.stored_bytes,
+            "ratio": round(self.ratio, 4),
+            "compress_ms": round(self.compress_s * 1000, 3),
+            "decompressed": self.decompressed,
+            "decompress_ms": round(self.decompress_s * 1000, 3),
+        }
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
 from os import getenv
+from typing import Any
 
 
 @dataclass(frozen=True)
@@ -14,6 +16,19 @@ class ElasticConfig:
     batch_size: int = 200
     poll_interval_s: float = 2.0
     start_time: str | None = None
+    mode: str = "sync"
+    prefetch_pages: int = 4
+    adaptive: bool = False
+    min_batch_size: int = 50
+    max_batch_size: int = 2000
+    min_poll_interval_s: float = 0.25
+    max_poll_interval_s: float = 10.0
+    source_filters: dict[str, dict[str, Any]] | None = None
+    backfill_workers: int = 4
+    backfill_slices: int = 16
+    backfill_batch_size: int = 1000
+    sources: list[dict[str, Any]] | None = None
+    lag_report_interval_s: float = 60.0
 
     @classmethod
     def from_env(cls) -> "ElasticConfig":
@@ -26,6 +41,19 @@ class ElasticConfig:
             batch_size=int(getenv("ES_BATCH_SIZE", str(cls.batch_size))),
             poll_interval_s=float(getenv("ES_POLL_INTERVAL_S", str(cls.poll_interval_s))),
             start_time=getenv("ES_START_TIME", cls.start_time or "") or None,
+            mode=getenv("ES_RECEIVER_MODE", cls.mode),
+            prefetch_pages=int(getenv("ES_PREFETCH_PAGES", str(cls.prefetch_pages))),
+            adaptive=getenv("ES_ADAPTIVE", "false").strip().lower() in ("1", "true", "yes"),
+            min_batch_size=int(getenv("ES_MIN_BATCH_SIZE", str(cls.min_batch_size))),
+            max_batch_size=int(getenv("ES_MAX_BATCH_SIZE", str(cls.max_batch_size))),
+            min_poll_interval_s=float(getenv("ES_MIN_POLL_INTERVAL_S", str(cls.min_poll_interval_s))),
+            max_poll_interval_s=float(getenv("ES_MAX_POLL_INTERVAL_S", str(cls.max_poll_interval_s))),
+            source_filters=json.loads(getenv("ES_SOURCE_FILTERS", "") or "null"),
+            backfill_workers=int(getenv("ES_BACKFILL_WORKERS", str(cls.backfill_workers))),
+            backfill_slices=int(getenv("ES_BACKFILL_SLICES", str(cls.backfill_slices))),
+            backfill_batch_size=int(getenv("ES_BACKFILL_BATCH_SIZE", str(cls.backfill_batch_size))),
+            sources=json.loads(getenv("ES_SOURCES", "") or "null"),
+            lag_report_interval_s=float(getenv("ES_LAG_REPORT_INTERVAL_S", str(cls.lag_report_interval_s))),
         )
 
 
@@ -34,15 +62,79 @@ class RedisConfig:
     url: str = "redis://localhost:6379/0"
     queue_key: str = "socrates:alerts"
     maxlen: int | None = None
+    pop_batch_size: int = 100
+    backend: str = "list"
+    consumer_group: str = "consumer"
+    consumer_name: str | None = None
+    claim_idle_ms: int = 60000
+    codec: str = "json"
+    compression: str | None = None
+    compression_min_bytes: int = 1024
+    high_watermark: int | None = None
+    low_watermark: int | None = None
+    overflow_policy: str = "block"
+    spill_key: str | None = None
+    max_stall_s: float = 30.0
 
     @classmethod
     def from_env(cls) -> "RedisConfig":
         maxlen_env = getenv("REDIS_QUEUE_MAXLEN", "")
         maxlen = int(maxlen_env) if maxlen_env else None
+        high_env = getenv("REDIS_HIGH_WATERMARK", "")
+        low_env = getenv("REDIS_LOW_WATERMARK", "")
         return cls(
             url=getenv("REDIS_URL", cls.url),
             queue_key=getenv("REDIS_QUEUE_KEY", cls.queue_key),
             maxlen=maxlen,
+            pop_batch_size=int(getenv("REDIS_POP_BATCH_SIZE", str(cls.pop_batch_size))),
+            backend=getenv("REDIS_QUEUE_BACKEND", cls.backend),
+            consumer_group=getenv("REDIS_CONSUMER_GROUP", cls.consumer_group),
+            consumer_name=getenv("REDIS_CONSUMER_NAME", "") or None,
+            claim_idle_ms=int(getenv("REDIS_CLAIM_IDLE_MS", str(cls.claim_idle_ms))),
+            codec=getenv("REDIS_QUEUE_CODEC", cls.codec),
+            compression=getenv("REDIS_QUEUE_COMPRESSION", "") or None,
+            compression_min_bytes=int(getenv("REDIS_COMPRESSION_MIN_BYTES", str(cls.compression_min_bytes))),
+            high_watermark=int(high_env) if high_env else None,
+            low_watermark=int(low_env) if low_env else None,
+            overflow_policy=getenv("REDIS_OVERFLOW_POLICY", cls.overflow_policy),
+            spill_key=getenv("REDIS_SPILL_KEY", "") or None,
+            max_stall_s=float(getenv("REDIS_MAX_STALL_S", str(cls.max_stall_s))),
+        )
+
+
+@dataclass(frozen=True)
+class CheckpointConfig:
+    backend: str | None = None
+    key: str = "socrates:receiver:cursor"
+    path: str = "data/receiver_cursor.json"
+
+    @classmethod
+    def from_env(cls) -> "CheckpointConfig":
+        return cls(
+            backend=getenv("RECEIVER_CHECKPOINT_BACKEND", "") or None,
+            key=getenv("RECEIVER_CHECKPOINT_KEY", cls.key),
+            path=getenv("RECEIVER_CHECKPOINT_PATH", cls.path),
+        )
+
+
+@dataclass(frozen=True)
+class DedupeConfig:
+    backend: str | None = None
+    capacity: int = 1000000
+    fp_rate: float = 0.001
+    window_s: float = 3600.0
+    generations: int = 2
+    key_prefix: str = "socrates:receiver:dedupe"
+
+    @classmethod
+    def from_env(cls) -> "DedupeConfig":
+        return cls(
+            backend=getenv("RECEIVER_DEDUPE_BACKEND", "") or None,
+            capacity=int(getenv("RECEIVER_DEDUPE_CAPACITY", str(cls.capacity))),
+            fp_rate=float(getenv("RECEIVER_DEDUPE_FP_RATE", str(cls.fp_rate))),
+            window_s=float(getenv("RECEIVER_DEDUPE_WINDOW_S", str(cls.window_s))),
+            generations=int(getenv("RECEIVER_DEDUPE_GENERATIONS", str(cls.generations))),
+            key_prefix=getenv("RECEIVER_DEDUPE_KEY_PREFIX", cls.key_prefix),
         )
 
 
@@ -50,7 +142,14 @@ class RedisConfig:
 class ReceiverConfig:
     elastic: ElasticConfig
     redis: RedisConfig
+    checkpoint: CheckpointConfig = CheckpointConfig()
+    dedupe: DedupeConfig = DedupeConfig()
 
     @classmethod
     def from_env(cls) -> "ReceiverConfig":
-        return cls(elastic=ElasticConfig.from_env(), redis=RedisConfig.from_env())
+        return cls(
+            elastic=ElasticConfig.from_env(),
+            redis=RedisConfig.from_env(),
+            checkpoint=CheckpointConfig.from_env(),
+            dedupe=DedupeConfig.from_env(),
+        )
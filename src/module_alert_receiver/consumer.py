@@ -3,25 +3,38 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Callable
 
-from .buffer import RedisAlertBuffer
+from .buffer import AlertBuffer, build_buffer
 from .config import RedisConfig
 
 
 @dataclass
 class AlertConsumer:
-    buffer: RedisAlertBuffer
+    buffer: AlertBuffer
+    batch_size: int = 100
 
     def consume(
         self,
         handler: Callable[[dict[str, Any]], None],
         timeout_s: int = 1,
+    ) -> None:
+        def _per_alert(alerts: list[dict[str, Any]]) -> None:
+            for alert in alerts:
+                handler(alert)
+
+        self.consume_batches(_per_alert, timeout_s=timeout_s)
+
+    def consume_batches(
+        self,
+        handler: Callable[[list[dict[str, Any]]], None],
+        timeout_s: int = 1,
     ) -> None:
         client = self.buffer.connect()
         while True:
-            alert = self.buffer.pop(client, timeout_s=timeout_s)
-            if alert is None:
+            alerts = self.buffer.pop_many(client, self.batch_size, timeout_s=timeout_s)
+            if not alerts:
                 continue
-            handler(alert)
+            handler(alerts)
+            self.buffer.ack(client)
 
 
 def print_handler(alert: dict[str, Any]) -> None:
@@ -31,12 +44,17 @@ def print_handler(alert: dict[str, Any]) -> None:
 
 def run_consumer(config: RedisConfig | None = None) -> None:
     redis_cfg = config or RedisConfig.from_env()
-    buffer = RedisAlertBuffer(
+    buffer = build_buffer(
+        redis_cfg.backend,
         url=redis_cfg.url,
         queue_key=redis_cfg.queue_key,
         maxlen=redis_cfg.maxlen,
+        group=redis_cfg.consumer_group,
+        consumer=redis_cfg.consumer_name,
+        claim_idle_ms=redis_cfg.claim_idle_ms,
+        codec=redis_cfg.codec,
     )
-    consumer = AlertConsumer(buffer=buffer)
+    consumer = AlertConsumer(buffer=buffer, batch_size=redis_cfg.pop_batch_size)
     consumer.consume(print_handler)
 
 
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import redis
+
+from .config import DedupeConfig
+
+
+def bloom_parameters(capacity: int, fp_rate: float) -> tuple[int, int]:
+    capacity = max(int(capacity), 1)
+    fp_rate = min(max(float(fp_rate), 1e-9), 0.5)
+    num_bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+    num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+    return num_bits, num_hashes
+
+
+@dataclass
+class RotatingBloomFilter:
+    capacity: int = 1_000_000
+    fp_rate: float = 0.001
+    window_s: float = 3600.0
+    generations: int = 2
+
+    def __post_init__(self) -> None:
+        self.generations = max(int(self.generations), 1)
+        # A lookup probes every live generation, so each one gets its share of the error budget.
+        self.num_bits, self.num_hashes = bloom_parameters(self.capacity, self.fp_rate / self.generations)
+        self._bits: dict[int, bytearray] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def memory_bytes(self) -> int:
+        return (self.num_bits + 7) // 8 * self.generations
+
+    def positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode("utf-8", errors="ignore"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def _live(self, now: float | None) -> list[int]:
+        # Generations are wall-clock aligned so several receivers sharing Redis rotate together.
+        current = int((now if now is not None else time.time()) // self.window_s)
+        return list(range(current - self.generations + 1, current + 1))
+
+    def test_many(self, keys: list[str], now: float | None = None) -> list[bool]:
+        # Read-only: a key repeated within keys counts as seen after its first occurrence.
+        live = self._live(now)
+        positions = [self.positions(key) for key in keys]
+        with self._lock:
+            self._retire(live[0])
+            hits = self._test(live, positions)
+        seen: list[bool] = []
+        page_keys: set[str] = set()
+        for key, hit in zip(keys, hits):
+            seen.append(hit or key in page_keys)
+            page_keys.add(key)
+        return seen
+
+    def seen_many(self, keys: list[str], now: float | None = None) -> list[bool]:
+        # Test-and-set: returns what test_many would have, then marks every key.
+        live = self._live(now)
+        current = live[-1]
+        positions = [self.positions(key) for key in keys]
+        with self._lock:
+            self._retire(live[0])
+            hits = self._test(live, positions)
+            seen: list[bool] = []
+            new_positions: list[list[int]] = []
+            page_keys: set[str] = set()
+            for key, key_positions, hit in zip(keys, positions, hits):
+                duplicate = hit or key in page_keys
+                seen.append(duplicate)
+                if not duplicate:
+                    page_keys.add(key)
+                    new_positions.append(key_positions)
+            if new_positions:
+                self._set(current, new_positions)
+        return seen
+
+    def _retire(self, oldest_live: int) -> None:
+        for generation in list(self._bits):
+            if generation < oldest_live:
+                del self._bits[generation]
+
+    def _test(self, live: list[int], positions: list[list[int]]) -> list[bool]:
+        filters = [self._bits[generation] for generation in live if generation in self._bits]
+        return [
+            any(all(bits[pos >> 3] & (1 << (pos & 7)) for pos in key_positions) for bits in filters)
+            for key_positions in positions
+        ]
+
+    def _set(self, generation: int, positions: list[list[int]]) -> None:
+        bits = self._bits.get(generation)
+        if bits is None:
+            bits = bytearray((self.num_bits + 7) // 8)
+            self._bits[generation] = bits
+        for key_positions in positions:
+            for pos in key_positions:
+                bits[pos >> 3] |= 1 << (pos & 7)
+
+
+BLOOM_LUA = """
+-- KEYS: live generation bitmaps, oldest first; the last one is the current generation
+-- ARGV: mark (0 = test only, 1 = test-and-set), hashes per id, ttl seconds, then bit positions
+local mark = ARGV[1] == '1'
+local k = tonumber(ARGV[2])
+local current = KEYS[#KEYS]
+local result = {}
+for i = 0, (#ARGV - 3) / k - 1 do
+  local base = 3 + i * k
+  local hit = 0
+  for _, key in ipairs(KEYS) do
+    local all = 1
+    for j = 1, k do
+      if redis.call('GETBIT', key, ARGV[base + j]) == 0 then
+        all = 0
+        break
+      end
+    end
+    if all == 1 then
+      hit = 1
+      break
+    end
+  end
+  if mark and hit == 0 then
+    for j = 1, k do
+      redis.call('SETBIT', current, ARGV[base + j], 1)
+    end
+  end
+  result[i + 1] = hit
+end
+if mark then
+  redis.call('EXPIRE', current, ARGV[3])
+end
+return result
+"""
+
+
+@dataclass
+class RedisRotatingBloomFilter(RotatingBloomFilter):
+    url: str = "redis://localhost:6379/0"
+    key_prefix: str = "socrates:receiver:dedupe"
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._client = redis.Redis.from_url(self.url, decode_responses=False)
+        self._script = self._client.register_script(BLOOM_LUA)
+
+    def _generation_key(self, generation: int) -> str:
+        return f"{self.key_prefix}:{generation}"
+
+    def _test(self, live: list[int], positions: list[list[int]]) -> list[bool]:
+        return self._run(live, positions, mark=False)
+
+    def seen_many(self, keys: list[str], now: float | None = None) -> list[bool]:
+        # One script call tests and marks atomically, so concurrent receivers cannot both see
+        # the same id as new; repeats within keys are caught by the bits set for the first one.
+        if not keys:
+            return []
+        return self._run(self._live(now), [self.positions(key) for key in keys], mark=True)
+
+    def _run(self, live: list[int], positions: list[list[int]], mark: bool) -> list[bool]:
+        if not positions:
+            return []
+        args: list[int] = [int(mark), self.num_hashes, int(self.window_s * (self.generations + 1))]
+        for key_positions in positions:
+            args.extend(key_positions)
+        # Expiry retires a generation once it falls out of the window on every receiver.
+        hits = self._script(keys=[self._generation_key(generation) for generation in live], args=args)
+        return [bool(hit) for hit in hits]
+
+
+@dataclass
+class AlertDeduplicator:
+    bloom: RotatingBloomFilter
+    id_func: Callable[[dict[str, Any]], str]
+    checked: int = 0
+    dropped: int = 0
+    raced: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def filter_page(self, alerts: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        # Only tests. Ids are marked by mark() once the page has been pushed; marking here would
+        # drop the whole page as duplicates if the push failed or the process died before the
+        # cursor was saved, since the page is then read again.
+        if not alerts:
+            return alerts
+        seen = self.bloom.test_many([self.id_func(alert) for alert in alerts])
+        kept = [alert for alert, duplicate in zip(alerts, seen) if not duplicate]
+        with self._lock:
+            self.checked += len(alerts)
+            self.dropped += len(alerts) - len(kept)
+        return kept
+
+    def mark(self, alerts: list[dict[str, Any]]) -> None:
+        # Call after the push succeeds and before the cursor is saved. A crash in between can
+        # only push the page again, never lose it. raced counts ids another receiver pushed and
+        # marked between this one's filter_page and mark.
+        if not alerts:
+            return
+        seen = self.bloom.seen_many([self.id_func(alert) for alert in alerts])
+        with self._lock:
+            self.raced += sum(seen)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "dropped": self.dropped,
+            "raced": self.raced,
+            "drop_ratio": round(self.dropped / max(self.checked, 1), 4),
+            "bloom_bits": self.bloom.num_bits,
+            "bloom_hashes": self.bloom.num_hashes,
+            "bloom_bytes": self.bloom.memory_bytes,
+        }
+
+
+def build_deduplicator(cfg: DedupeConfig, redis_url: str) -> AlertDeduplicator | None:
+    if not cfg.backend:
+        return None
+    if cfg.backend == "memory":
+        bloom = RotatingBloomFilter(
+            capacity=cfg.capacity,
+            fp_rate=cfg.fp_rate,
+            window_s=cfg.window_s,
+            generations=cfg.generations,
+        )
+    elif cfg.backend == "redis":
+        bloom = RedisRotatingBloomFilter(
+            capacity=cfg.capacity,
+            fp_rate=cfg.fp_rate,
+            window_s=cfg.window_s,
+            generations=cfg.generations,
+            url=redis_url,
+            key_prefix=cfg.key_prefix,
+        )
+    else:
+        raise ValueError(f"Unsupported dedupe backend: {cfg.backend}")
+
+    # Key on the same id module1 assigns, so "duplicate" means the same thing in both stages.
+    from module_aggregation_filtering.normalizer import AlertNormalizer
+
+    return AlertDeduplicator(bloom=bloom, id_func=AlertNormalizer().raw_id)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from elasticsearch import Elasticsearch
+
+from .adaptive import AdaptivePager
+from .checkpoint import CursorCheckpoint, build_checkpoint
+from .config import ElasticConfig, ReceiverConfig
+from .dedupe import build_deduplicator
+from .projection import resolve_source_filter
+from .receiver import ElasticAlertReceiver, build_receiver_buffer
+
+
+@dataclass
+class FanInSource:
+    name: str
+    receiver: ElasticAlertReceiver
+    weight: float = 1.0
+    checkpoint: CursorCheckpoint | None = None
+    prefetch_pages: int = 2
+
+    def __post_init__(self) -> None:
+        self.weight = max(float(self.weight), 1e-6)
+        self.pages: queue.Queue = queue.Queue(maxsize=max(int(self.prefetch_pages), 1))
+        self.finish_tag = 0.0
+        self.pushed_alerts = 0
+        self.error: BaseException | None = None
+
+    def lag(self) -> dict[str, Any]:
+        metrics = self.receiver.metrics.to_dict()
+        metrics["queued_pages"] = self.pages.qsize()
+        metrics["pushed_alerts"] = self.pushed_alerts
+        return metrics
+
+
+@dataclass
+class FanInReceiver:
+    sources: list[FanInSource]
+    wait_s: float = 1.0
+    lag_report_interval_s: float = 0.0
+    on_lag_report: Callable[[dict[str, dict[str, Any]]], None] | None = None
+
+    def __post_init__(self) -> None:
+        self._ready = threading.Condition()
+        self._stop = threading.Event()
+        self._virtual_time = 0.0
+        self._threads: list[threading.Thread] = []
+        self._next_report = time.monotonic() + self.lag_report_interval_s
+
+    def start(self) -> None:
+        for source in self.sources:
+            thread = threading.Thread(
+                target=self._fetch,
+                args=(source,),
+                name=f"fanin-{source.name}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._ready:
+            self._ready.notify_all()
+
+    def stream_pages(self) -> Iterable[tuple[FanInSource, list[dict[str, Any]], list[Any] | None]]:
+        if not self._threads:
+            self.start()
+        while not self._stop.is_set():
+            # Checked on every wake-up, not only per page: lag matters most when sources go quiet.
+            self._report_lag_if_due()
+            source = self._next_source()
+            if source is None:
+                continue
+            page, cursor = source.pages.get_nowait()
+            # Start-time fair queueing: a source returning from idle starts at the current virtual
+            # time instead of its stale tag, so it cannot monopolise the queue to "catch up".
+            start_tag = max(source.finish_tag, self._virtual_time)
+            source.finish_tag = start_tag + len(page) / source.weight
+            self._virtual_time = start_tag
+            yield source, page, cursor
+
+    def lag_report(self) -> dict[str, dict[str, Any]]:
+        return {source.name: source.lag() for source in self.sources}
+
+    def _report_lag_if_due(self) -> None:
+        if self.on_lag_report is None or self.lag_report_interval_s <= 0:
+            return
+        now = time.monotonic()
+        if now < self._next_report:
+            return
+        self._next_report = now + self.lag_report_interval_s
+        self.on_lag_report(self.lag_report())
+
+    def _next_source(self) -> FanInSource | None:
+        with self._ready:
+            ready = self._ready_sources()
+            if not ready:
+                self._ready.wait(self.wait_s)
+                ready = self._ready_sources()
+            if not ready:
+                return None
+        return min(ready, key=lambda item: max(item.finish_tag, self._virtual_time))
+
+    def _ready_sources(self) -> list[FanInSource]:
+        for source in self.sources:
+            if source.error is not None:
+                raise RuntimeError(f"Fan-in source {source.name} failed") from source.error
+        return [source for source in self.sources if not source.pages.empty()]
+
+    def _fetch(self, source: FanInSource) -> None:
+        try:
+            for page in source.receiver.stream_pages():
+                # The cursor travels with its page: the fetch thread runs ahead of what has been pushed.
+                item = (page, source.receiver.search_after)
+                while not self._stop.is_set():
+                    try:
+                        source.pages.put(item, timeout=self.wait_s)
+                        break
+                    except queue.Full:
+                        continue
+                if self._stop.is_set():
+                    return
+                with self._ready:
+                    self._ready.notify()
+        except BaseException as exc:
+            source.error = exc
+            with self._ready:
+                self._ready.notify()
+
+
+def build_fanin_sources(
+    es: Elasticsearch,
+    config: ReceiverConfig,
+) -> list[FanInSource]:
+    es_cfg: ElasticConfig = config.elastic
+    sources: list[FanInSource] = []
+    for spec in es_cfg.sources or []:
+        name = str(spec.get("name") or spec["index"])
+        batch_size = int(spec.get("batch_size", es_cfg.batch_size))
+        checkpoint = build_checkpoint(config.checkpoint, config.redis.url, name=name)
+        pager = None
+        if es_cfg.adaptive:
+            pager = AdaptivePager(
+                min_batch_size=min(es_cfg.min_batch_size, batch_size),
+                max_batch_size=batch_size,
+                min_poll_interval_s=es_cfg.min_poll_interval_s,
+                max_poll_interval_s=es_cfg.max_poll_interval_s,
+            )
+        receiver = ElasticAlertReceiver(
+            client=es,
+            index=spec["index"],
+            sort_field=spec.get("sort_field", es_cfg.sort_field),
+            batch_size=batch_size,
+            poll_interval_s=float(spec.get("poll_interval_s", es_cfg.poll_interval_s)),
+            start_time=spec.get("start_time", es_cfg.start_time),
+            search_after=checkpoint.load() if checkpoint is not None else None,
+            pager=pager,
+            source_filter=resolve_source_filter(es_cfg.source_filters, spec["index"]),
+        )
+        sources.append(
+            FanInSource(
+                name=name,
+                receiver=receiver,
+                weight=float(spec.get("weight", 1.0)),
+                checkpoint=checkpoint,
+                prefetch_pages=es_cfg.prefetch_pages,
+            )
+        )
+    return sources
+
+
+def print_lag_report(report: dict[str, dict[str, Any]]) -> None:
+    for name, lag in report.items():
+        print("fanin", f"source={name}", *(f"{key}={value}" for key, value in lag.items()))
+
+
+def run_fanin_receiver(config: ReceiverConfig) -> None:
+    es_cfg = config.elastic
+    es = Elasticsearch(f"{es_cfg.scheme}://{es_cfg.host}:{es_cfg.port}")
+    fanin = FanInReceiver(
+        sources=build_fanin_sources(es, config),
+        lag_report_interval_s=es_cfg.lag_report_interval_s,
+        on_lag_report=print_lag_report,
+    )
+    buffer = build_receiver_buffer(config.redis)
+    redis_client = buffer.connect()
+    dedupe = build_deduplicator(config.dedupe, config.redis.url)
+
+    try:
+        for source, page, cursor in fanin.stream_pages():
+            if dedupe is not None:
+                page = dedupe.filter_page(page)
+            source.pushed_alerts += buffer.push_many(redis_client, page)
+            if dedupe is not None:
+                dedupe.mark(page)
+            if source.checkpoint is not None:
+                source.checkpoint.save(cursor)
+    finally:
+        fanin.stop()
+        es.close()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable
+
+_MISSING = object()
+
+FieldGetter = Callable[[dict[str, Any]], Any]
+
+
+@lru_cache(maxsize=1024)
+def compile_path(dotted_path: str) -> FieldGetter:
+    # A flattened key ("destination.ip" stored verbatim) wins over the nested walk, as before.
+    parts = tuple(dotted_path.split("."))
+    if len(parts) == 1:
+        return lambda payload: payload.get(dotted_path)
+
+    def getter(payload: dict[str, Any]) -> Any:
+        value = payload.get(dotted_path, _MISSING)
+        if value is not _MISSING:
+            return value
+        current: Any = payload
+        for part in parts:
+            if not isinstance(current, dict):
+                return None
+            current = current.get(part, _MISSING)
+            if current is _MISSING:
+                return None
+        return current
+
+    return getter
+
+
+def lookup_path(payload: dict[str, Any], dotted_path: str) -> Any:
+    return compile_path(dotted_path)(payload)
+
+
+@dataclass(frozen=True)
+class FieldAccessor:
+    paths: tuple[str, ...]
+    skip_empty: bool = True
+    _getters: tuple[FieldGetter, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_getters", tuple(compile_path(path) for path in self.paths))
+
+    def first(self, *payloads: dict[str, Any]) -> Any:
+        # Paths are tried in priority order; within a path, later payloads are only a fallback
+        # for a missing (None) value, matching the per-extractor lookups this replaces.
+        for getter in self._getters:
+            for payload in payloads:
+                value = getter(payload)
+                if value is not None:
+                    break
+            else:
+                continue
+            if self.skip_empty and value == "":
+                continue
+            return value
+        return None
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Any, Iterable
+
+# Kept on every projected alert so downstream stages can still fetch the full document by id.
+ID_FIELDS = ("event.id", "id", "alert_id")
+
+
+@dataclass(frozen=True)
+class SourceFilter:
+    includes: tuple[str, ...] = ()
+    excludes: tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "SourceFilter":
+        includes = tuple(str(item) for item in payload.get("includes") or ())
+        if includes:
+            includes = includes + tuple(path for path in ID_FIELDS if path not in includes)
+        excludes = tuple(str(item) for item in payload.get("excludes") or ())
+        return cls(includes=includes, excludes=excludes)
+
+    def to_es(self) -> dict[str, list[str]]:
+        body: dict[str, list[str]] = {}
+        if self.includes:
+            body["includes"] = list(self.includes)
+        if self.excludes:
+            body["excludes"] = list(self.excludes)
+        return body
+
+    def apply(self, doc: dict[str, Any]) -> dict[str, Any]:
+        # Client-side equivalent of the ES _source filter, used to size what the pushdown saves.
+        return self._walk(doc, "", not self.includes)
+
+    def _walk(self, node: dict[str, Any], prefix: str, included: bool) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for key, value in node.items():
+            path = f"{prefix}{key}"
+            if any(fnmatchcase(path, pattern) for pattern in self.excludes):
+                continue
+            hit = included or any(fnmatchcase(path, pattern) for pattern in self.includes)
+            if isinstance(value, dict):
+                child = self._walk(value, f"{path}.", hit)
+                if child or (hit and not value):
+                    out[key] = child
+            elif hit:
+                out[key] = value
+        return out
+
+
+def hit_to_alert(hit: dict[str, Any], source_filter: SourceFilter | None) -> dict[str, Any]:
+    source = hit.get("_source", {})
+    if source_filter is None:
+        return source
+    alert = dict(source)
+    alert.setdefault("_id", hit.get("_id"))
+    alert.setdefault("_index", hit.get("_index"))
+    return alert
+
+
+def resolve_source_filter(
+    source_filters: dict[str, dict[str, Any]] | None,
+    index: str,
+) -> SourceFilter | None:
+    if not source_filters:
+        return None
+    if index in source_filters:
+        return SourceFilter.from_dict(source_filters[index])
+    for pattern, payload in source_filters.items():
+        if fnmatchcase(index, pattern):
+            return SourceFilter.from_dict(payload)
+    return None
+
+
+@dataclass
+class ProjectionReport:
+    alerts: int
+    full_bytes: int
+    projected_bytes: int
+
+    @property
+    def full_bytes_per_alert(self) -> float:
+        return self.full_bytes / max(self.alerts, 1)
+
+    @property
+    def projected_bytes_per_alert(self) -> float:
+        return self.projected_bytes / max(self.alerts, 1)
+
+    @property
+    def saved_bytes_per_alert(self) -> float:
+        return self.full_bytes_per_alert - self.projected_bytes_per_alert
+
+    @property
+    def saved_ratio(self) -> float:
+        return 1.0 - (self.projected_bytes / max(self.full_bytes, 1))
+
+
+def measure_projection(alerts: Iterable[dict[str, Any]], source_filter: SourceFilter) -> ProjectionReport:
+    count = 0
+    full_bytes = 0
+    projected_bytes = 0
+    for alert in alerts:
+        count += 1
+        full_bytes += len(json.dumps(alert, ensure_ascii=True))
+        projected_bytes += len(json.dumps(source_filter.apply(alert), ensure_ascii=True))
+    return ProjectionReport(alerts=count, full_bytes=full_bytes, projected_bytes=projected_bytes)
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Iterable
 
 from elasticsearch import Elasticsearch
 
-from .buffer import RedisAlertBuffer
-from .config import ElasticConfig, ReceiverConfig
+from .adaptive import AdaptivePager, ReceiverMetrics
+from .backpressure import BackpressureGate, with_backpressure
+from .buffer import AlertBuffer, build_buffer
+from .checkpoint import build_checkpoint
+from .dedupe import build_deduplicator
+from .config import ElasticConfig, ReceiverConfig, RedisConfig
+from .projection import SourceFilter, hit_to_alert, resolve_source_filter
 
 
 @dataclass
@@ -18,6 +23,14 @@ class ElasticAlertReceiver:
     batch_size: int = 200
     poll_interval_s: float = 2.0
     start_time: str | None = None
+    search_after: list[Any] | None = None
+    pager: AdaptivePager | None = None
+    source_filter: SourceFilter | None = None
+    metrics: ReceiverMetrics = field(default_factory=ReceiverMetrics)
+
+    @property
+    def page_size(self) -> int:
+        return self.pager.page_size if self.pager is not None else self.batch_size
 
     def _build_query(self) -> dict[str, Any]:
         if not self.start_time:
@@ -25,29 +38,92 @@ class ElasticAlertReceiver:
         return {"range": {self.sort_field: {"gte": self.start_time}}}
 
     def stream(self) -> Iterable[dict[str, Any]]:
-        query = self._build_query()
-        search_after: list[Any] | None = None
-        sort = [{self.sort_field: "asc"}, {"_shard_doc": "asc"}]
+        for page in self.stream_pages():
+            yield from page
 
+    def stream_pages(self) -> Iterable[list[dict[str, Any]]]:
+        query = self._build_query()
         while True:
-            body: dict[str, Any] = {"query": query, "sort": sort, "size": self.batch_size}
-            if search_after:
-                body["search_after"] = search_after
-
-            resp = self.client.search(index=self.index, body=body)
+            page_size = self.page_size
+            resp = self.client.search(index=self.index, body=self._build_body(query, page_size))
             hits = resp.get("hits", {}).get("hits", [])
             if not hits:
-                time.sleep(self.poll_interval_s)
+                time.sleep(self._on_idle(page_size))
                 continue
+            yield self._accept_page(hits, page_size)
+
+    def _build_body(self, query: dict[str, Any], page_size: int) -> dict[str, Any]:
+        sort = [{self.sort_field: "asc"}, {"_shard_doc": "asc"}]
+        body: dict[str, Any] = {"query": query, "sort": sort, "size": page_size}
+        if self.search_after:
+            body["search_after"] = self.search_after
+        if self.source_filter is not None:
+            body["_source"] = self.source_filter.to_es()
+        return body
+
+    def _on_idle(self, page_size: int) -> float:
+        self.metrics.observe_idle(page_size)
+        return self.pager.on_idle() if self.pager is not None else self.poll_interval_s
+
+    def _accept_page(self, hits: list[dict[str, Any]], page_size: int) -> list[dict[str, Any]]:
+        if self.pager is not None:
+            self.pager.on_page(len(hits))
+        self.metrics.observe_page(page_size, len(hits), hits[-1].get("sort"))
+        # Advance before returning so callers can persist the cursor once the page is pushed.
+        self.search_after = hits[-1].get("sort")
+        return [hit_to_alert(hit, self.source_filter) for hit in hits]
+
 
-            for hit in hits:
-                search_after = hit.get("sort")
-                yield hit.get("_source", {})
+def build_pager(es_cfg: ElasticConfig) -> AdaptivePager | None:
+    if not es_cfg.adaptive:
+        return None
+    return AdaptivePager(
+        min_batch_size=es_cfg.min_batch_size,
+        max_batch_size=es_cfg.max_batch_size,
+        min_poll_interval_s=es_cfg.min_poll_interval_s,
+        max_poll_interval_s=es_cfg.max_poll_interval_s,
+    )
+
+
+def build_receiver_buffer(redis_cfg: RedisConfig) -> AlertBuffer | BackpressureGate:
+    buffer = build_buffer(
+        redis_cfg.backend,
+        url=redis_cfg.url,
+        queue_key=redis_cfg.queue_key,
+        maxlen=redis_cfg.maxlen,
+        codec=redis_cfg.codec,
+        compression=redis_cfg.compression,
+        compression_min_bytes=redis_cfg.compression_min_bytes,
+    )
+    return with_backpressure(
+        buffer,
+        high_watermark=redis_cfg.high_watermark,
+        low_watermark=redis_cfg.low_watermark,
+        overflow_policy=redis_cfg.overflow_policy,
+        spill_key=redis_cfg.spill_key,
+        max_stall_s=redis_cfg.max_stall_s,
+    )
 
 
 def run_receiver(config: ReceiverConfig) -> None:
     es_cfg: ElasticConfig = config.elastic
+    if es_cfg.sources:
+        from .fanin import run_fanin_receiver
+
+        run_fanin_receiver(config)
+        return
+    if es_cfg.mode == "async":
+        import asyncio
+
+        from .async_receiver import run_async_receiver
+
+        asyncio.run(run_async_receiver(config))
+        return
+    if es_cfg.mode != "sync":
+        raise ValueError(f"Unsupported receiver mode: {es_cfg.mode}")
+
     es = Elasticsearch(f"{es_cfg.scheme}://{es_cfg.host}:{es_cfg.port}")
+    checkpoint = build_checkpoint(config.checkpoint, config.redis.url)
     receiver = ElasticAlertReceiver(
         client=es,
         index=es_cfg.index,
@@ -55,14 +131,20 @@ def run_receiver(config: ReceiverConfig) -> None:
         batch_size=es_cfg.batch_size,
         poll_interval_s=es_cfg.poll_interval_s,
         start_time=es_cfg.start_time,
+        search_after=checkpoint.load() if checkpoint is not None else None,
+        pager=build_pager(es_cfg),
+        source_filter=resolve_source_filter(es_cfg.source_filters, es_cfg.index),
     )
 
-    buffer = RedisAlertBuffer(
-        url=config.redis.url,
-        queue_key=config.redis.queue_key,
-        maxlen=config.redis.maxlen,
-    )
+    buffer = build_receiver_buffer(config.redis)
     redis_client = buffer.connect()
+    dedupe = build_deduplicator(config.dedupe, config.redis.url)
 
-    for alert in receiver.stream():
-        buffer.push(redis_client, alert)
+    for page in receiver.stream_pages():
+        if dedupe is not None:
+            page = dedupe.filter_page(page)
+        buffer.push_many(redis_client, page)
+        if dedupe is not None:
+            dedupe.mark(page)
+        if checkpoint is not None:
+            checkpoint.save(receiver.search_after)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from .config import ReceiverConfig
+from .receiver import build_receiver_buffer
+
+READ_CHUNK_CHARS = 1 << 20
+_SEPARATORS = " \t\r\n,[]"
+
+
+def iter_json_values(path: str | Path, chunk_chars: int = READ_CHUNK_CHARS) -> Iterable[Any]:
+    # One decoder for JSON arrays, JSONL and concatenated objects; memory is bounded by the
+    # read chunk plus the largest single alert, not by the file.
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    with open(path, encoding="utf-8") as fh:
+        while True:
+            while pos < len(buf) and buf[pos] in _SEPARATORS:
+                pos += 1
+            if pos < len(buf):
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    end = -1
+                # A value that ends exactly at the buffer edge may be a truncated number.
+                if end != -1 and (end < len(buf) or eof):
+                    yield value
+                    pos = end
+                    continue
+            if eof:
+                return
+            chunk = fh.read(chunk_chars)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+
+def event_time_s(alert: dict[str, Any], fields: tuple[str, ...]) -> float | None:
+    for name in fields:
+        value = alert.get(name)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value / 1000.0 if value > 1e12 else float(value)
+        if isinstance(value, str) and value:
+            try:
+                return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                continue
+    return None
+
+
+@dataclass
+class ReplayReport:
+    files: int
+    speed: float | None
+    pages: int = 0
+    alerts: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def alerts_per_s(self) -> float:
+        return self.alerts / max(self.elapsed_s, 1e-9)
+
+
+@dataclass
+class ReplayReceiver:
+    paths: list[str]
+    batch_size: int = 500
+    speed: float | None = None
+    repeat: int = 1
+    timestamp_fields: tuple[str, ...] = ("@timestamp", "timestamp", "time")
+
+    def __post_init__(self) -> None:
+        self._origin: tuple[float, float] | None = None
+
+    def stream(self) -> Iterable[dict[str, Any]]:
+        for _ in range(max(int(self.repeat), 1)):
+            self._origin = None
+            for path in self.paths:
+                for value in iter_json_values(path):
+                    if isinstance(value, dict):
+                        yield value
+
+    def stream_pages(self) -> Iterable[list[dict[str, Any]]]:
+        batch_size = max(int(self.batch_size), 1)
+        page: list[dict[str, Any]] = []
+        for alert in self.stream():
+            delay = self._pace(alert)
+            if delay > 0:
+                # Flush what is due before sleeping so downstream sees alerts on schedule.
+                if page:
+                    yield page
+                    page = []
+                time.sleep(delay)
+            page.append(alert)
+            if len(page) >= batch_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    def _pace(self, alert: dict[str, Any]) -> float:
+        if not self.speed:
+            return 0.0
+        event_s = event_time_s(alert, self.timestamp_fields)
+        if event_s is None:
+            return 0.0
+        now = time.monotonic()
+        if self._origin is None:
+            self._origin = (event_s, now)
+            return 0.0
+        first_event_s, started = self._origin
+        return started + (event_s - first_event_s) / self.speed - now
+
+
+def run_replay(
+    config: ReceiverConfig,
+    paths: list[str],
+    speed: float | None = None,
+    batch_size: int | None = None,
+    repeat: int = 1,
+) -> ReplayReport:
+    replay = ReplayReceiver(
+        paths=paths,
+        batch_size=batch_size or config.elastic.batch_size,
+        speed=speed,
+        repeat=repeat,
+        timestamp_fields=(config.elastic.sort_field, "timestamp", "time"),
+    )
+    buffer = build_receiver_buffer(config.redis)
+    redis_client = buffer.connect()
+
+    report = ReplayReport(files=len(paths), speed=speed)
+    started = time.perf_counter()
+    try:
+        for page in replay.stream_pages():
+            report.alerts += buffer.push_many(redis_client, page)
+            report.pages += 1
+    finally:
+        report.elapsed_s = time.perf_counter() - started
+    return report
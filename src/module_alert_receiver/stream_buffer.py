@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+import redis
+import redis.asyncio
+
+from .codec import decode_message, encode_message, get_codec
+from .compression import CompressionStats, get_compressor
+
+STREAM_FIELD = b"alert"
+START_ID = "0-0"
+
+
+def default_consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _group_backlog(groups: list[dict[str, Any]]) -> int | None:
+    # XLEN counts already-acked history, so depth is the slowest group's unread lag plus pending.
+    if not groups:
+        return None
+    backlogs = []
+    for group in groups:
+        lag = group.get("lag")
+        if lag is None:
+            return None
+        backlogs.append(int(lag) + int(group.get("pending") or 0))
+    return max(backlogs)
+
+
+def _parse_id(entry_id: bytes | str) -> tuple[int, int]:
+    text = entry_id.decode("ascii") if isinstance(entry_id, bytes) else entry_id
+    ms, _, seq = text.partition("-")
+    return int(ms), int(seq or 0)
+
+
+@dataclass
+class RedisStreamAlertBuffer:
+    url: str
+    queue_key: str
+    maxlen: int | None = None
+    group: str = "socrates"
+    consumer: str = field(default_factory=default_consumer_name)
+    claim_idle_ms: int = 60000
+    codec: str = "json"
+    compression: str | None = None
+    compression_min_bytes: int = 1024
+    stable_consumer: bool = False
+    trim_interval_s: float = 1.0
+
+    def __post_init__(self) -> None:
+        self._codec = get_codec(self.codec)
+        self._compressor = get_compressor(self.compression)
+        self.compression_stats = CompressionStats()
+        self._group_ready = False
+        # Only a configured consumer name survives a restart; the hostname-pid default never
+        # matches its predecessor, whose entries come back through XAUTOCLAIM instead.
+        self._replay_own_pending = self.stable_consumer
+        self._replay_cursor = START_ID
+        self._last_claim_ts = 0.0
+        self._claim_cursor = START_ID
+        self._last_trim_ts = 0.0
+        # Ordered set of delivered, unacked ids; acks may lag several pops behind (checkpoints).
+        self._inflight: dict[bytes, None] = {}
+
+    def connect(self) -> redis.Redis:
+        return redis.Redis.from_url(self.url, decode_responses=False)
+
+    def connect_async(self) -> redis.asyncio.Redis:
+        return redis.asyncio.Redis.from_url(self.url, decode_responses=False)
+
+    def push(self, client: redis.Redis, alert: dict[str, Any]) -> None:
+        self.push_many(client, [alert])
+
+    def push_many(self, client: redis.Redis, alerts: Iterable[dict[str, Any]]) -> int:
+        payloads = self._encode_many(alerts)
+        if not payloads:
+            return 0
+        self._queue_xadds(client.pipeline(transaction=False), payloads).execute()
+        return len(payloads)
+
+    def queue_push_many(self, client: redis.Redis, pipe: Any, alerts: Iterable[dict[str, Any]]) -> int:
+        payloads = self._encode_many(alerts)
+        self._queue_xadds(pipe, payloads)
+        return len(payloads)
+
+    async def apush_many(self, client: Any, alerts: Iterable[dict[str, Any]]) -> int:
+        payloads = self._encode_many(alerts)
+        if not payloads:
+            return 0
+        await self._queue_xadds(client.pipeline(transaction=False), payloads).execute()
+        return len(payloads)
+
+    def _queue_xadds(self, pipe: Any, payloads: list[bytes]) -> Any:
+        for payload in payloads:
+            pipe.xadd(
+                self.queue_key,
+                {STREAM_FIELD: payload},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        return pipe
+
+    def depth(self, client: redis.Redis) -> int:
+        try:
+            groups = client.xinfo_groups(self.queue_key)
+        except redis.ResponseError:
+            return 0
+        backlog = _group_backlog(groups)
+        return backlog if backlog is not None else int(client.xlen(self.queue_key))
+
+    async def adepth(self, client: Any) -> int:
+        try:
+            groups = await client.xinfo_groups(self.queue_key)
+        except redis.ResponseError:
+            return 0
+        backlog = _group_backlog(groups)
+        return backlog if backlog is not None else int(await client.xlen(self.queue_key))
+
+    def _encode_many(self, alerts: Iterable[dict[str, Any]]) -> list[bytes]:
+        return [
+            encode_message(
+                alert,
+                self._codec,
+                self._compressor,
+                self.compression_min_bytes,
+                self.compression_stats,
+            )
+            for alert in alerts
+        ]
+
+    def pop(self, client: redis.Redis, timeout_s: int = 1) -> dict[str, Any] | None:
+        alerts = self.pop_many(client, 1, timeout_s=timeout_s)
+        return alerts[0] if alerts else None
+
+    def pop_many(self, client: redis.Redis, max_items: int, timeout_s: int = 1) -> list[dict[str, Any]]:
+        self._ensure_group(client)
+        self._trim_consumed(client)
+        max_items = max(int(max_items), 1)
+
+        # Entries delivered to this consumer name before a restart come back first, once: the
+        # cursor moves past every replayed id, and the first empty read switches over to ">".
+        if self._replay_own_pending:
+            entries = self._read_group(client, self._replay_cursor, max_items, block_ms=None)
+            if entries:
+                last_id = entries[-1][0]
+                self._replay_cursor = last_id.decode("ascii") if isinstance(last_id, bytes) else str(last_id)
+                return self._decode(client, entries)
+            self._replay_own_pending = False
+
+        entries = self._claim_stale(client, max_items)
+        if entries:
+            return self._decode(client, entries)
+
+        entries = self._read_group(client, ">", max_items, block_ms=int(timeout_s * 1000))
+        return self._decode(client, entries)
+
+    def ack(self, client: Any) -> None:
+        if not self._inflight:
+            return
+        client.xack(self.queue_key, self.group, *self._inflight)
+        self._inflight = {}
+
+    def _ensure_group(self, client: redis.Redis) -> None:
+        if self._group_ready:
+            return
+        try:
+            client.xgroup_create(self.queue_key, self.group, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+        self._group_ready = True
+
+    def _read_group(
+        self,
+        client: redis.Redis,
+        stream_id: str,
+        count: int,
+        block_ms: int | None,
+    ) -> list[tuple[bytes, dict[bytes, bytes] | None]]:
+        resp = client.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.queue_key: stream_id},
+            count=count,
+            block=block_ms,
+        )
+        if not resp:
+            return []
+        _key, entries = resp[0]
+        return list(entries)
+
+    def _claim_stale(self, client: redis.Redis, count: int) -> list[tuple[bytes, dict[bytes, bytes] | None]]:
+        # A new scan of the pending list starts at most once per claim_idle_ms. Once a scan
+        # finds stale entries, it resumes from XAUTOCLAIM's cursor on every pop until the cursor
+        # wraps to 0-0, so a dead consumer's whole backlog drains at pop speed.
+        if self._claim_cursor == START_ID:
+            now = time.monotonic()
+            if now - self._last_claim_ts < self.claim_idle_ms / 1000.0:
+                return []
+            self._last_claim_ts = now
+        while True:
+            resp = client.xautoclaim(
+                self.queue_key,
+                self.group,
+                self.consumer,
+                min_idle_time=self.claim_idle_ms,
+                start_id=self._claim_cursor,
+                count=count,
+            )
+            if not resp or len(resp) < 2:
+                self._claim_cursor = START_ID
+                return []
+            cursor = resp[0].decode("ascii") if isinstance(resp[0], bytes) else str(resp[0])
+            self._claim_cursor = START_ID if _parse_id(cursor) == (0, 0) else cursor
+            entries = list(resp[1])
+            if entries or self._claim_cursor == START_ID:
+                return entries
+
+    def _trim_consumed(self, client: redis.Redis) -> None:
+        # XACK leaves entries in the stream. Everything below the oldest entry any group still
+        # needs (its oldest pending id, or the one after its last delivered id) is dropped.
+        now = time.monotonic()
+        if now - self._last_trim_ts < self.trim_interval_s:
+            return
+        self._last_trim_ts = now
+        floor: tuple[int, int] | None = None
+        for group in client.xinfo_groups(self.queue_key):
+            pending = client.xpending(self.queue_key, group["name"])
+            if pending and int(pending.get("pending") or 0):
+                needed = _parse_id(pending["min"])
+            else:
+                ms, seq = _parse_id(group["last-delivered-id"])
+                needed = (ms, seq + 1)
+            floor = needed if floor is None else min(floor, needed)
+        if floor is not None and floor > (0, 1):
+            client.xtrim(self.queue_key, minid=f"{floor[0]}-{floor[1]}", approximate=False)
+
+    def _decode(
+        self,
+        client: redis.Redis,
+        entries: list[tuple[bytes, dict[bytes, bytes] | None]],
+    ) -> list[dict[str, Any]]:
+        alerts: list[dict[str, Any]] = []
+        dead_ids: list[bytes] = []
+        for entry_id, fields in entries:
+            # XAUTOCLAIM can hand back this consumer's own unacked entries once they idle past
+            # claim_idle_ms; they were already returned once.
+            if entry_id in self._inflight:
+                continue
+            payload = (fields or {}).get(STREAM_FIELD)
+            if payload is None:
+                dead_ids.append(entry_id)
+                continue
+            self._inflight[entry_id] = None
+            alerts.append(decode_message(payload, self.compression_stats))
+        if dead_ids:
+            client.xack(self.queue_key, self.group, *dead_ids)
+        return alerts
@@ -5,11 +5,18 @@ from typing import Any
 
 import numpy as np
 
+from module_alert_receiver.fields import FieldAccessor
+
 from .config import FeatureConfig
 from .feature_semantic import SemanticFeatureExtractor
 from .feature_structural import StructuralFeatureExtractor
 from .feature_temporal import TemporalFeatureExtractor
 
+# The temporal key keeps empty strings as values, unlike the structural tokens.
+KEY_SIP_FIELD = FieldAccessor(("source.ip", "sip", "src_ip"), skip_empty=False)
+KEY_DIP_FIELD = FieldAccessor(("destination.ip", "dip", "dst_ip"), skip_empty=False)
+KEY_RULE_FIELD = FieldAccessor(("rule.name", "rule_name"), skip_empty=False)
+
 
 @dataclass
 class FeaturePipeline:
@@ -61,26 +68,11 @@ class FeaturePipeline:
         return cls.from_config(cfg)
 
     def _temporal_key(self, raw_alert: dict[str, Any], context: dict[str, Any]) -> str:
-        sip = self._first(raw_alert, context, "source.ip", "sip", "src_ip")
-        dip = self._first(raw_alert, context, "destination.ip", "dip", "dst_ip")
-        rule = self._first(raw_alert, context, "rule.name", "rule_name")
+        sip = self._first(raw_alert, context, KEY_SIP_FIELD)
+        dip = self._first(raw_alert, context, KEY_DIP_FIELD)
+        rule = self._first(raw_alert, context, KEY_RULE_FIELD)
         return f"{sip}|{dip}|{rule}"
 
-    def _first(self, raw_alert: dict[str, Any], context: dict[str, Any], *paths: str) -> str:
-        for path in paths:
-            value = self._lookup(raw_alert, path)
-            if value is None:
-                value = self._lookup(context, path)
-            if value is not None:
-                return str(value)
-        return "-"
-
-    def _lookup(self, payload: dict[str, Any], dotted_path: str) -> Any:
-        if dotted_path in payload:
-            return payload[dotted_path]
-        current: Any = payload
-        for part in dotted_path.split("."):
-            if not isinstance(current, dict) or part not in current:
-                return None
-            current = current[part]
-        return current
+    def _first(self, raw_alert: dict[str, Any], context: dict[str, Any], accessor: FieldAccessor) -> str:
+        value = accessor.first(raw_alert, context)
+        return str(value) if value is not None else "-"
@@ -7,7 +7,22 @@ from typing import Any
 
 import numpy as np
 
+from module_alert_receiver.fields import FieldAccessor
+
 WORD_RE = re.compile(r"[A-Za-z0-9_]{2,}")
+SEMANTIC_FIELDS = tuple(
+    FieldAccessor((path,), skip_empty=False)
+    for path in (
+        "payload",
+        "message",
+        "http.request.body.content",
+        "http.request.body",
+        "uri_template",
+        "url.path",
+        "rule_name",
+        "log_type",
+    )
+)
 
 
 def _hash_to_bin(text: str, dim: int) -> int:
@@ -32,30 +47,9 @@ class SemanticFeatureExtractor:
         return vector
 
     def _build_semantic_text(self, raw_alert: dict[str, Any], context: dict[str, Any]) -> str:
-        fields = [
-            self._first(raw_alert, context, "payload"),
-            self._first(raw_alert, context, "message"),
-            self._first(raw_alert, context, "http.request.body.content"),
-            self._first(raw_alert, context, "http.request.body"),
-            self._first(raw_alert, context, "uri_template"),
-            self._first(raw_alert, context, "url.path"),
-            self._first(raw_alert, context, "rule_name"),
-            self._first(raw_alert, context, "log_type"),
-        ]
+        fields = [self._first(raw_alert, context, accessor) for accessor in SEMANTIC_FIELDS]
         return " ".join(item for item in fields if item)
 
-    def _first(self, raw_alert: dict[str, Any], context: dict[str, Any], path: str) -> str:
-        value = self._lookup(raw_alert, path)
-        if value is None:
-            value = self._lookup(context, path)
+    def _first(self, raw_alert: dict[str, Any], context: dict[str, Any], accessor: FieldAccessor) -> str:
+        value = accessor.first(raw_alert, context)
         return str(value) if value is not None else ""
-
-    def _lookup(self, payload: dict[str, Any], dotted_path: str) -> Any:
-        if dotted_path in payload:
-            return payload[dotted_path]
-        current: Any = payload
-        for part in dotted_path.split("."):
-            if not isinstance(current, dict) or part not in current:
-                return None
-            current = current[part]
-        return current
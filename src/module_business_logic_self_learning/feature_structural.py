@@ -7,6 +7,17 @@ from typing import Any
 
 import numpy as np
 
+from module_alert_receiver.fields import FieldAccessor
+
+SIP_FIELD = FieldAccessor(("source.ip", "src_ip", "sip"))
+DIP_FIELD = FieldAccessor(("destination.ip", "dst_ip", "dip"))
+PROTO_FIELD = FieldAccessor(("network.transport", "proto", "protocol"))
+RULE_NAME_FIELD = FieldAccessor(("rule.name", "rule_name"))
+URI_TEMPLATE_FIELD = FieldAccessor(("uri_template", "url.path", "http.request.uri", "uri"))
+LOG_TYPE_FIELD = FieldAccessor(("log_type", "event.dataset", "event.module", "type"))
+SPORT_FIELD = FieldAccessor(("source.port", "sport", "src_port"))
+DPORT_FIELD = FieldAccessor(("destination.port", "dport", "dst_port"))
+
 
 def _hash_to_bin(text: str, dim: int) -> int:
     digest = hashlib.sha1(text.encode("utf-8", errors="ignore")).hexdigest()
@@ -26,15 +37,15 @@ class StructuralFeatureExtractor:
         return vector
 
     def _categorical_tokens(self, raw_alert: dict[str, Any], context: dict[str, Any]) -> list[str]:
-        sip = self._first(raw_alert, context, "source.ip", "src_ip", "sip")
-        dip = self._first(raw_alert, context, "destination.ip", "dst_ip", "dip")
-        proto = self._first(raw_alert, context, "network.transport", "proto", "protocol")
-        rule_name = self._first(raw_alert, context, "rule.name", "rule_name")
-        uri_template = self._first(raw_alert, context, "uri_template", "url.path", "http.request.uri", "uri")
-        log_type = self._first(raw_alert, context, "log_type", "event.dataset", "event.module", "type")
+        sip = self._first(raw_alert, context, SIP_FIELD)
+        dip = self._first(raw_alert, context, DIP_FIELD)
+        proto = self._first(raw_alert, context, PROTO_FIELD)
+        rule_name = self._first(raw_alert, context, RULE_NAME_FIELD)
+        uri_template = self._first(raw_alert, context, URI_TEMPLATE_FIELD)
+        log_type = self._first(raw_alert, context, LOG_TYPE_FIELD)
 
-        sport = self._to_int(self._first(raw_alert, context, "source.port", "sport", "src_port"))
-        dport = self._to_int(self._first(raw_alert, context, "destination.port", "dport", "dst_port"))
+        sport = self._to_int(self._first(raw_alert, context, SPORT_FIELD))
+        dport = self._to_int(self._first(raw_alert, context, DPORT_FIELD))
         sport_bucket = self._port_bucket(sport)
         dport_bucket = self._port_bucket(dport)
 
@@ -60,24 +71,9 @@ class StructuralFeatureExtractor:
             return "registered"
         return "dynamic"
 
-    def _first(self, raw_alert: dict[str, Any], context: dict[str, Any], *paths: str) -> str:
-        for path in paths:
-            value = self._lookup(raw_alert, path)
-            if value is None:
-                value = self._lookup(context, path)
-            if value is not None and value != "":
-                return str(value)
-        return "-"
-
-    def _lookup(self, payload: dict[str, Any], dotted_path: str) -> Any:
-        if dotted_path in payload:
-            return payload[dotted_path]
-        current: Any = payload
-        for part in dotted_path.split("."):
-            if not isinstance(current, dict) or part not in current:
-                return None
-            current = current[part]
-        return current
+    def _first(self, raw_alert: dict[str, Any], context: dict[str, Any], accessor: FieldAccessor) -> str:
+        value = accessor.first(raw_alert, context)
+        return str(value) if value is not None else "-"
 
     def _to_int(self, value: Any) -> int:
         try:
@@ -6,8 +6,13 @@ from typing import Any
 
 import numpy as np
 
+from module_alert_receiver.fields import compile_path
+
 from .models import parse_datetime
 
+RAW_TIMESTAMP_GETTERS = (compile_path("@timestamp"), compile_path("timestamp"))
+CONTEXT_TIMESTAMP_GETTERS = (compile_path("last_seen"), compile_path("first_seen"))
+
 
 @dataclass
 class TemporalFeatureExtractor:
@@ -52,11 +57,8 @@ class TemporalFeatureExtractor:
 
     def _extract_timestamp(self, raw_alert: dict[str, Any], context: dict[str, Any]) -> datetime:
         candidates = (
-            self._lookup(raw_alert, "@timestamp"),
-            self._lookup(raw_alert, "timestamp"),
-            self._lookup(context, "last_seen"),
-            self._lookup(context, "first_seen"),
-            datetime.now(tz=UTC),
+            *(getter(raw_alert) for getter in RAW_TIMESTAMP_GETTERS),
+            *(getter(context) for getter in CONTEXT_TIMESTAMP_GETTERS),
         )
         for value in candidates:
             dt = parse_datetime(value)
@@ -64,16 +66,6 @@ class TemporalFeatureExtractor:
                 return dt
         return datetime.now(tz=UTC)
 
-    def _lookup(self, payload: dict[str, Any], dotted_path: str) -> Any:
-        if dotted_path in payload:
-            return payload[dotted_path]
-        current: Any = payload
-        for part in dotted_path.split("."):
-            if not isinstance(current, dict) or part not in current:
-                return None
-            current = current[part]
-        return current
-
     def _is_holiday(self, timestamp: datetime) -> float:
         # Lightweight approximation to keep dependency-free behavior.
         month_day = (timestamp.month, timestamp.day)
@@ -3,7 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any
 
-from module_alert_receiver.buffer import RedisAlertBuffer
+from module_alert_receiver.backpressure import with_backpressure
+from module_alert_receiver.buffer import build_buffer
 
 from .config import Module2Config
 from .matcher import BusinessAlertMatcher
@@ -26,26 +27,64 @@ class BusinessSelfLearningPipeline:
         )
 
     def run(self) -> None:
-        input_buffer = RedisAlertBuffer(
-            url=self.cfg.queue.redis_url,
-            queue_key=self.cfg.queue.input_key,
+        queue = self.cfg.queue
+        input_buffer = build_buffer(
+            queue.backend,
+            url=queue.redis_url,
+            queue_key=queue.input_key,
+            group=queue.consumer_group,
+            consumer=queue.consumer_name,
+            claim_idle_ms=queue.claim_idle_ms,
+            codec=queue.codec,
         )
-        output_buffer = RedisAlertBuffer(
-            url=self.cfg.queue.redis_url,
-            queue_key=self.cfg.queue.output_key,
-            maxlen=self.cfg.queue.output_maxlen,
+        output_buffer = with_backpressure(
+            build_buffer(
+                queue.backend,
+                url=queue.redis_url,
+                queue_key=queue.output_key,
+                maxlen=queue.output_maxlen,
+                codec=queue.codec,
+                compression=queue.compression,
+                compression_min_bytes=queue.compression_min_bytes,
+            ),
+            high_watermark=queue.output_high_watermark,
+            low_watermark=queue.output_low_watermark,
+            overflow_policy=queue.overflow_policy,
+            spill_key=queue.output_spill_key,
+            max_stall_s=queue.max_stall_s,
         )
-        suppressed_buffer = RedisAlertBuffer(
-            url=self.cfg.queue.redis_url,
-            queue_key=self.cfg.queue.suppressed_key,
-            maxlen=self.cfg.queue.suppressed_maxlen,
+        suppressed_buffer = build_buffer(
+            queue.backend,
+            url=queue.redis_url,
+            queue_key=queue.suppressed_key,
+            maxlen=queue.suppressed_maxlen,
+            codec=queue.codec,
+            compression=queue.compression,
+            compression_min_bytes=queue.compression_min_bytes,
         )
         redis_client = input_buffer.connect()
 
         while True:
-            payload = input_buffer.pop(redis_client, timeout_s=self.cfg.queue.pop_timeout_s)
-            if payload is None:
+            payloads = input_buffer.pop_many(
+                redis_client,
+                self.cfg.queue.pop_batch_size,
+                timeout_s=self.cfg.queue.pop_timeout_s,
+            )
+            if not payloads:
                 continue
+
+            outputs, suppressed = self.process_batch(payloads)
+            output_buffer.push_many(redis_client, outputs)
+            suppressed_buffer.push_many(redis_client, suppressed)
+            input_buffer.ack(redis_client)
+
+    def process_batch(
+        self,
+        payloads: list[dict[str, Any]],
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        outputs: list[dict[str, Any]] = []
+        suppressed: list[dict[str, Any]] = []
+        for payload in payloads:
             if not isinstance(payload, dict):
                 continue
 
@@ -58,9 +97,10 @@ class BusinessSelfLearningPipeline:
             output_payload = self._attach_decision(aggregated.raw, decision.to_dict(), len(raw_alerts))
 
             if decision.is_business_false_positive:
-                suppressed_buffer.push(redis_client, output_payload)
+                suppressed.append(output_payload)
             else:
-                output_buffer.push(redis_client, output_payload)
+                outputs.append(output_payload)
+        return outputs, suppressed
 
     def _attach_decision(
         self,
@@ -13,11 +13,26 @@ class QueueConfig:
     output_maxlen: int | None = None
     manual_review_maxlen: int | None = None
     pop_timeout_s: int = 1
+    pop_batch_size: int = 4
+    backend: str = "list"
+    consumer_group: str = "module3"
+    consumer_name: str | None = None
+    claim_idle_ms: int = 60000
+    codec: str = "json"
+    compression: str | None = None
+    compression_min_bytes: int = 1024
+    output_high_watermark: int | None = None
+    output_low_watermark: int | None = None
+    overflow_policy: str = "block"
+    output_spill_key: str | None = None
+    max_stall_s: float = 30.0
 
     @classmethod
     def from_env(cls) -> "QueueConfig":
         output_maxlen_env = getenv("M3_OUTPUT_MAXLEN", "")
         manual_maxlen_env = getenv("M3_MANUAL_MAXLEN", "")
+        high_env = getenv("M3_OUTPUT_HIGH_WATERMARK", "")
+        low_env = getenv("M3_OUTPUT_LOW_WATERMARK", "")
         return cls(
             redis_url=getenv("M3_REDIS_URL", cls.redis_url),
             input_key=getenv("M3_INPUT_KEY", cls.input_key),
@@ -26,6 +41,19 @@ class QueueConfig:
             output_maxlen=int(output_maxlen_env) if output_maxlen_env else None,
             manual_review_maxlen=int(manual_maxlen_env) if manual_maxlen_env else None,
             pop_timeout_s=int(getenv("M3_POP_TIMEOUT_S", str(cls.pop_timeout_s))),
+            pop_batch_size=int(getenv("M3_POP_BATCH_SIZE", str(cls.pop_batch_size))),
+            backend=getenv("M3_QUEUE_BACKEND", cls.backend),
+            consumer_group=getenv("M3_CONSUMER_GROUP", cls.consumer_group),
+            consumer_name=getenv("M3_CONSUMER_NAME", "") or None,
+            claim_idle_ms=int(getenv("M3_CLAIM_IDLE_MS", str(cls.claim_idle_ms))),
+            codec=getenv("M3_QUEUE_CODEC", cls.codec),
+            compression=getenv("M3_QUEUE_COMPRESSION", "") or None,
+            compression_min_bytes=int(getenv("M3_COMPRESSION_MIN_BYTES", str(cls.compression_min_bytes))),
+            output_high_watermark=int(high_env) if high_env else None,
+            output_low_watermark=int(low_env) if low_env else None,
+            overflow_policy=getenv("M3_OVERFLOW_POLICY", cls.overflow_policy),
+            output_spill_key=getenv("M3_OUTPUT_SPILL_KEY", "") or None,
+            max_stall_s=float(getenv("M3_MAX_STALL_S", str(cls.max_stall_s))),
         )
 
 
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from module_aggregation_filtering.asset_catalog import AssetCatalog, AssetProfile, synthetic_asset_rows
+
+
+class AssetCatalogTest(unittest.TestCase):
+    def test_longest_nested_cidr_wins_in_any_row_order(self) -> None:
+        rows = [
+            {"cidr": "10.0.0.0/8", "criticality": 0.1},
+            {"cidr": "10.1.0.0/16", "criticality": 0.2},
+            {"cidr": "10.1.2.0/24", "criticality": 0.3},
+        ]
+        for entries in (rows, rows[::-1]):
+            catalog = AssetCatalog(entries=entries)
+            self.assertEqual(catalog.resolve("10.1.2.3").criticality, 0.3)
+            self.assertEqual(catalog.resolve("10.1.9.9").criticality, 0.2)
+            self.assertEqual(catalog.resolve("10.9.9.9").criticality, 0.1)
+
+    def test_exact_ip_beats_a_longer_listed_cidr(self) -> None:
+        catalog = AssetCatalog(
+            entries=[
+                {"cidr": "192.168.1.0/24", "criticality": 0.2},
+                {"ip": "192.168.1.5", "criticality": 0.9, "sensitive": True},
+                {"cidr": "192.168.1.4/31", "criticality": 0.5},
+            ]
+        )
+        self.assertEqual(catalog.resolve("192.168.1.5"), AssetProfile(criticality=0.9, exposure=0.3, sensitive=True))
+        self.assertEqual(catalog.resolve("192.168.1.4").criticality, 0.5)
+
+    def test_ipv6_rows_do_not_match_ipv4_lookups(self) -> None:
+        catalog = AssetCatalog(
+            entries=[
+                {"cidr": "2001:db8::/32", "criticality": 0.6},
+                {"cidr": "2001:db8:1::/48", "criticality": 0.8},
+                {"ip": "2001:db8:1::1", "criticality": 1.0},
+                {"cidr": "0.0.0.0/0", "criticality": 0.05},
+            ]
+        )
+        self.assertEqual(catalog.resolve("2001:db8:1::1").criticality, 1.0)
+        self.assertEqual(catalog.resolve("2001:db8:1::2").criticality, 0.8)
+        self.assertEqual(catalog.resolve("2001:db8:2::2").criticality, 0.6)
+        self.assertEqual(catalog.resolve("2001:db9::1"), AssetProfile(criticality=0.5, exposure=0.7, sensitive=False))
+        self.assertEqual(catalog.resolve("8.8.8.8").criticality, 0.05)
+
+    def test_invalid_cidr_rows_are_skipped(self) -> None:
+        catalog = AssetCatalog(
+            entries=[
+                {"cidr": "10.0.0.0/33", "criticality": 0.9},
+                {"cidr": "not-a-network", "criticality": 0.9},
+                {"cidr": "10.0.0.0/8", "criticality": 0.3},
+            ]
+        )
+        self.assertEqual(catalog.resolve("10.0.0.1").criticality, 0.3)
+        self.assertEqual(catalog.resolve("not-an-ip"), AssetProfile())
+
+    def test_uncached_catalog_resolves_like_the_cached_one(self) -> None:
+        rows = synthetic_asset_rows(500, seed=3)
+        cached = AssetCatalog(entries=rows)
+        uncached = AssetCatalog(entries=rows, cache_size=0)
+        self.assertTrue(hasattr(cached._resolve_cached, "cache_info"))
+        self.assertFalse(hasattr(uncached._resolve_cached, "cache_info"))
+        ips = [row.get("ip") or row["cidr"].split("/")[0] for row in rows] + ["10.255.255.255", "172.16.0.1"]
+        for ip_text in ips:
+            self.assertEqual(uncached.resolve(ip_text), cached.resolve(ip_text))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+import uuid
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import redis
+
+from module_alert_receiver.backpressure import BackpressureGate, with_backpressure
+from module_alert_receiver.buffer import RedisAlertBuffer
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+def _redis_available() -> bool:
+    try:
+        return bool(redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).ping())
+    except redis.RedisError:
+        return False
+
+
+@unittest.skipUnless(_redis_available(), f"no Redis at {REDIS_URL}")
+class BackpressureGateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
+        self.prefix = f"test:backpressure:{uuid.uuid4().hex}"
+        self.buffer = RedisAlertBuffer(url=REDIS_URL, queue_key=f"{self.prefix}:q")
+        self.buffer.push_many(self.client, [{"id": f"old{idx}"} for idx in range(10)])
+        self.depths: list[int] = []
+
+    def tearDown(self) -> None:
+        keys = self.client.keys(f"{self.prefix}*")
+        if keys:
+            self.client.delete(*keys)
+
+    def _drain_one_per_poll(self) -> None:
+        # Stands in for a consumer: every depth check after the first sees one alert fewer.
+        depth = self.buffer.depth
+
+        def draining_depth(client: redis.Redis) -> int:
+            if self.depths:
+                client.lpop(self.buffer.queue_key)
+            self.depths.append(depth(client))
+            return self.depths[-1]
+
+        self.buffer.depth = draining_depth
+
+    def test_push_over_high_watermark_waits_for_the_low_one(self) -> None:
+        gate = with_backpressure(self.buffer, high_watermark=10, low_watermark=4)
+        gate.poll_interval_s = 0.0
+        self._drain_one_per_poll()
+
+        self.assertEqual(gate.push_many(self.client, [{"id": "new"}]), 1)
+        # Dropping below the high watermark (9) is not enough once stalled.
+        self.assertEqual(self.depths, [10, 9, 8, 7, 6, 5, 4])
+        self.assertEqual(self.client.llen(self.buffer.queue_key), 5)
+        self.assertEqual((gate.stats.stalls, gate.stats.max_depth, gate.stats.spilled_pages), (1, 10, 0))
+
+    def test_push_below_high_watermark_does_not_stall(self) -> None:
+        gate = with_backpressure(self.buffer, high_watermark=11)
+        gate.push_many(self.client, [{"id": "new"}])
+        self.assertEqual(self.client.llen(self.buffer.queue_key), 11)
+        self.assertEqual(gate.stats.stalls, 0)
+
+    def test_spill_policy_diverts_a_page_after_max_stall(self) -> None:
+        gate = with_backpressure(self.buffer, high_watermark=10, overflow_policy="spill", max_stall_s=0.0)
+        self.assertEqual(gate.push_many(self.client, [{"id": "a"}, {"id": "b"}]), 2)
+
+        spill_key = f"{self.buffer.queue_key}:spill"
+        self.assertEqual(gate.spill_buffer.queue_key, spill_key)
+        self.assertEqual(self.client.llen(self.buffer.queue_key), 10)
+        self.assertEqual(gate.spill_buffer.pop_many(self.client, 10, timeout_s=1), [{"id": "a"}, {"id": "b"}])
+        self.assertEqual((gate.stats.spilled_pages, gate.stats.spilled_alerts), (1, 2))
+
+    def test_block_policy_never_spills(self) -> None:
+        gate = with_backpressure(self.buffer, high_watermark=10, low_watermark=9, max_stall_s=0.0)
+        gate.poll_interval_s = 0.0
+        self._drain_one_per_poll()
+        gate.push_many(self.client, [{"id": "new"}])
+        self.assertEqual(self.client.exists(f"{self.buffer.queue_key}:spill"), 0)
+        self.assertEqual(self.client.llen(self.buffer.queue_key), 10)
+
+    def test_gate_configuration(self) -> None:
+        self.assertIs(with_backpressure(self.buffer, high_watermark=None), self.buffer)
+        self.assertEqual(with_backpressure(self.buffer, high_watermark=10).low_watermark, 5)
+        self.assertEqual(BackpressureGate(self.buffer, high_watermark=10, low_watermark=20).low_watermark, 10)
+        with self.assertRaises(ValueError):
+            BackpressureGate(self.buffer, high_watermark=10, low_watermark=5, overflow_policy="spill")
+        with self.assertRaises(ValueError):
+            BackpressureGate(self.buffer, high_watermark=10, low_watermark=5, overflow_policy="drop")
+
+
+if __name__ == "__main__":
+    unittest.main()
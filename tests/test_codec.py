@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import unittest
+import uuid
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import redis
+
+from module_alert_receiver.buffer import build_buffer
+from module_alert_receiver.codec import MAGIC, AlertCodec, available_codecs, decode_message, encode_message, get_codec
+from module_alert_receiver.compression import FLAG_ZLIB, FLAG_ZSTD, CompressionStats, Compressor, get_compressor
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+ALERT = {
+    "id": "a1",
+    "@timestamp": "2026-01-01T00:00:00Z",
+    "src_ip": "10.0.0.1",
+    "rule_name": "sql injection 注入",
+    "score": 7.5,
+    "tags": ["waf", None, True],
+    "nested": {"uri": "/login?id=1", "count": 3},
+}
+
+
+def _redis_available() -> bool:
+    try:
+        return bool(redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).ping())
+    except redis.RedisError:
+        return False
+
+
+def _installed_codecs() -> list[AlertCodec]:
+    codecs = []
+    for name in available_codecs():
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            continue
+    return codecs
+
+
+class CodecTest(unittest.TestCase):
+    def test_every_installed_codec_round_trips(self) -> None:
+        for codec in _installed_codecs():
+            with self.subTest(codec=codec.name):
+                payload = encode_message(ALERT, codec)
+                self.assertEqual(decode_message(payload), ALERT)
+
+    def test_plain_json_stays_headerless(self) -> None:
+        payload = encode_message(ALERT, get_codec("json"))
+        self.assertEqual(json.loads(payload), ALERT)
+        self.assertEqual(decode_message(payload.decode("utf-8")), ALERT)
+
+    def test_other_codecs_carry_their_id_in_the_header(self) -> None:
+        for codec in _installed_codecs():
+            if codec.name == "json":
+                continue
+            with self.subTest(codec=codec.name):
+                payload = encode_message(ALERT, codec)
+                self.assertEqual(payload[:3], bytes((MAGIC, codec.codec_id, 0)))
+
+    def test_unknown_codec_id_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            decode_message(bytes((MAGIC, 99, 0)) + b"{}")
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+
+def _installed_compressors() -> list[Compressor]:
+    compressors = []
+    for name in ("zlib", "zstd"):
+        try:
+            compressors.append(get_compressor(name))
+        except ImportError:
+            continue
+    return compressors
+
+
+class CompressionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.large = dict(ALERT, body="select * from users where id=1 " * 100)
+
+    def test_every_codec_and_compressor_pair_round_trips(self) -> None:
+        for codec in _installed_codecs():
+            for compressor in _installed_compressors():
+                with self.subTest(codec=codec.name, compressor=compressor.name):
+                    stats = CompressionStats()
+                    payload = encode_message(self.large, codec, compressor, min_bytes=1024, stats=stats)
+                    self.assertEqual(payload[:3], bytes((MAGIC, codec.codec_id, compressor.flag)))
+                    self.assertEqual(decode_message(payload, stats), self.large)
+                    self.assertEqual((stats.compressed, stats.decompressed), (1, 1))
+                    self.assertLess(stats.stored_bytes, stats.raw_bytes)
+
+    def test_bodies_below_min_bytes_stay_uncompressed(self) -> None:
+        for compressor in _installed_compressors():
+            with self.subTest(compressor=compressor.name):
+                payload = encode_message(ALERT, get_codec("json"), compressor, min_bytes=1 << 20)
+                self.assertEqual(json.loads(payload), ALERT)
+
+    def test_bodies_that_would_grow_stay_uncompressed(self) -> None:
+        for compressor in _installed_compressors():
+            with self.subTest(compressor=compressor.name):
+                stats = CompressionStats()
+                payload = encode_message({"a": 1}, get_codec("json"), compressor, min_bytes=0, stats=stats)
+                self.assertEqual(payload, b'{"a":1}')
+                self.assertEqual((stats.messages, stats.compressed), (1, 0))
+
+    def test_unknown_compression_flags_are_rejected(self) -> None:
+        body = get_codec("json").encode(ALERT)
+        with self.assertRaises(ValueError):
+            decode_message(bytes((MAGIC, 0, 0x04)) + body)
+        with self.assertRaises(ValueError):
+            decode_message(bytes((MAGIC, 0, FLAG_ZLIB | FLAG_ZSTD)) + body)
+
+
+@unittest.skipUnless(_redis_available(), f"no Redis at {REDIS_URL}")
+class MixedCodecQueueTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
+        self.queue_key = f"test:codec:{uuid.uuid4().hex}"
+
+    def tearDown(self) -> None:
+        self.client.delete(self.queue_key)
+
+    def test_one_consumer_reads_every_producer_codec(self) -> None:
+        codecs = [codec.name for codec in _installed_codecs()]
+        for name in codecs:
+            producer = build_buffer("list", url=REDIS_URL, queue_key=self.queue_key, codec=name)
+            producer.push_many(self.client, [dict(ALERT, id=name)])
+        consumer = build_buffer("list", url=REDIS_URL, queue_key=self.queue_key)
+        popped = consumer.pop_many(self.client, len(codecs) + 1, timeout_s=1)
+        self.assertEqual(popped, [dict(ALERT, id=name) for name in codecs])
+
+    def test_compressed_and_plain_producers_share_a_queue(self) -> None:
+        large = dict(ALERT, body="x" * 4096)
+        plain = build_buffer("list", url=REDIS_URL, queue_key=self.queue_key)
+        packed = build_buffer("list", url=REDIS_URL, queue_key=self.queue_key, compression="zlib", compression_min_bytes=1024)
+        plain.push_many(self.client, [large])
+        packed.push_many(self.client, [ALERT, large])
+        self.assertEqual(packed.compression_stats.compressed, 1)
+        self.assertEqual(plain.pop_many(self.client, 4, timeout_s=1), [large, ALERT, large])
+
+
+if __name__ == "__main__":
+    unittest.main()
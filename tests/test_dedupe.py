@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+import uuid
+from pathlib import Path
+from typing import Any
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import redis
+
+from module_aggregation_filtering.normalizer import AlertNormalizer
+from module_alert_receiver.async_receiver import _push_pages
+from module_alert_receiver.dedupe import AlertDeduplicator, RedisRotatingBloomFilter, RotatingBloomFilter
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+def _redis_available() -> bool:
+    try:
+        return bool(redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).ping())
+    except redis.RedisError:
+        return False
+
+
+class _Crash(Exception):
+    pass
+
+
+class _Stop(Exception):
+    pass
+
+
+class _PageBuffer:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.pages: list[list[dict[str, Any]]] = []
+
+    async def apush_many(self, client: Any, alerts: list[dict[str, Any]]) -> int:
+        if self.fail:
+            raise _Crash()
+        self.pages.append(list(alerts))
+        return len(alerts)
+
+
+class _StopAtSave:
+    # Ends the push loop at the first cursor save and records what was marked by then.
+    def __init__(self, dedupe: AlertDeduplicator, page: list[dict[str, Any]]) -> None:
+        self.dedupe = dedupe
+        self.page = page
+        self.unmarked_at_save: list[dict[str, Any]] | None = None
+
+    def save(self, cursor: Any) -> None:
+        self.unmarked_at_save = self.dedupe.filter_page(self.page)
+        raise _Stop()
+
+
+class DeduplicatorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dedupe = AlertDeduplicator(bloom=RotatingBloomFilter(capacity=1000), id_func=AlertNormalizer().raw_id)
+        self.page = [{"_id": "a"}, {"_id": "b"}, {"src_ip": "10.0.0.1", "uri": "/login"}]
+
+    def _push(self, buffer: _PageBuffer, checkpoint: Any = None) -> None:
+        async def run() -> None:
+            pages: asyncio.Queue = asyncio.Queue()
+            await pages.put((list(self.page), ["cursor"]))
+            await _push_pages(buffer, None, pages, checkpoint, self.dedupe)
+
+        asyncio.run(run())
+
+    def test_failed_push_leaves_the_page_unmarked(self) -> None:
+        with self.assertRaises(_Crash):
+            self._push(_PageBuffer(fail=True))
+        self.assertEqual(self.dedupe.filter_page(self.page), self.page)
+
+    def test_page_is_marked_after_the_push_and_before_the_cursor_save(self) -> None:
+        buffer = _PageBuffer()
+        checkpoint = _StopAtSave(self.dedupe, self.page)
+        with self.assertRaises(_Stop):
+            self._push(buffer, checkpoint)
+        self.assertEqual(buffer.pages, [self.page])
+        self.assertEqual(checkpoint.unmarked_at_save, [])
+        self.assertEqual(self.dedupe.raced, 0)
+
+    def test_alert_without_id_or_timestamp_keeps_its_id(self) -> None:
+        normalizer = AlertNormalizer()
+        alert = {"src_ip": "10.0.0.1", "@timestamp": "not a time"}
+        first = normalizer.raw_id(alert)
+        time.sleep(0.001)
+        self.assertEqual(normalizer.raw_id(alert), first)
+        self.assertEqual(normalizer.normalize(alert).raw_id, first)
+        self.dedupe.mark([alert])
+        self.assertEqual(self.dedupe.filter_page([dict(alert)]), [])
+
+    def test_filter_page_only_tests(self) -> None:
+        page = [{"_id": "a"}, {"_id": "a"}, {"_id": "b"}]
+        self.assertEqual(self.dedupe.filter_page(page), [{"_id": "a"}, {"_id": "b"}])
+        self.assertEqual(self.dedupe.filter_page(page), [{"_id": "a"}, {"_id": "b"}])
+        self.dedupe.mark([{"_id": "a"}])
+        self.assertEqual(self.dedupe.filter_page(page), [{"_id": "b"}])
+
+
+@unittest.skipUnless(_redis_available(), f"no Redis at {REDIS_URL}")
+class RedisBloomTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
+        self.prefix = f"test:dedupe:{uuid.uuid4().hex}"
+
+    def tearDown(self) -> None:
+        keys = self.client.keys(f"{self.prefix}*")
+        if keys:
+            self.client.delete(*keys)
+
+    def _bloom(self) -> RedisRotatingBloomFilter:
+        return RedisRotatingBloomFilter(capacity=1000, window_s=60.0, url=REDIS_URL, key_prefix=self.prefix)
+
+    def test_receivers_sharing_redis_see_each_others_marks(self) -> None:
+        first, second = self._bloom(), self._bloom()
+        self.assertEqual(first.test_many(["a", "b"]), [False, False])
+        self.assertEqual(first.seen_many(["a", "a", "b"]), [False, True, False])
+        self.assertEqual(second.test_many(["a", "b", "c"]), [True, True, False])
+        self.assertEqual(second.seen_many(["b", "c"]), [True, False])
+
+    def test_generations_expire_after_the_window(self) -> None:
+        bloom = self._bloom()
+        bloom.seen_many(["a"], now=0.0)
+        self.assertEqual(bloom.test_many(["a"], now=60.0), [True])
+        self.assertEqual(bloom.test_many(["a"], now=120.0), [False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import sys
+import threading
+import unittest
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from module_alert_receiver.adaptive import ReceiverMetrics
+from module_alert_receiver.fanin import FanInReceiver, FanInSource
+
+
+class _IdleReceiver:
+    # Stands in for ElasticAlertReceiver: the tests queue pages directly, so nothing is fetched.
+    def __init__(self) -> None:
+        self.metrics = ReceiverMetrics()
+        self.search_after = None
+
+    def stream_pages(self) -> Iterable[list[dict[str, Any]]]:
+        return iter(())
+
+
+def _source(name: str, weight: float = 1.0, pages: int = 0, page_size: int = 10) -> FanInSource:
+    source = FanInSource(name=name, receiver=_IdleReceiver(), weight=weight, prefetch_pages=100)
+    for idx in range(pages):
+        source.pages.put(([{"id": f"{name}{idx}"}] * page_size, [idx]))
+    return source
+
+
+def _take(fanin: FanInReceiver, count: int) -> list[str]:
+    names: list[str] = []
+    for source, _page, _cursor in fanin.stream_pages():
+        names.append(source.name)
+        if len(names) == count:
+            break
+    return names
+
+
+class FanInReceiverTest(unittest.TestCase):
+    def test_pages_are_shared_by_weight(self) -> None:
+        fanin = FanInReceiver(sources=[_source("waf", weight=2, pages=50), _source("huorong", pages=50)], wait_s=0.01)
+        counts = Counter(_take(fanin, 30))
+        fanin.stop()
+        self.assertEqual(counts, Counter(waf=20, huorong=10))
+
+    def test_page_size_counts_not_page_count(self) -> None:
+        big = _source("big", pages=50, page_size=40)
+        small = _source("small", pages=50, page_size=10)
+        fanin = FanInReceiver(sources=[big, small], wait_s=0.01)
+        counts = Counter(_take(fanin, 25))
+        fanin.stop()
+        self.assertEqual(counts, Counter(big=5, small=20))
+
+    def test_source_returning_from_idle_does_not_catch_up(self) -> None:
+        busy, idle = _source("busy", pages=50), _source("idle")
+        fanin = FanInReceiver(sources=[busy, idle], wait_s=0.01)
+        pages = fanin.stream_pages()
+        for _ in range(20):
+            self.assertEqual(next(pages)[0].name, "busy")
+        for idx in range(20):
+            idle.pages.put(([{"id": f"idle{idx}"}] * 10, [idx]))
+        names = [next(pages)[0].name for _ in range(10)]
+        fanin.stop()
+        self.assertEqual(Counter(names), Counter(busy=5, idle=5))
+
+    def test_lag_is_reported_while_no_pages_arrive(self) -> None:
+        reports: list[dict[str, dict[str, Any]]] = []
+        fanin = FanInReceiver(sources=[_source("waf")], wait_s=0.01, lag_report_interval_s=0.02)
+
+        def collect(report: dict[str, dict[str, Any]]) -> None:
+            reports.append(report)
+            if len(reports) == 3:
+                fanin.stop()
+
+        fanin.on_lag_report = collect
+        consumer = threading.Thread(target=lambda: list(fanin.stream_pages()), daemon=True)
+        consumer.start()
+        consumer.join(timeout=5)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(len(reports), 3)
+        self.assertEqual(reports[0]["waf"]["queued_pages"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import os
+import random
+import sys
+import unittest
+import uuid
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import redis
+
+from module_aggregation_filtering.history_store import RedisHistoryStore, RollingHistoryStore, top_history_buckets
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+def _redis_available() -> bool:
+    try:
+        return bool(redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).ping())
+    except redis.RedisError:
+        return False
+
+
+class _Crash(Exception):
+    pass
+
+
+@unittest.skipUnless(_redis_available(), f"no Redis at {REDIS_URL}")
+class RollingHistoryStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
+        self.prefix = f"test:history:{uuid.uuid4().hex}"
+        self.keys = [f"bucket-{idx}" for idx in range(100)]
+        self.daily = RedisHistoryStore(key_prefix=f"{self.prefix}:daily", history_days=3)
+        # Past days only: records dated after today are rejected by design.
+        self.origin = datetime.now(UTC).replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=10)
+
+    def tearDown(self) -> None:
+        keys = self.client.keys(f"{self.prefix}*")
+        if keys:
+            self.client.delete(*keys)
+
+    def _rolling(self) -> RollingHistoryStore:
+        return RollingHistoryStore(key_prefix=f"{self.prefix}:rolling", history_days=3, retire_chunk_size=10)
+
+    def _record_days(self, stores: list[RedisHistoryStore], days: int) -> None:
+        rng = random.Random(7)
+        for day in range(days):
+            records = [(key, rng.randint(1, 9), self.origin + timedelta(days=day)) for key in self.keys]
+            for store in stores:
+                store.record_many(self.client, records)
+
+    def test_reads_stay_exact_while_a_day_is_retiring(self) -> None:
+        rolling = self._rolling()
+        self._record_days([self.daily, rolling], 3)
+        now = self.origin + timedelta(days=3)
+
+        chunks = 0
+        retire_chunk = rolling._retire_chunk
+
+        def crash_after_first_chunk(*args: object) -> None:
+            nonlocal chunks
+            chunks += 1
+            if chunks > 1:
+                raise _Crash()
+            retire_chunk(*args)
+
+        rolling._retire_chunk = crash_after_first_chunk
+        with self.assertRaises(_Crash):
+            rolling.rollover(self.client, now)
+        self.assertEqual(self.client.zcard(rolling._retiring_key), 1)
+
+        reader = self._rolling()
+        reader._rolled_cutoff = (now - timedelta(days=2)).date()
+        self.assertEqual(reader.get_daily_avgs(self.client, self.keys, now), self.daily.get_daily_avgs(self.client, self.keys, now))
+
+        # A second worker picks up the half-retired day and finishes it.
+        self.assertEqual(self._rolling().rollover(self.client, now), 1)
+        self.assertEqual(self.client.zcard(rolling._retiring_key), 0)
+        self.assertEqual(self.client.exists(rolling._daily_hash_key(self.origin.date().isoformat())), 0)
+        self.assertEqual(reader.get_daily_avgs(self.client, self.keys, now), self.daily.get_daily_avgs(self.client, self.keys, now))
+
+    def test_days_after_today_are_not_recorded(self) -> None:
+        rolling = self._rolling()
+        tomorrow = datetime.now(UTC) + timedelta(days=1)
+        rolling.record_many(self.client, [(self.keys[0], 5, tomorrow)])
+        self.assertIsNone(self.client.hget(rolling._sum_key, self.keys[0]))
+        self.assertEqual(self.client.zcard(rolling._days_index_key), 0)
+
+    def test_reader_behind_a_writer_ignores_the_newer_day(self) -> None:
+        # Around midnight one worker may already record a day another worker's window ends before.
+        rolling = self._rolling()
+        self._record_days([self.daily, rolling], 3)
+        now = self.origin + timedelta(days=1)
+        self.assertEqual(rolling.get_daily_avgs(self.client, self.keys, now), self.daily.get_daily_avgs(self.client, self.keys, now))
+
+
+class _CountingRedis:
+    def __init__(self, client: redis.Redis) -> None:
+        self._client = client
+        self.round_trips = 0
+
+    def pipeline(self, *args: object, **kwargs: object) -> "_CountingPipeline":
+        return _CountingPipeline(self, self._client.pipeline(*args, **kwargs))
+
+    def __getattr__(self, name: str) -> object:
+        attr = getattr(self._client, name)
+        if callable(attr):
+
+            def call(*args: object, **kwargs: object) -> object:
+                self.round_trips += 1
+                return attr(*args, **kwargs)
+
+            return call
+        return attr
+
+
+class _CountingPipeline:
+    def __init__(self, owner: _CountingRedis, pipe: object) -> None:
+        self._owner = owner
+        self._pipe = pipe
+
+    def execute(self) -> list[object]:
+        self._owner.round_trips += 1
+        return self._pipe.execute()
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self._pipe, name)
+
+
+@unittest.skipUnless(_redis_available(), f"no Redis at {REDIS_URL}")
+class DailyHistoryStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
+        self.prefix = f"test:history:{uuid.uuid4().hex}"
+        self.today = datetime.now(UTC).replace(hour=12, minute=0, second=0, microsecond=0)
+
+    def tearDown(self) -> None:
+        keys = self.client.keys(f"{self.prefix}*")
+        if keys:
+            self.client.delete(*keys)
+
+    def _store(self) -> RedisHistoryStore:
+        return RedisHistoryStore(key_prefix=self.prefix, history_days=3)
+
+    def test_day_added_by_another_worker_changes_the_divisor_at_once(self) -> None:
+        reader, writer = self._store(), self._store()
+        writer.record_many(self.client, [("bucket", 6, self.today - timedelta(days=1))])
+        self.assertEqual(reader.get_daily_avgs(self.client, ["bucket"], self.today), [6.0])
+        writer.record_many(self.client, [("other", 1, self.today)])
+        self.assertEqual(reader.get_daily_avgs(self.client, ["bucket"], self.today), [3.0])
+
+    def test_read_and_record_is_one_round_trip(self) -> None:
+        store = self._store()
+        store.record_many(self.client, [("bucket", 4, self.today - timedelta(days=1))])
+        counting = _CountingRedis(self.client)
+        avgs = store.read_and_record(counting, [("bucket", 2, self.today), ("new", 1, self.today)], self.today)
+        self.assertEqual(avgs, [4.0, 0.0])
+        self.assertEqual(counting.round_trips, 1)
+        self.assertEqual(store.get_daily_avgs(self.client, ["bucket"], self.today), [3.0])
+
+    def test_discarded_batch_does_not_skip_the_prune(self) -> None:
+        store = self._store()
+        stale = self.today - timedelta(days=5)
+        store.record_many(self.client, [("bucket", 1, stale)])
+        pipe = self.client.pipeline(transaction=True)
+        store.queue_record_many(self.client, pipe, [("bucket", 1, self.today)])
+        pipe.reset()
+
+        store.record_many(self.client, [("bucket", 1, self.today)])
+        self.assertEqual(self.client.zrange(store._days_index_key, 0, -1), [self.today.date().isoformat().encode()])
+        self.assertEqual(self.client.exists(store._daily_hash_key(stale.date().isoformat())), 0)
+
+    def test_top_buckets_resolve_digests_through_debug_keys(self) -> None:
+        store = RedisHistoryStore(key_prefix=self.prefix, history_days=3, key_digest_bits=64, debug_keys=True)
+        store.record_many(self.client, [("big", 9, self.today), ("small", 2, self.today)])
+        self.client.hincrby(store._daily_hash_key(self.today.date().isoformat()), b"\x00" * 8, 5)
+
+        rows = top_history_buckets(self.client, store, self.today.date(), limit=3)
+        self.assertEqual([(row.bucket_key, row.count) for row in rows], [("big", 9), (None, 5), ("small", 2)])
+        self.assertEqual(rows[0].field, store.bucket_field("big").hex())
+        self.assertEqual(store.resolve_bucket_keys(self.client, []), [])
+
+    def test_top_buckets_with_full_key_fields(self) -> None:
+        store = self._store()
+        store.record_many(self.client, [("a|b", 3, self.today), ("c|d", 4, self.today)])
+        rows = top_history_buckets(self.client, store, self.today.date(), limit=1)
+        self.assertEqual([(row.bucket_key, row.field, row.count) for row in rows], [("c|d", "c|d", 4)])
+
+
+if __name__ == "__main__":
+    unittest.main()
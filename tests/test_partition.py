@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+import uuid
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import redis
+
+from module_aggregation_filtering.config import (
+    AggregationConfig,
+    AssetConfig,
+    HistoryConfig,
+    Module1Config,
+    QueueConfig,
+    ScoringConfig,
+    WindowCheckpointConfig,
+)
+from module_aggregation_filtering.partition import check_partition_layout, worker_config
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+def _redis_available() -> bool:
+    try:
+        return bool(redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).ping())
+    except redis.RedisError:
+        return False
+
+
+@unittest.skipUnless(_redis_available(), f"no Redis at {REDIS_URL}")
+class PartitionLayoutTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
+        self.prefix = f"test:partition:{uuid.uuid4().hex}"
+        self.cfg = Module1Config(
+            queue=QueueConfig(
+                redis_url=REDIS_URL,
+                input_key=f"{self.prefix}:in",
+                processing_key=f"{self.prefix}:proc",
+            ),
+            aggregation=AggregationConfig(),
+            scoring=ScoringConfig(),
+            asset=AssetConfig(),
+            history=HistoryConfig(),
+            checkpoint=WindowCheckpointConfig(backend="redis", key=f"{self.prefix}:ckpt"),
+        )
+
+    def tearDown(self) -> None:
+        keys = self.client.keys(f"{self.prefix}*")
+        if keys:
+            self.client.delete(*keys)
+
+    def test_same_worker_count_restarts(self) -> None:
+        check_partition_layout(self.client, self.cfg, 2)
+        self.client.hset(worker_config(self.cfg, 1, 2).checkpoint.key, "bucket", "{}")
+        check_partition_layout(self.client, self.cfg, 2)
+
+    def test_changed_worker_count_with_open_buckets_is_refused(self) -> None:
+        check_partition_layout(self.client, self.cfg, 2)
+        self.client.hset(worker_config(self.cfg, 0, 2).checkpoint.key, "bucket", "{}")
+        with self.assertRaises(RuntimeError):
+            check_partition_layout(self.client, self.cfg, 4)
+        with self.assertRaises(RuntimeError):
+            check_partition_layout(self.client, self.cfg, 1)
+
+    def test_changed_worker_count_after_drain_starts(self) -> None:
+        check_partition_layout(self.client, self.cfg, 4)
+        check_partition_layout(self.client, self.cfg, 2)
+        self.assertEqual(self.client.get(f"{self.cfg.queue.input_key}:workers"), b"2")
+
+    def test_state_from_before_the_marker_is_detected(self) -> None:
+        self.client.rpush(worker_config(self.cfg, 3, 4).queue.processing_key, b"alert")
+        with self.assertRaises(RuntimeError):
+            check_partition_layout(self.client, self.cfg, 2)
+        self.client.hset(self.cfg.checkpoint.key, "bucket", "{}")
+        with self.assertRaises(RuntimeError):
+            check_partition_layout(self.client, self.cfg, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
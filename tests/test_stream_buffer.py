@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+import unittest
+import uuid
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import redis
+
+from module_alert_receiver.stream_buffer import RedisStreamAlertBuffer, _group_backlog
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+def _redis_available() -> bool:
+    try:
+        return bool(redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).ping())
+    except redis.RedisError:
+        return False
+
+
+@unittest.skipUnless(_redis_available(), f"no Redis at {REDIS_URL}")
+class RedisStreamAlertBufferTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
+        self.key = f"test:stream:{uuid.uuid4().hex}"
+
+    def tearDown(self) -> None:
+        self.client.delete(self.key)
+
+    def _buffer(self, consumer: str, **kwargs: object) -> RedisStreamAlertBuffer:
+        return RedisStreamAlertBuffer(url=REDIS_URL, queue_key=self.key, group="test", consumer=consumer, **kwargs)
+
+    def test_round_trip_and_trim_after_ack(self) -> None:
+        producer = self._buffer("producer")
+        consumer = self._buffer("worker", trim_interval_s=0.0)
+        producer.push_many(self.client, [{"id": idx} for idx in range(10)])
+
+        alerts = consumer.pop_many(self.client, 10, timeout_s=1)
+        self.assertEqual([alert["id"] for alert in alerts], list(range(10)))
+        consumer.ack(self.client)
+        self.assertEqual(consumer.pop_many(self.client, 10, timeout_s=1), [])
+        self.assertEqual(self.client.xlen(self.key), 0)
+
+    def test_trim_keeps_pending_entries(self) -> None:
+        producer = self._buffer("producer")
+        consumer = self._buffer("worker", trim_interval_s=0.0)
+        producer.push_many(self.client, [{"id": idx} for idx in range(4)])
+
+        consumer.pop_many(self.client, 2, timeout_s=1)
+        consumer._trim_consumed(self.client)
+        self.assertEqual(self.client.xlen(self.key), 4)
+
+    def test_dead_consumer_backlog_is_claimed_without_waiting(self) -> None:
+        producer = self._buffer("producer")
+        dead = self._buffer("dead")
+        producer.push_many(self.client, [{"id": idx} for idx in range(25)])
+        self.assertEqual(len(dead.pop_many(self.client, 25, timeout_s=1)), 25)
+
+        time.sleep(0.2)
+
+        # Pops far apart less than claim_idle_ms still drain the whole backlog via the cursor.
+        survivor = self._buffer("survivor", claim_idle_ms=100)
+        claimed: list[int] = []
+        for _ in range(3):
+            claimed.extend(alert["id"] for alert in survivor.pop_many(self.client, 10, timeout_s=1))
+            survivor.ack(self.client)
+        self.assertEqual(sorted(claimed), list(range(25)))
+
+    def test_stable_consumer_replays_own_pending_after_restart(self) -> None:
+        producer = self._buffer("producer")
+        producer.push_many(self.client, [{"id": 1}, {"id": 2}])
+        self._buffer("worker-0", stable_consumer=True).pop_many(self.client, 2, timeout_s=1)
+
+        restarted = self._buffer("worker-0", stable_consumer=True)
+        self.assertEqual([alert["id"] for alert in restarted.pop_many(self.client, 2, timeout_s=1)], [1, 2])
+
+    def test_stable_consumer_does_not_redeliver_before_ack(self) -> None:
+        # A window checkpoint defers the ack across many pops; pending entries replay only once.
+        producer = self._buffer("producer")
+        producer.push_many(self.client, [{"id": idx} for idx in range(3)])
+        self._buffer("worker-0", stable_consumer=True).pop_many(self.client, 3, timeout_s=1)
+
+        restarted = self._buffer("worker-0", stable_consumer=True)
+        self.assertEqual([alert["id"] for alert in restarted.pop_many(self.client, 10, timeout_s=1)], [0, 1, 2])
+        self.assertEqual(restarted.pop_many(self.client, 10, timeout_s=1), [])
+        producer.push_many(self.client, [{"id": 3}])
+        self.assertEqual([alert["id"] for alert in restarted.pop_many(self.client, 10, timeout_s=1)], [3])
+        self.assertEqual(len(restarted._inflight), 4)
+
+    def test_fresh_consumer_does_not_redeliver_before_ack(self) -> None:
+        producer = self._buffer("producer")
+        consumer = self._buffer("worker", stable_consumer=True)
+        producer.push_many(self.client, [{"id": idx} for idx in range(3)])
+        self.assertEqual(len(consumer.pop_many(self.client, 10, timeout_s=1)), 3)
+        self.assertEqual(consumer.pop_many(self.client, 10, timeout_s=1), [])
+        self.assertEqual(len(consumer._inflight), 3)
+
+    def test_own_unacked_entries_are_not_reclaimed(self) -> None:
+        producer = self._buffer("producer")
+        consumer = self._buffer("worker", claim_idle_ms=50)
+        producer.push_many(self.client, [{"id": idx} for idx in range(3)])
+        self.assertEqual(len(consumer.pop_many(self.client, 10, timeout_s=1)), 3)
+        time.sleep(0.1)
+        self.assertEqual(consumer.pop_many(self.client, 10, timeout_s=1), [])
+        self.assertEqual(len(consumer._inflight), 3)
+
+    def test_depth_without_lag_field_falls_back_to_xlen(self) -> None:
+        # Redis 6 XINFO GROUPS has no lag field.
+        producer = self._buffer("producer")
+        consumer = self._buffer("worker", trim_interval_s=0.0)
+        producer.push_many(self.client, [{"id": idx} for idx in range(5)])
+        consumer.pop_many(self.client, 2, timeout_s=1)
+        consumer.ack(self.client)
+
+        class _Redis6:
+            def __init__(self, client: redis.Redis) -> None:
+                self._client = client
+
+            def xinfo_groups(self, key: str) -> list[dict[str, object]]:
+                return [{k: v for k, v in group.items() if k != "lag"} for group in self._client.xinfo_groups(key)]
+
+            def xlen(self, key: str) -> int:
+                return self._client.xlen(key)
+
+        consumer._trim_consumed(self.client)
+        self.assertEqual(consumer.depth(_Redis6(self.client)), 3)
+        self.assertIsNone(_group_backlog([{"name": b"g", "pending": 0}]))
+        self.assertEqual(_group_backlog([{"lag": 4, "pending": 2}, {"lag": 1, "pending": 0}]), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
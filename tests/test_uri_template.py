@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import random
+import re
+import string
+import sys
+import unittest
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from module_aggregation_filtering.normalizer import (
+    BASE64_TOKEN_RE,
+    EMAIL_RE,
+    HEX_TOKEN_RE,
+    IP_RE,
+    LONG_NUM_RE,
+    QUERY_KEY_VALUE_RE,
+    SHA_RE,
+    TIMESTAMP_RE,
+    UUID_RE,
+    AlertNormalizer,
+)
+
+
+def reference_template(normalizer: AlertNormalizer, uri: str) -> str:
+    # The templater as it was before memoisation and the pre-check skips: every pass, in order.
+    cleaned = uri.strip() or "-"
+    cleaned = QUERY_KEY_VALUE_RE.sub(normalizer._replace_query_value, cleaned)
+    cleaned = UUID_RE.sub("<UUID>", cleaned)
+    cleaned = SHA_RE.sub("<HASH>", cleaned)
+    cleaned = HEX_TOKEN_RE.sub("<TOKEN>", cleaned)
+    cleaned = BASE64_TOKEN_RE.sub("<B64TOKEN>", cleaned)
+    cleaned = EMAIL_RE.sub("<EMAIL>", cleaned)
+    cleaned = IP_RE.sub("<IP>", cleaned)
+    cleaned = TIMESTAMP_RE.sub("<TIMESTAMP>", cleaned)
+    cleaned = LONG_NUM_RE.sub("<NUM>", cleaned)
+    cleaned = re.sub(r"/{2,}", "/", cleaned)
+    cleaned = re.sub(r"(?<=/)[A-Za-z0-9_-]{20,}(?=/|$)", "<TOKEN>", cleaned)
+    return cleaned[:2048]
+
+
+GOLDEN_URIS = [
+    "",
+    "   ",
+    "/",
+    "/index.html",
+    # No '=': the query pass is skipped.
+    "/search?q",
+    "/api/v1/users/123456?expand",
+    # Query values: empty, secret, timestamp, long token, plain.
+    "/login?user=admin&password=hunter2&next=",
+    "/app.js?_dc=1700000000123&v=3",
+    "/cb?session=abc&sign=ff00&nonce=zz",
+    "/dl?file=aVeryLongOpaqueValueThatIsLongerThan24Chars&x=1",
+    "/a?b=c=d&&e=f",
+    # No digits: UUID/IP/timestamp/number passes are skipped, but B64 still inserts "64".
+    "/static/abcdefABCDEFabcdefABCDEF/app.js",
+    "/assets/app-QmFzZTY0VG9rZW5TdHJpbmc/",
+    "/no-digits-here/at-all",
+    # Digits present.
+    "/user/550e8400-e29b-41d4-a716-446655440000/profile",
+    "/obj/da39a3ee5e6b4b0d3255bfef95601890afd80709",
+    "/obj/e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855",
+    "/hex/0123456789abcdef01",
+    "/proxy/10.0.0.1/192.168.100.200:8080/path",
+    "/ts/1700000000/1700000000123/12345678901234",
+    "/page/2024/12/99999",
+    # '@' present or absent.
+    "/mail/alice.smith+tag@example.co.uk/inbox",
+    "/mail/not-an-email@/x",
+    "/user@host",
+    # '//' present or absent.
+    "//double//slashes///here/",
+    "/single/slashes/only",
+    "/tokens/ABCDEFGHIJKLMNOPQRSTUVWXYZ_-abc/end",
+    "/tokens/short/ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    # The 2048-char cap, including a placeholder straddling the cut.
+    "/" + "a" * 5000,
+    "/" + "ab/" * 700 + "?token=" + "x" * 100,
+    "/" + "x/" * 1020 + "1700000000123/tail",
+    "/" + "%2e%2e/" * 400 + "etc/passwd",
+    " \t/padded/uri?id=42 \n",
+]
+
+
+def random_uris(count: int, seed: int = 1644) -> list[str]:
+    rng = random.Random(seed)
+    fragments = [
+        "/api/v1/",
+        "/admin/",
+        "//",
+        "?",
+        "&",
+        "=",
+        "@",
+        "token",
+        "_dc",
+        "session",
+        "id",
+        "550e8400-e29b-41d4-a716-446655440000",
+        "10.1.2.3",
+        "1700000000",
+        "deadbeefdeadbeef",
+        "QmFzZTY0VG9rZW5TdHJpbmc",
+        "user@example.com",
+        ".php",
+        "%20",
+        "-",
+        "_",
+    ]
+    alphabet = string.ascii_letters + string.digits + "/?&=@._-%+"
+    uris = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 12)):
+            if rng.random() < 0.6:
+                parts.append(rng.choice(fragments))
+            else:
+                parts.append("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 30))))
+        uri = "".join(parts)
+        if rng.random() < 0.02:
+            uri = uri * rng.randint(20, 200)
+        uris.append(uri)
+    return uris
+
+
+class UriTemplateGoldenTest(unittest.TestCase):
+    def assert_matches_reference(self, normalizer: AlertNormalizer, uris: list[str]) -> None:
+        for uri in uris:
+            expected = reference_template(normalizer, uri)
+            self.assertEqual(normalizer._normalize_uri(uri), expected, msg=uri[:200])
+            self.assertLessEqual(len(expected), 2048)
+
+    def test_golden_corpus_with_cache(self) -> None:
+        normalizer = AlertNormalizer(uri_cache_size=1024)
+        self.assert_matches_reference(normalizer, GOLDEN_URIS)
+        # Second pass is served from the LRU and must still match.
+        self.assert_matches_reference(normalizer, GOLDEN_URIS)
+
+    def test_golden_corpus_without_cache(self) -> None:
+        self.assert_matches_reference(AlertNormalizer(uri_cache_size=0), GOLDEN_URIS)
+
+    def test_random_corpus(self) -> None:
+        self.assert_matches_reference(AlertNormalizer(uri_cache_size=256), random_uris(20000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+import uuid
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import redis
+
+from module_aggregation_filtering.aggregator import LightweightAggregator
+from module_aggregation_filtering.asset_catalog import AssetCatalog
+from module_aggregation_filtering.config import (
+    AggregationConfig,
+    AssetConfig,
+    HistoryConfig,
+    Module1Config,
+    QueueConfig,
+    ScoringConfig,
+    WindowCheckpointConfig,
+)
+from module_aggregation_filtering.history_store import RedisHistoryStore
+from module_aggregation_filtering.normalizer import AlertNormalizer
+from module_aggregation_filtering.pipeline import LightweightAggregationPipeline
+from module_aggregation_filtering.scorer import LightweightRiskScorer
+from module_aggregation_filtering.window_checkpoint import RedisWindowCheckpoint
+from module_alert_receiver.buffer import RedisAlertBuffer
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+def _redis_available() -> bool:
+    try:
+        return bool(redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).ping())
+    except redis.RedisError:
+        return False
+
+
+class _Crash(Exception):
+    pass
+
+
+@unittest.skipUnless(_redis_available(), f"no Redis at {REDIS_URL}")
+class FlushCheckpointTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
+        self.prefix = f"test:windows:{uuid.uuid4().hex}"
+        self.input = RedisAlertBuffer(url=REDIS_URL, queue_key=f"{self.prefix}:in", processing_key=f"{self.prefix}:proc")
+        self.output = RedisAlertBuffer(url=REDIS_URL, queue_key=f"{self.prefix}:out")
+        self.suppressed = RedisAlertBuffer(url=REDIS_URL, queue_key=f"{self.prefix}:suppressed")
+        # An hour old, so every bucket is already past its window when flushed.
+        seen = datetime.now(UTC) - timedelta(hours=1)
+        self.input.push_many(
+            self.client,
+            [
+                {"id": f"a{idx}", "@timestamp": seen.isoformat(), "src_ip": f"10.0.0.{idx % 3}", "dst_ip": "192.168.0.10"}
+                for idx in range(9)
+            ],
+        )
+
+    def tearDown(self) -> None:
+        self.client.delete(*self.client.keys(f"{self.prefix}*"))
+
+    def _start(self) -> tuple[LightweightAggregationPipeline, RedisWindowCheckpoint]:
+        # One process lifetime: restore the checkpoint, then re-read whatever the input still holds.
+        cfg = Module1Config(
+            queue=QueueConfig(),
+            aggregation=AggregationConfig(),
+            scoring=ScoringConfig(threshold=0.0),
+            asset=AssetConfig(),
+            history=HistoryConfig(),
+            checkpoint=WindowCheckpointConfig(),
+        )
+        pipeline = LightweightAggregationPipeline(
+            cfg=cfg,
+            normalizer=AlertNormalizer(),
+            aggregator=LightweightAggregator(window_s=60, track_changes=True),
+            scorer=LightweightRiskScorer(cfg.scoring),
+            asset_catalog=AssetCatalog(entries=[]),
+            history_store=RedisHistoryStore(key_prefix=f"{self.prefix}:hist"),
+        )
+        checkpoint = RedisWindowCheckpoint(key=f"{self.prefix}:ckpt")
+        self.input = RedisAlertBuffer(url=REDIS_URL, queue_key=self.input.queue_key, processing_key=self.input.processing_key)
+        pipeline.aggregator.restore(checkpoint.load(self.client))
+        for raw_alert in self.input.pop_many(self.client, 100, timeout_s=1):
+            pipeline.aggregator.add(pipeline.normalizer.normalize(raw_alert))
+        return pipeline, checkpoint
+
+    def _flush(self, pipeline: LightweightAggregationPipeline, checkpoint: RedisWindowCheckpoint) -> bool:
+        return pipeline._flush_expired(self.client, self.output, self.suppressed, self.input, checkpoint)
+
+    def _history_total(self) -> int:
+        history = RedisHistoryStore(key_prefix=f"{self.prefix}:hist")
+        day_key = (datetime.now(UTC) - timedelta(hours=1)).date().isoformat()
+        return sum(int(value) for value in self.client.hvals(history._daily_hash_key(day_key)))
+
+    def test_flush_commits_output_history_and_checkpoint_together(self) -> None:
+        pipeline, checkpoint = self._start()
+        self.assertTrue(self._flush(pipeline, checkpoint))
+        self.assertEqual(self.client.llen(self.output.queue_key), 3)
+        self.assertEqual(self.client.hlen(checkpoint.key), 0)
+        self.assertEqual(self.client.llen(self.input.processing_key), 0)
+
+        pipeline, checkpoint = self._start()
+        self.assertFalse(self._flush(pipeline, checkpoint))
+        self.assertEqual(self.client.llen(self.output.queue_key), 3)
+        self.assertEqual(self._history_total(), 9)
+
+    def test_crash_before_commit_emits_each_bucket_once(self) -> None:
+        pipeline, checkpoint = self._start()
+
+        def crash(*_args: object, **_kwargs: object) -> int:
+            raise _Crash()
+
+        self.output.queue_push_many = crash
+        with self.assertRaises(_Crash):
+            self._flush(pipeline, checkpoint)
+        del self.output.queue_push_many
+        self.assertEqual(self.client.llen(self.output.queue_key), 0)
+        self.assertEqual(self._history_total(), 0)
+
+        pipeline, checkpoint = self._start()
+        self.assertTrue(self._flush(pipeline, checkpoint))
+        self.assertEqual(self.client.llen(self.output.queue_key), 3)
+        self.assertEqual(self._history_total(), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()